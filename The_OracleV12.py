@@ -1,22 +1,49 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
 import math
 import os
 import random
 import re
-from collections import defaultdict, Counter
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 import pyperclip
 
+import factorization
+import lexicon_index
+import number_props
+import result_cache
+import unfolding
+
 # ==============================================================================
 # GLOBAL CONFIGURATION & LEXICON
 # ==============================================================================
 MAIN_DB_DIR = "/Users/lydiaparker/The_Oracle/txt_db"
 USER_ADDITIONS_FILE = "/Users/lydiaparker/The_Oracle/user_gematria_additions.txt"
-LEXICON = defaultdict(list)
+LEXICON_INDEX_FILE = "/Users/lydiaparker/The_Oracle/lexicon.gidx"  # built by `lexicon_index.py compile-lexicon`
+LEXICON = lexicon_index.Lexicon()
+USER_ADDITIONS = set()  # (value, phrase) pairs already in USER_ADDITIONS_FILE
+_LEXICON_SOURCE_SIGNATURE = b""
+LEXICON_VERSION = ""  # hash of the lexicon sources and user additions, part of every result cache key
 DISPLAY_LIMITS = {'single_words': 3, 'two_word_phrases': 2, 'three_word_phrases': 2, 'four_five_word_phrases': 5}
 SHOW_ONLY_PRIME_RESONANCES = False
 APPLY_UNFOLDING_TO_ALL_METHODS = False
-UNFOLDING_LARGE_NUMBER_THRESHOLD = 1_000_000_000_000_000_000
+UNFOLDING_LARGE_NUMBER_THRESHOLD = 10**80  # Pollard-rho makes 20-60 digit chain values practical
+UNFOLDING_TIME_BUDGET = 2.0  # Seconds of factoring per unfolded number; a cofactor left after that stays unsplit
 APPLY_BASE_CONVERSION_UNFOLDING = False
+UNFOLDING_DEPTH = 1  # >1 unfolds the combined sequence again as a memoised DAG, this many levels in total
+UNFOLDING_LEVEL_CAP = 256  # New numbers admitted per extra level
+UNFOLDING_REQUIRE_MASK = 0  # e.g. number_props.PRIME: only follow unfolded numbers with these properties
 TARGET_UNFOLDING_BASE = 10
+RESULT_CACHE_FILE = "/Users/lydiaparker/The_Oracle/oracle_results.sqlite"  # shared with quantumoraclev3.py
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+USE_RESULT_CACHE = True
+CLIPBOARD_FORMAT = 'clipboard'  # Renderer used for clipboard copies: 'clipboard', 'markdown' or 'json'
 SELECTED_GEMATRIA_METHODS = []
 PHI = 1.6180339887
 
@@ -35,28 +62,11 @@ JEWISH_GEMATRIA_MAP = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, '
 # ==============================================================================
 # NUMBER ANALYSIS FUNCTIONS
 # ==============================================================================
-def is_prime(n: int) -> bool:
-    if n <= 1: return False
-    if n <= 3: return True
-    if n % 2 == 0 or n % 3 == 0: return False
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0: return False
-        i += 6
-    return True
-
-def is_perfect_square(n: int) -> bool:
-    if n < 0: return False
-    sqrt_n = int(math.sqrt(n))
-    return sqrt_n * sqrt_n == n
-
-def is_palindrome(n: int) -> bool:
-    return str(n) == str(n)[::-1]
-
-def is_fibonacci(num):
-    if num < 0: return False
-    if num == 0 or num == 1: return True
-    return is_perfect_square(5 * num**2 + 4) or is_perfect_square(5 * num**2 - 4)
+# Sieve-backed property table with a Miller-Rabin fallback, shared by all the Oracles.
+is_prime = number_props.is_prime
+is_perfect_square = number_props.is_perfect_square
+is_palindrome = number_props.is_palindrome
+is_fibonacci = number_props.is_fibonacci
 
 _fib_sequence = [0, 1]
 while _fib_sequence[-1] < 1000000: _fib_sequence.append(_fib_sequence[-1] + _fib_sequence[-2])
@@ -405,39 +415,12 @@ def calculate_trinary_loop_position_gematria(word: str) -> int:
 # ==============================================================================
 # NUMERICAL & CONVERSION FUNCTIONS
 # ==============================================================================
-def get_factorization_chain(n: int) -> list[int]:
-    if n <= 0: return []
-    chain = {n}
-    current_num = n
-    for factor in [2, 3]:
-        while current_num % factor == 0:
-            current_num //= factor
-            if current_num > 1: chain.add(current_num)
-    i = 5
-    while i * i <= current_num:
-        for step in [i, i + 2]:
-             while current_num % step == 0:
-                current_num //= step
-                if current_num > 1: chain.add(current_num)
-        i += 6
-    if current_num > 1: chain.add(current_num)
-    return sorted(list(chain), reverse=True)
-
-def to_base36(n: int) -> str:
-    if n == 0: return "0"
-    if n < 0: return "-" + to_base36(abs(n))
-    chars = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    base36 = ""
-    while n > 0: n, i = divmod(n, 36); base36 = chars[i] + base36
-    return base36
-
-def decode_base36_pairs(b36_string: str) -> list[int]:
-    if len(b36_string) < 2: return []
-    decoded_numbers = []
-    for i in range(len(b36_string) - 1):
-        try: decoded_numbers.append(int(b36_string[i:i+2], 36))
-        except ValueError: continue 
-    return decoded_numbers
+# SPF-table factoring with memoised chains, shared with the other Oracles.
+get_factorization_chain = factorization.get_factorization_chain
+
+# Base36 unfolding helpers, shared with the precomputed unfolding index.
+to_base36 = unfolding.to_base36
+decode_base36_pairs = unfolding.decode_base36_pairs
 
 # ==============================================================================
 # MAIN APPLICATION LOGIC
@@ -462,347 +445,543 @@ def copy_output_to_clipboard(text: str):
     except Exception as e:
         print(f"\nAn unexpected error occurred while copying to clipboard: {e}")
 
+def _lexicon_version(source_signature: bytes, user_additions_file: str) -> str:
+    digest = hashlib.sha256(source_signature)
+    if os.path.exists(user_additions_file):
+        st = os.stat(user_additions_file)
+        digest.update(f"{st.st_size}|{st.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
 def load_lexicon(main_db_dir: str, user_additions_file: str):
+    global LEXICON_VERSION, _LEXICON_SOURCE_SIGNATURE
     LEXICON.clear()
     print(f"Building Gematria lookup database from files in '{main_db_dir}' and '{user_additions_file}'...")
-    files_found_main = 0
     entries_from_user_file = 0
-    words_file_entries = 0
     if not os.path.isdir(main_db_dir):
         print(f"\nERROR: The main database directory '{main_db_dir}' does not exist.")
     else:
-        for root, _, files in os.walk(main_db_dir):
-            for file in files:
-                if file.lower() == 'words.txt':
-                    filepath = os.path.join(root, file)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            for line in f:
-                                line = line.strip()
-                                if not line: continue
-                                parts = line.split(':')
-                                if len(parts) >= 2:
-                                    phrase = parts[0].strip()
-                                    for value_str in parts[1:]:
-                                        try:
-                                            value = int(value_str.strip())
-                                            LEXICON[value].append(phrase)
-                                            words_file_entries += 1
-                                        except ValueError:
-                                            pass
-                    except Exception as e:
-                        print(f"    --- Could not process words file {filepath}: {e}")
-                elif file.endswith(".txt"):
-                    files_found_main += 1
-                    filepath = os.path.join(root, file)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            for line in f:
-                                parts = line.strip().split('|')
-                                if len(parts) == 3:
-                                    phrase, value_str = parts[1], parts[2]
-                                    try:
-                                        value = int(value_str)
-                                        LEXICON[value].append(phrase.strip())
-                                    except ValueError:
-                                        pass
-                    except Exception as e:
-                        print(f"    --- Could not process main DB file {filepath}: {e}")
-        if files_found_main == 0 and words_file_entries == 0:
-            print(f"WARNING: No '.txt' files were found in the main database directory '{main_db_dir}'.")
+        index = lexicon_index.open_index(LEXICON_INDEX_FILE, main_db_dir)
+        if index is not None:
+            LEXICON.attach(index)
+            print(f"Opened compiled lexicon '{LEXICON_INDEX_FILE}' ({len(index)} numbers, {index.n_phrases} phrases).")
         else:
-            print(f"Processed {files_found_main} main database file(s) and {words_file_entries} entries from words.txt.")
+            print(f"Parsing text files; run `python lexicon_index.py compile-lexicon {main_db_dir} {LEXICON_INDEX_FILE}` for instant startup.")
+            stats = {}
+            LEXICON.load_entries(lexicon_index.iter_source_entries(main_db_dir, stats))
+            if stats['main_files'] == 0 and stats['words_file_entries'] == 0:
+                print(f"WARNING: No '.txt' files were found in the main database directory '{main_db_dir}'.")
+            else:
+                print(f"Processed {stats['main_files']} main database file(s) and {stats['words_file_entries']} entries from words.txt.")
+    USER_ADDITIONS.clear()
     if os.path.exists(user_additions_file):
         try:
-            with open(user_additions_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    parts = line.strip().split('|')
-                    if len(parts) == 2:
-                        phrase, value_str = parts[0], parts[1]
-                        try:
-                            value = int(value_str)
-                            LEXICON[value].append(phrase.strip())
-                            entries_from_user_file += 1
-                        except ValueError:
-                            pass
+            for value, phrase in lexicon_index.iter_user_entries(user_additions_file):
+                LEXICON.add(value, phrase)
+                USER_ADDITIONS.add((value, phrase))
+                entries_from_user_file += 1
         except Exception as e:
             print(f"    --- Could not process user additions file {user_additions_file}: {e}")
         print(f"Loaded {entries_from_user_file} entries from user additions file.")
     else:
         print(f"No existing user additions file found at '{user_additions_file}'. A new one will be created when you save entries.")
-    total_unique_phrases = len(set(p for val_list in LEXICON.values() for p in val_list))
-    print(f"Total {total_unique_phrases} unique phrases loaded across {len(LEXICON)} numbers.")
+    if LEXICON.index is not None:
+        _LEXICON_SOURCE_SIGNATURE = LEXICON.index.signature
+    elif os.path.isdir(main_db_dir):
+        _LEXICON_SOURCE_SIGNATURE = lexicon_index.source_signature(main_db_dir)
+    else:
+        _LEXICON_SOURCE_SIGNATURE = b""
+    LEXICON_VERSION = _lexicon_version(_LEXICON_SOURCE_SIGNATURE, user_additions_file)
+    print(f"Total {LEXICON.unique_phrase_count()} unique phrases loaded across {len(LEXICON)} numbers.")
+    print(lexicon_index.format_memory_report(LEXICON.memory_report()))
     print("Database build complete.")
 
-def save_resonant_phrase_to_user_db(original_phrase: str, resonant_numbers: set, user_additions_file: str):
+def save_resonant_phrase_to_user_db(original_phrase: str, resonant_numbers: set, user_additions_file: str, verbose: bool = True) -> int:
+    """Appends the phrase's new numbers to the additions file; returns how many were new. Errors always print."""
     if not original_phrase or not resonant_numbers:
-        print("Cannot save empty phrase or no resonant numbers.")
-        return
-    print(f"Saving '{original_phrase}' and its resonances to '{user_additions_file}'...")
+        if verbose: print("Cannot save empty phrase or no resonant numbers.")
+        return 0
+    if verbose: print(f"Saving '{original_phrase}' and its resonances to '{user_additions_file}'...")
+    # Only numbers the phrase is not already saved under in the additions file
+    # are appended, so re-saving a phrase never duplicates lines there. Pairs
+    # that are only in the main database are still written, as before.
+    new_numbers = [num for num in sorted(resonant_numbers) if (num, original_phrase) not in USER_ADDITIONS]
+    for num in new_numbers:
+        LEXICON.add(num, original_phrase)
+        USER_ADDITIONS.add((num, original_phrase))
+    if not new_numbers:
+        if verbose: print(f"'{original_phrase}' is already saved for all of these numbers.")
+        return 0
     try:
         with open(user_additions_file, 'a', encoding='utf-8') as f:
-            saved_count = 0
-            for num in sorted(list(resonant_numbers)):
-                entry_line = f"{original_phrase}|{num}\n"
-                f.write(entry_line)
-                saved_count += 1
-                if original_phrase not in LEXICON[num]:
-                    LEXICON[num].append(original_phrase)
-        print(f"Successfully saved {saved_count} new entries for '{original_phrase}'.")
+            f.writelines(f"{original_phrase}|{num}\n" for num in new_numbers)
+        if verbose: print(f"Successfully saved {len(new_numbers)} new entries for '{original_phrase}'.")
+        # The lexicon changed, so results cached against the old one no longer apply.
+        global LEXICON_VERSION
+        LEXICON_VERSION = _lexicon_version(_LEXICON_SOURCE_SIGNATURE, user_additions_file)
     except Exception as e:
         print(f"ERROR: Could not save entries to file {user_additions_file}: {e}")
         print("Entries were added to the current session's database, but might not be saved permanently.")
+    return len(new_numbers)
 
-def _perform_unfolding_step(label: str, value_to_unfold: int, master_unfolded_numbers_set: set, capture_output_obj: CaptureOutput):
-    _print = capture_output_obj.write
-    _print(print_header(f"Cosmic Unfolding ({label})"))
+# ==============================================================================
+# RESONANCE COMPUTE CORE
+# ==============================================================================
+class UnfoldingStep:
+    """
+    One Cosmic Unfolding. status is 'ok', 'too_large', 'invalid' (nothing to
+    unfold) or 'unformable' (a group's values did not form a number).
+    """
+    def __init__(self, label, value, status, display_label=None, factoring=None, warning=None, source_values=None):
+        self.label = label
+        self.value = value                      # the number actually factored
+        self.status = status
+        self.display_label = display_label or label
+        self.factoring = factoring              # factorization.FactorResult when status == 'ok'
+        self.chain = factoring.chain if factoring is not None else []
+        self.base36_codes = [to_base36(n) for n in self.chain]
+        self.warning = warning                  # base-conversion failure, if any
+        self.source_values = source_values      # the unformable digit string
+
+    def to_dict(self) -> dict:
+        data = {'label': self.label, 'display_label': self.display_label, 'value': self.value, 'status': self.status,
+                'factor_chain': self.chain, 'base36_codes': self.base36_codes}
+        if self.factoring is not None:
+            data.update(method=self.factoring.method, seconds=self.factoring.seconds,
+                        complete=self.factoring.complete, leftover=self.factoring.leftover)
+        if self.warning: data['warning'] = self.warning
+        if self.source_values is not None: data['source_values'] = self.source_values
+        return data
+
+    def state(self) -> dict:
+        """Plain-data form kept in the result cache; from_state rebuilds the step."""
+        f = self.factoring
+        return {'label': self.label, 'value': self.value, 'status': self.status, 'display_label': self.display_label,
+                'factoring': [f.n, f.factors, f.complete, f.seconds, f.method, f.budget] if f is not None else None,
+                'warning': self.warning, 'source_values': self.source_values}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        factoring = factorization.FactorResult(*state['factoring']) if state['factoring'] is not None else None
+        return cls(state['label'], state['value'], state['status'], state['display_label'], factoring,
+                   state['warning'], state['source_values'])
+
+class ResonanceResult:
+    """Everything process_phrase shows for a phrase, with property masks computed once for the renderers."""
+    def __init__(self, phrase, show_only_prime_resonances):
+        self.phrase = phrase
+        self.show_only_prime_resonances = show_only_prime_resonances
+        self.gematria_values = {}   # method name -> value, or "Error"
+        self.gematria_errors = {}   # method name -> error message
+        self.value_masks = {}       # method name -> number_props mask (0 for errors and non-positive values)
+        self.initial_number_str = ""
+        self.initial_number = 0
+        self.initial_number_valid = True
+        self.factor_chain = []
+        self.base36_codes = []
+        self.steps = []             # UnfoldingStep, in display order
+        self.unfolding_dag = None   # unfolding.UnfoldingDAG when UNFOLDING_DEPTH > 1
+        self.unfolded_count = 0     # size of the combined sequence before the prime filter
+        self.final_numbers = []
+        self.final_masks = []       # parallel to final_numbers
+        self.lexicon_resonances = {}  # num -> {bucket: [phrases]} for every final number in the lexicon
+
+    def to_dict(self) -> dict:
+        return {
+            'phrase': self.phrase,
+            'gematria_values': self.gematria_values,
+            'gematria_errors': self.gematria_errors,
+            'initial_number_str': self.initial_number_str,
+            'initial_number_original_val': self.initial_number,
+            'factor_chain': self.factor_chain,
+            'base36_codes': self.base36_codes,
+            'unfoldings': [step.to_dict() for step in self.steps],
+            'unfolding_dag': self.unfolding_dag.to_dict() if self.unfolding_dag is not None else None,
+            'show_only_prime_resonances': self.show_only_prime_resonances,
+            'final_numbers': self.final_numbers,
+            'final_tags': [number_props.tag_for_mask(mask) for mask in self.final_masks],
+            'lexicon_resonances_details': {str(num): details for num, details in self.lexicon_resonances.items()},
+        }
+
+def _unfold_value(label: str, value_to_unfold: int, master_unfolded_numbers_set: set) -> UnfoldingStep:
     num_for_factoring = value_to_unfold
     display_label = label
+    warning = None
     if APPLY_BASE_CONVERSION_UNFOLDING and isinstance(value_to_unfold, (int, float)):
         try:
             base_converted_str = to_base(int(value_to_unfold), TARGET_UNFOLDING_BASE)
             num_for_factoring = int(base_converted_str)
             display_label += f" (Base-{TARGET_UNFOLDING_BASE} converted: {base_converted_str})"
         except Exception as e:
-            _print(f"  Warning: Could not convert to Base-{TARGET_UNFOLDING_BASE} for unfolding: {e}")
+            warning = f"Could not convert to Base-{TARGET_UNFOLDING_BASE} for unfolding: {e}"
             num_for_factoring = 0
     if num_for_factoring > 0 and num_for_factoring <= UNFOLDING_LARGE_NUMBER_THRESHOLD:
-        factor_chain = get_factorization_chain(num_for_factoring)
-        base36_codes = [to_base36(n) for n in factor_chain]
-        unfolded_numbers = {num_decoded for code in base36_codes for num_decoded in decode_base36_pairs(code)}
-        master_unfolded_numbers_set.update(unfolded_numbers)
-        if not factor_chain: _print(f"  No factorization chain generated for '{display_label}'.")
-        else:
-            _print(f"  Unfolding '{display_label}':")
-            for i, num in enumerate(factor_chain): _print(f"    Step {i+1}: {num}  ->  Base36: {base36_codes[i]}")
-    elif num_for_factoring > UNFOLDING_LARGE_NUMBER_THRESHOLD:
-        _print(f"  Value ({num_for_factoring}) for '{display_label}' is too large for unfolding (threshold: {UNFOLDING_LARGE_NUMBER_THRESHOLD}).")
-    else:
-        _print(f"  No valid number to unfold for '{display_label}' or invalid after conversion.")
-
-def process_phrase(phrase: str, capture_output_obj: CaptureOutput, show_only_prime_resonances: bool):
+        factoring = factorization.factorize_timed(num_for_factoring, UNFOLDING_TIME_BUDGET)
+        step = UnfoldingStep(label, num_for_factoring, 'ok', display_label, factoring, warning)
+        master_unfolded_numbers_set.update(unfolding.unfold_chain(step.chain))
+        return step
+    status = 'too_large' if num_for_factoring > UNFOLDING_LARGE_NUMBER_THRESHOLD else 'invalid'
+    return UnfoldingStep(label, num_for_factoring, status, display_label, warning=warning)
+
+def _is_number(value) -> bool:
+    """An int or a finite float: a cipher value int() can take (Doubling Vortex overflows to inf on long phrases)."""
+    return isinstance(value, int) or (isinstance(value, float) and math.isfinite(value))
+
+def _unfold_group(label: str, methods: list, calculated_gematria_values: dict, master_unfolded_numbers_set: set) -> UnfoldingStep:
+    values_str = "".join(str(int(calculated_gematria_values.get(m, 0))) for m in methods if _is_number(calculated_gematria_values.get(m)))
+    try:
+        combined_val = int(values_str)
+    except ValueError:
+        return UnfoldingStep(label, 0, 'unformable', source_values=values_str)
+    return _unfold_value(label, combined_val, master_unfolded_numbers_set)
+
+AVAILABLE_GEMATRIA_METHODS_MAP = {
+    "Simple Gematria": simple_gematria, "English Gematria": english_gematria, "Gemini's Resonance": gemini_resonance,
+    "Boundary Resonance": boundary_resonance_gematria, "Jewish Gematria": jewish_gematria,
+    "Law of 6 Doubling Gematria": calculate_law_of_6_doubling_gematria, "Tiferet Balance Gematria": calculate_tiferet_balance_gematria,
+    "Thelemic 6 Cipher": calculate_thelemic_6_cipher, "Vav Connection Gematria": calculate_vav_connection_gematria,
+    "Hexagram Gematria": calculate_hexagram_gematria, "Doubling Vortex Gematria": calculate_doubling_vortex_gematria,
+    "Six Numbers Emergence Cipher": calculate_six_numbers_emergence_cipher, "Cabala 6 Law Reduction": calculate_cabala_6_law_reduction,
+    "Infinite Double 6 Gematria": calculate_infinite_double_6_gematria, "Qabalah Doubling Bridge": calculate_qabalah_doubling_bridge,
+    "Law of 6 Cipher Variant": calculate_law_of_6_cipher_variant, "ALW Cipher Gematria": calculate_alw_cipher_gematria,
+    "Trigrammaton Qabalah Gematria": calculate_trigrammaton_qabalah_gematria, "Baconian Gematria": calculate_baconian_cipher_gematria,
+    "Ordinal Multiplied Gematria": calculate_ordinal_multiplied_gematria, "Chaldean Gematria": calculate_chaldean_gematria,
+    "Golden Ratio Phi Gematria": calculate_golden_ratio_phi_gematria, "Hexadecimal Position Gematria": calculate_hexadecimal_position_gematria,
+    "Sumerian Gematria": calculate_sumerian_gematria, "Phone Keypad Gematria": calculate_phone_keypad_gematria,
+    "ASCII Sum Gematria": calculate_ascii_sum_gematria, "Base-8 Gematria": calculate_base8_gematria,
+    "Caesar Cipher Gematria": calculate_caesar_cipher_gematria, "Polybius Square Gematria": calculate_polybius_square_gematria,
+    "Solfège Gematria": calculate_solfege_gematria, "Zodiac Gematria": calculate_zodiac_gematria,
+    "Base-2 Gematria": calculate_base_2_gematria, "Base-3 Gematria": calculate_base_3_gematria,
+    "Base-4 Gematria": calculate_base_4_gematria, "Base-5 Gematria": calculate_base_5_gematria,
+    "Base-7 Gematria": calculate_base_7_gematria, "Base-9 Gematria": calculate_base_9_gematria,
+    "Base-11 Gematria": calculate_base_11_gematria, "Composite CTGB": calculate_composite_ctgb,
+    "Binary Trinary Gematria": calculate_binary_trinary_gematria, "Golden Spiral Binary Gematria": calculate_golden_spiral_binary_gematria,
+    "Trinary Loop Position Gematria": calculate_trinary_loop_position_gematria
+}
+
+# Ciphers that draw random numbers. They are evaluated afresh on every call
+# and never stored in the result cache.
+RANDOM_GEMATRIA_METHODS = frozenset({"Infinite Double 6 Gematria"})
+
+def _evaluate_method(method_func, phrase: str):
+    """
+    (value, None), or ("Error", message) when the cipher raises or its value
+    cannot be shown: inf or nan (Doubling Vortex on long phrases) or an int too
+    long for str() (Ordinal Multiplied on very long ones).
+    """
+    try:
+        value = method_func(phrase)
+        if isinstance(value, float) and not math.isfinite(value):
+            return "Error", f"non-finite value {value}"
+        if isinstance(value, int):
+            str(value)
+        return value, None
+    except Exception as e:
+        return "Error", str(e)
+
+def _unfoldable(value) -> bool:
+    return _is_number(value) and value > 0 and value <= UNFOLDING_LARGE_NUMBER_THRESHOLD
+
+def resonance_core(phrase: str) -> dict:
+    """
+    The deterministic part of compute_resonance as plain data: every cipher
+    but RANDOM_GEMATRIA_METHODS, the initial number, the unfolding steps and
+    the numbers they unfold into. This is what the result cache stores, unless
+    a factorization ran out of its time budget ('complete' False): a less
+    loaded run would finish it.
+    """
     global SELECTED_GEMATRIA_METHODS
-    AVAILABLE_GEMATRIA_METHODS_MAP = {
-        "Simple Gematria": simple_gematria, "English Gematria": english_gematria, "Gemini's Resonance": gemini_resonance,
-        "Boundary Resonance": boundary_resonance_gematria, "Jewish Gematria": jewish_gematria,
-        "Law of 6 Doubling Gematria": calculate_law_of_6_doubling_gematria, "Tiferet Balance Gematria": calculate_tiferet_balance_gematria,
-        "Thelemic 6 Cipher": calculate_thelemic_6_cipher, "Vav Connection Gematria": calculate_vav_connection_gematria,
-        "Hexagram Gematria": calculate_hexagram_gematria, "Doubling Vortex Gematria": calculate_doubling_vortex_gematria,
-        "Six Numbers Emergence Cipher": calculate_six_numbers_emergence_cipher, "Cabala 6 Law Reduction": calculate_cabala_6_law_reduction,
-        "Infinite Double 6 Gematria": calculate_infinite_double_6_gematria, "Qabalah Doubling Bridge": calculate_qabalah_doubling_bridge,
-        "Law of 6 Cipher Variant": calculate_law_of_6_cipher_variant, "ALW Cipher Gematria": calculate_alw_cipher_gematria,
-        "Trigrammaton Qabalah Gematria": calculate_trigrammaton_qabalah_gematria, "Baconian Gematria": calculate_baconian_cipher_gematria,
-        "Ordinal Multiplied Gematria": calculate_ordinal_multiplied_gematria, "Chaldean Gematria": calculate_chaldean_gematria,
-        "Golden Ratio Phi Gematria": calculate_golden_ratio_phi_gematria, "Hexadecimal Position Gematria": calculate_hexadecimal_position_gematria,
-        "Sumerian Gematria": calculate_sumerian_gematria, "Phone Keypad Gematria": calculate_phone_keypad_gematria,
-        "ASCII Sum Gematria": calculate_ascii_sum_gematria, "Base-8 Gematria": calculate_base8_gematria,
-        "Caesar Cipher Gematria": calculate_caesar_cipher_gematria, "Polybius Square Gematria": calculate_polybius_square_gematria,
-        "Solfège Gematria": calculate_solfege_gematria, "Zodiac Gematria": calculate_zodiac_gematria,
-        "Base-2 Gematria": calculate_base_2_gematria, "Base-3 Gematria": calculate_base_3_gematria,
-        "Base-4 Gematria": calculate_base_4_gematria, "Base-5 Gematria": calculate_base_5_gematria,
-        "Base-7 Gematria": calculate_base_7_gematria, "Base-9 Gematria": calculate_base_9_gematria,
-        "Base-11 Gematria": calculate_base_11_gematria, "Composite CTGB": calculate_composite_ctgb,
-        "Binary Trinary Gematria": calculate_binary_trinary_gematria, "Golden Spiral Binary Gematria": calculate_golden_spiral_binary_gematria,
-        "Trinary Loop Position Gematria": calculate_trinary_loop_position_gematria
-    }
     SELECTED_GEMATRIA_METHODS = list(AVAILABLE_GEMATRIA_METHODS_MAP.items())
-    
-    _print = capture_output_obj.write
-    _print(print_header(f"Resonance for: {phrase}"))
-    
-    calculated_gematria_values = {}
+    values, errors = {}, {}
     for method_name, method_func in SELECTED_GEMATRIA_METHODS:
-        try:
-            value = method_func(phrase)
-            calculated_gematria_values[method_name] = value
-            tags = []
-            if isinstance(value, (int, float)) and value > 0:
-                if is_prime(int(value)): tags.append("P")
-                if is_perfect_square(int(value)): tags.append("S")
-                if is_palindrome(int(value)): tags.append("A")
-            tag_str = f"[{''.join(tags)}]" if tags else ""
-            _print(f"  {method_name.ljust(30)}: {value} {tag_str}")
-        except Exception as e:
-            _print(f"  Error calculating {method_name.ljust(30)}: {e}")
-            calculated_gematria_values[method_name] = "Error"
-    
-    s_gematria = calculated_gematria_values.get("Simple Gematria", 0)
-    e_gematria = calculated_gematria_values.get("English Gematria", 0)
-    j_gematria = calculated_gematria_values.get("Gemini's Resonance", 0)
+        if method_name not in RANDOM_GEMATRIA_METHODS:
+            values[method_name], error = _evaluate_method(method_func, phrase)
+            if error is not None:
+                errors[method_name] = error
+
+    s_gematria = values.get("Simple Gematria", 0)
+    e_gematria = values.get("English Gematria", 0)
+    j_gematria = values.get("Gemini's Resonance", 0)
     initial_number_str = f"{j_gematria}{e_gematria}{s_gematria}"
     try:
-        initial_number = int(initial_number_str)
+        initial_number, initial_number_valid = int(initial_number_str), True
     except ValueError:
-        _print("Warning: Could not form a valid initial number from core gematria values (too large or invalid).")
-        initial_number = 0
-    
-    _print(print_header("Initial Number"))
-    _print(f"  Concatenated Value: {initial_number_str}")
-    
-    all_final_unfolded_numbers_for_display = set()
+        initial_number, initial_number_valid = 0, False
+
+    unfolded, initial_factoring, factor_chain = set(), None, []
     if initial_number > 0 and initial_number <= UNFOLDING_LARGE_NUMBER_THRESHOLD:
-        factor_chain_initial = get_factorization_chain(initial_number)
-        base36_codes_initial = [to_base36(n) for n in factor_chain_initial]
-        unfolded_from_initial = {num for code in base36_codes_initial for num in decode_base36_pairs(code)}
-        all_final_unfolded_numbers_for_display.update(unfolded_from_initial)
-    
-    for method_name, value in calculated_gematria_values.items():
-        if isinstance(value, (int, float)) and value > 0 and value <= UNFOLDING_LARGE_NUMBER_THRESHOLD:
-            _perform_unfolding_step(method_name, int(value), all_final_unfolded_numbers_for_display, capture_output_obj)
-    
+        initial_factoring = factorization.factorize_timed(initial_number, UNFOLDING_TIME_BUDGET)
+        factor_chain = initial_factoring.chain
+        unfolded.update(unfolding.unfold_chain(factor_chain))
+
+    steps = {method_name: _unfold_value(method_name, int(value), unfolded).state()
+             for method_name, value in values.items() if _unfoldable(value)}
+
     group_1_methods = ["Zodiac Gematria", "Base-2 Gematria", "Base-3 Gematria", "Base-4 Gematria", "Base-5 Gematria",
                        "Base-7 Gematria", "Base-9 Gematria", "Base-11 Gematria", "Composite CTGB"]
-    group_1_values_str = "".join(str(int(calculated_gematria_values.get(m, 0))) for m in group_1_methods if isinstance(calculated_gematria_values.get(m), (int, float)))
-    try:
-        group_1_combined_val = int(group_1_values_str)
-        _perform_unfolding_step("Zodiac to CTGB Chain", group_1_combined_val, all_final_unfolded_numbers_for_display, capture_output_obj)
-    except ValueError:
-        _print(f"\n--- Cosmic Unfolding (Zodiac to CTGB Chain) ---")
-        _print(f"  Could not form a valid number from values: {group_1_values_str}")
-    
     group_2_methods = ["Hexadecimal Position Gematria", "Sumerian Gematria", "Phone Keypad Gematria", "ASCII Sum Gematria",
                        "Base-8 Gematria", "Caesar Cipher Gematria", "Polybius Square Gematria", "Solfège Gematria"]
-    group_2_values_str = "".join(str(int(calculated_gematria_values.get(m, 0))) for m in group_2_methods if isinstance(calculated_gematria_values.get(m), (int, float)))
-    try:
-        group_2_combined_val = int(group_2_values_str)
-        _perform_unfolding_step("Hex to Solfège Chain", group_2_combined_val, all_final_unfolded_numbers_for_display, capture_output_obj)
-    except ValueError:
-        _print(f"\n--- Cosmic Unfolding (Hex to Solfège Chain) ---")
-        _print(f"  Could not form a valid number from values: {group_2_values_str}")
-    
-    _print(print_header("FINAL COMBINED RESONANCE SEQUENCE"))
-    current_final_numbers = all_final_unfolded_numbers_for_display
+    group_steps = [_unfold_group("Zodiac to CTGB Chain", group_1_methods, values, unfolded).state(),
+                   _unfold_group("Hex to Solfège Chain", group_2_methods, values, unfolded).state()]
+
+    complete = (initial_factoring is None or initial_factoring.complete) and all(
+        state['factoring'] is None or state['factoring'][2] for state in [*steps.values(), *group_steps])
+    return {'values': values, 'errors': errors, 'initial_number_str': initial_number_str,
+            'initial_number': initial_number, 'initial_number_valid': initial_number_valid,
+            'factor_chain': factor_chain, 'steps': steps, 'group_steps': group_steps, 'unfolded': sorted(unfolded),
+            'complete': complete}
+
+def finish_resonance(phrase: str, core: dict, show_only_prime_resonances: bool) -> ResonanceResult:
+    """
+    Builds the ResonanceResult from a resonance_core: evaluates and unfolds the
+    random ciphers, then the recursive unfolding, prime filter and lexicon samples.
+    """
+    result = ResonanceResult(phrase, show_only_prime_resonances)
+    all_final_unfolded_numbers = set(core['unfolded'])
+    for method_name, method_func in AVAILABLE_GEMATRIA_METHODS_MAP.items():
+        if method_name in RANDOM_GEMATRIA_METHODS:
+            value, error = _evaluate_method(method_func, phrase)
+            step = _unfold_value(method_name, int(value), all_final_unfolded_numbers) if _unfoldable(value) else None
+        else:
+            value, error = core['values'][method_name], core['errors'].get(method_name)
+            step = UnfoldingStep.from_state(core['steps'][method_name]) if method_name in core['steps'] else None
+        result.gematria_values[method_name] = value
+        if error is not None:
+            result.gematria_errors[method_name] = error
+        result.value_masks[method_name] = number_props.property_mask(int(value)) if _is_number(value) and value > 0 else 0
+        if step is not None:
+            result.steps.append(step)
+    result.steps += [UnfoldingStep.from_state(state) for state in core['group_steps']]
+
+    result.initial_number_str = core['initial_number_str']
+    result.initial_number = core['initial_number']
+    result.initial_number_valid = core['initial_number_valid']
+    result.factor_chain = core['factor_chain']
+    result.base36_codes = [to_base36(n) for n in result.factor_chain]
+
+    if UNFOLDING_DEPTH > 1:
+        result.unfolding_dag = unfolding.unfold_dag(all_final_unfolded_numbers, UNFOLDING_DEPTH - 1,
+                                                    UNFOLDING_LEVEL_CAP, UNFOLDING_REQUIRE_MASK)
+        all_final_unfolded_numbers |= result.unfolding_dag.nodes()
+    result.unfolded_count = len(all_final_unfolded_numbers)
+
+    final_numbers = sorted(all_final_unfolded_numbers)
+    final_masks = number_props.property_masks(final_numbers)
     if show_only_prime_resonances:
-        current_final_numbers = {num for num in all_final_unfolded_numbers_for_display if is_prime(num)}
-        _print(f"NOTE: 'Prime Resonances Only' mode is ON. Displaying only {len(current_final_numbers)} prime numbers.")
-    
-    sorted_combined_final_numbers = sorted(list(current_final_numbers))
-    if not sorted_combined_final_numbers:
+        kept = [(num, mask) for num, mask in zip(final_numbers, final_masks) if mask & number_props.PRIME]
+        final_numbers, final_masks = [num for num, _ in kept], [mask for _, mask in kept]
+    result.final_numbers, result.final_masks = final_numbers, final_masks
+
+    for num in final_numbers:
+        if num in LEXICON:
+            # Per-word-count buckets are built at load time; only the k shown phrases are drawn.
+            result.lexicon_resonances[num] = LEXICON.sample(num, DISPLAY_LIMITS)
+    return result
+
+def compute_resonance(phrase: str, show_only_prime_resonances: bool) -> ResonanceResult:
+    """Runs every gematria method, unfolding and lexicon lookup for phrase without formatting any output."""
+    return finish_resonance(phrase, resonance_core(phrase), show_only_prime_resonances)
+
+RESULT_FORMAT_VERSION = 4  # bump whenever resonance_core's output changes shape
+
+def _result_cache_config() -> dict:
+    """Every setting resonance_core's output depends on, plus the lexicon version, for the result cache key."""
+    return {
+        'format': RESULT_FORMAT_VERSION,
+        'methods': [name for name in AVAILABLE_GEMATRIA_METHODS_MAP if name not in RANDOM_GEMATRIA_METHODS],
+        'target_base': TARGET_UNFOLDING_BASE, 'base_conversion': APPLY_BASE_CONVERSION_UNFOLDING,
+        'lexicon': LEXICON_VERSION, 'threshold': UNFOLDING_LARGE_NUMBER_THRESHOLD, 'time_budget': UNFOLDING_TIME_BUDGET,
+    }
+
+_RESULT_CACHE = None
+_RESULT_CACHE_PID = None
+
+def get_result_cache():
+    """This process's connection to RESULT_CACHE_FILE (None when disabled or unavailable)."""
+    global _RESULT_CACHE, _RESULT_CACHE_PID
+    if not USE_RESULT_CACHE:
+        return None
+    if _RESULT_CACHE_PID != os.getpid():
+        # A forked pool worker must not share its parent's SQLite connection.
+        _RESULT_CACHE_PID = os.getpid()
+        _RESULT_CACHE = result_cache.open_cache(RESULT_CACHE_FILE, RESULT_CACHE_MAX_BYTES)
+    return _RESULT_CACHE
+
+def resonance_for(phrase: str, show_only_prime_resonances: bool) -> ResonanceResult:
+    """
+    compute_resonance with resonance_core served from the persistent result
+    cache. The phrase's whitespace is normalised first. The random ciphers and
+    lexicon samples are drawn afresh on every call, cached or not, and a core
+    with a time-limited partial factorization is never stored.
+    """
+    phrase = result_cache.normalize_phrase(phrase)
+    cache = get_result_cache()
+    if cache is None:
+        core = resonance_core(phrase)
+    else:
+        core = cache.get_or_compute('oracle_v12', phrase, _result_cache_config(), lambda: resonance_core(phrase),
+                                    keep=lambda core: core['complete'])
+    return finish_resonance(phrase, core, show_only_prime_resonances)
+
+# ==============================================================================
+# RENDERERS
+# ==============================================================================
+def _value_tag(result: ResonanceResult, method_name: str) -> str:
+    return number_props.tag_for_mask(result.value_masks.get(method_name, 0))
+
+def _shown_phrases(details: dict) -> list:
+    return [p for bucket in lexicon_index.WORD_COUNT_BUCKETS for p in details[bucket]]
+
+def _render_step_console(step: UnfoldingStep, _print):
+    if step.status == 'unformable':
+        _print(f"\n--- Cosmic Unfolding ({step.label}) ---")
+        _print(f"  Could not form a valid number from values: {step.source_values}")
+        return
+    _print(print_header(f"Cosmic Unfolding ({step.label})"))
+    if step.warning:
+        _print(f"  Warning: {step.warning}")
+    if step.status == 'ok':
+        if not step.chain: _print(f"  No factorization chain generated for '{step.display_label}'.")
+        else:
+            factoring = step.factoring
+            timing = f" [{factoring.timing()}]" if factoring.method != 'table' else ""
+            _print(f"  Unfolding '{step.display_label}':{timing}")
+            for i, num in enumerate(step.chain): _print(f"    Step {i+1}: {num}  ->  Base36: {step.base36_codes[i]}")
+            if not factoring.complete:
+                _print(f"    Time budget reached; left unsplit: {', '.join(str(n) for n in factoring.leftover)}")
+    elif step.status == 'too_large':
+        _print(f"  Value ({step.value}) for '{step.display_label}' is too large for unfolding (threshold: {UNFOLDING_LARGE_NUMBER_THRESHOLD}).")
+    else:
+        _print(f"  No valid number to unfold for '{step.display_label}' or invalid after conversion.")
+
+def render_console(result: ResonanceResult) -> str:
+    """The full console report process_phrase has always printed."""
+    capture = CaptureOutput()
+    _print = capture.write
+    _print(print_header(f"Resonance for: {result.phrase}"))
+    for method_name, value in result.gematria_values.items():
+        if method_name in result.gematria_errors:
+            _print(f"  Error calculating {method_name.ljust(30)}: {result.gematria_errors[method_name]}")
+        else:
+            _print(f"  {method_name.ljust(30)}: {value} {_value_tag(result, method_name)}")
+    if not result.initial_number_valid:
+        _print("Warning: Could not form a valid initial number from core gematria values (too large or invalid).")
+
+    _print(print_header("Initial Number"))
+    _print(f"  Concatenated Value: {result.initial_number_str}")
+    for step in result.steps:
+        _render_step_console(step, _print)
+
+    if result.unfolding_dag is not None:
+        _print(print_header(f"Recursive Unfolding (depth {UNFOLDING_DEPTH})"))
+        for line in unfolding.format_dag(result.unfolding_dag): _print(line)
+
+    _print(print_header("FINAL COMBINED RESONANCE SEQUENCE"))
+    if result.show_only_prime_resonances:
+        _print(f"NOTE: 'Prime Resonances Only' mode is ON. Displaying only {len(result.final_numbers)} prime numbers.")
+    if not result.final_numbers:
         _print("  No final resonance numbers generated from all combined unfoldings.")
     else:
         output_lines = []
         current_line = "  "
-        for num in sorted_combined_final_numbers:
-            tags = []
-            if is_prime(num): tags.append("P")
-            if is_perfect_square(num): tags.append("S")
-            if is_palindrome(num): tags.append("A")
-            tag_str = f"[{''.join(tags)}]" if tags else ""
-            num_str = f"{num}{tag_str} "
+        for num, mask in zip(result.final_numbers, result.final_masks):
+            num_str = f"{num}{number_props.tag_for_mask(mask)} "
             if len(current_line) + len(num_str) > 58: output_lines.append(current_line); current_line = "  "
             current_line += num_str
         output_lines.append(current_line)
         for line in output_lines: _print(line)
-        _print("\n  [P]rime, [S]quare, P[A]lindrome")
-    
-    lexicon_resonances_details = {}
+        _print(f"\n  {number_props.TAG_LEGEND}")
+
     _print(print_header("LEXICON RESONANCES (for Combined Final Sequence)"))
-    found_any_resonance = False
-    for num in sorted_combined_final_numbers:
-        if show_only_prime_resonances and not is_prime(num):
-            continue
-        if num in LEXICON:
-            found_any_resonance = True
-            phrases_for_num = list(set(LEXICON[num]))
-            random.shuffle(phrases_for_num)
-            selected_phrases_for_display = []
-            single_words_for_clipboard = []
-            two_word_phrases_for_clipboard = []
-            three_word_phrases_for_clipboard = []
-            four_five_word_phrases_for_clipboard = []
-            for p in phrases_for_num:
-                word_count = len(p.split())
-                if word_count == 1 and len(single_words_for_clipboard) < DISPLAY_LIMITS['single_words']:
-                    selected_phrases_for_display.append(p)
-                    single_words_for_clipboard.append(p)
-                elif word_count == 2 and len(two_word_phrases_for_clipboard) < DISPLAY_LIMITS['two_word_phrases']:
-                    selected_phrases_for_display.append(p)
-                    two_word_phrases_for_clipboard.append(p)
-                elif word_count == 3 and len(three_word_phrases_for_clipboard) < DISPLAY_LIMITS['three_word_phrases']:
-                    selected_phrases_for_display.append(p)
-                    three_word_phrases_for_clipboard.append(p)
-                elif 4 <= word_count <= 5 and len(four_five_word_phrases_for_clipboard) < DISPLAY_LIMITS['four_five_word_phrases']:
-                    selected_phrases_for_display.append(p)
-                    four_five_word_phrases_for_clipboard.append(p)
-            lexicon_resonances_details[num] = {
-                'single_words': single_words_for_clipboard,
-                'two_word_phrases': two_word_phrases_for_clipboard,
-                'three_word_phrases': three_word_phrases_for_clipboard,
-                'four_five_word_phrases': four_five_word_phrases_for_clipboard
-            }
-            if selected_phrases_for_display:
-                _print(f"  {num} {', '.join(selected_phrases_for_display)}")
-            else:
-                _print(f"  {num} No phrases found.")
-    if not found_any_resonance:
+    for num, details in result.lexicon_resonances.items():
+        selected_phrases_for_display = _shown_phrases(details)
+        if selected_phrases_for_display:
+            _print(f"  {num} {', '.join(selected_phrases_for_display)}")
+        else:
+            _print(f"  {num} No phrases found.")
+    if not result.lexicon_resonances:
         _print("  No resonances found in the loaded lexicon for this sequence.")
-    
-    return {
-        'phrase': phrase,
-        'gematria_values': calculated_gematria_values,
-        'initial_number_str': initial_number_str,
-        'initial_number_original_val': initial_number,
-        'factor_chain': get_factorization_chain(initial_number),
-        'base36_codes': [to_base36(n) for n in get_factorization_chain(initial_number)],
-        'final_numbers': sorted_combined_final_numbers,
-        'lexicon_resonances_details': lexicon_resonances_details
-    }
+    return capture.get_output()
 
-def format_output_for_clipboard(data: dict) -> str:
+def format_output_for_clipboard(result: ResonanceResult) -> str:
     output = []
-    output.append(f"Phrase: {data['phrase']}")
+    output.append(f"Phrase: {result.phrase}")
     output.append("Gematria Values:")
-    for key, value in data['gematria_values'].items():
-        tags = []
-        if isinstance(value, (int, float)) and value > 0:
-            if is_prime(int(value)): tags.append("P")
-            if is_perfect_square(int(value)): tags.append("S")
-            if is_palindrome(int(value)): tags.append("A")
-        tag_str = f"[{''.join(tags)}]" if tags else ""
-        output.append(f"  {key.replace('_', ' ').title()}: {value} {tag_str}")
+    for key, value in result.gematria_values.items():
+        output.append(f"  {key.replace('_', ' ').title()}: {value} {_value_tag(result, key)}")
     output.append("")
-    output.append(f"Initial Concatenated Value: {data['initial_number_str']}")
+    output.append(f"Initial Concatenated Value: {result.initial_number_str}")
     output.append("")
     output.append("Cosmic Unfolding:")
-    if not data['factor_chain']:
+    if not result.factor_chain:
         output.append("  No factorization chain.")
     else:
-        for i, num in enumerate(data['factor_chain']):
-            output.append(f"  Step {i+1}: {num} -> Base36: {data['base36_codes'][i]}")
+        for i, num in enumerate(result.factor_chain):
+            output.append(f"  Step {i+1}: {num} -> Base36: {result.base36_codes[i]}")
     output.append("")
     output.append("Final Resonance Sequence:")
-    if not data['final_numbers']:
+    if not result.final_numbers:
         output.append("  No final resonance numbers.")
     else:
-        num_strs = []
-        for num in data['final_numbers']:
-            tags = []
-            if is_prime(num): tags.append("P")
-            if is_perfect_square(num): tags.append("S")
-            if is_palindrome(num): tags.append("A")
-            tag_str = f"[{''.join(tags)}]" if tags else ""
-            num_strs.append(f"{num}{tag_str}")
+        num_strs = [f"{num}{number_props.tag_for_mask(mask)}" for num, mask in zip(result.final_numbers, result.final_masks)]
         output.append("  " + ", ".join(num_strs))
-        output.append("  [P]rime, [S]quare, P[A]lindrome")
+        output.append(f"  {number_props.TAG_LEGEND}")
     output.append("")
-    if data['lexicon_resonances_details']:
+    if result.lexicon_resonances:
         output.append("Lexicon Resonances:")
-        for num in sorted(data['lexicon_resonances_details'].keys()):
-            details = data['lexicon_resonances_details'][num]
-            all_phrases_for_num = []
-            if details['single_words']:
-                all_phrases_for_num.extend(details['single_words'])
-            if details['two_word_phrases']:
-                all_phrases_for_num.extend(details['two_word_phrases'])
-            if details['three_word_phrases']:
-                all_phrases_for_num.extend(details['three_word_phrases'])
-            if details['four_five_word_phrases']:
-                all_phrases_for_num.extend(details['four_five_word_phrases'])
+        for num in sorted(result.lexicon_resonances):
+            all_phrases_for_num = _shown_phrases(result.lexicon_resonances[num])
             if all_phrases_for_num:
-                output.append(f"  {num}: {', '.join(f'\"{p}\"' for p in all_phrases_for_num)}")
+                quoted = ', '.join('"' + p + '"' for p in all_phrases_for_num)
+                output.append(f"  {num}: {quoted}")
         output.append("")
     return "\n".join(output)
 
+def render_json(result: ResonanceResult) -> str:
+    return json.dumps(result.to_dict(), ensure_ascii=False)
+
+def render_markdown(result: ResonanceResult) -> str:
+    output = [f"## Resonance for: {result.phrase}", "", "| Method | Value | Tags |", "| --- | --- | --- |"]
+    for method_name, value in result.gematria_values.items():
+        shown = f"Error: {result.gematria_errors[method_name]}" if method_name in result.gematria_errors else value
+        output.append(f"| {method_name} | {shown} | {_value_tag(result, method_name)} |")
+    output += ["", f"**Initial concatenated value:** `{result.initial_number_str}`", "", "### Cosmic Unfolding", ""]
+    for step in result.steps:
+        if step.status == 'ok' and step.chain:
+            chain = " → ".join(f"{num} (`{code}`)" for num, code in zip(step.chain, step.base36_codes))
+            output.append(f"- **{step.display_label}**: {chain}")
+        elif step.status == 'too_large':
+            output.append(f"- **{step.display_label}**: too large to unfold ({step.value})")
+        elif step.status == 'unformable':
+            output.append(f"- **{step.label}**: could not form a number from `{step.source_values}`")
+    if result.unfolding_dag is not None:
+        output += ["", f"### Recursive Unfolding (depth {UNFOLDING_DEPTH})", "", "```"]
+        output += unfolding.format_dag(result.unfolding_dag)
+        output.append("```")
+    output += ["", "### Final Resonance Sequence", ""]
+    if result.final_numbers:
+        output.append(", ".join(f"{num}{number_props.tag_for_mask(mask)}" for num, mask in zip(result.final_numbers, result.final_masks)))
+        output += ["", f"_{number_props.TAG_LEGEND}_"]
+    else:
+        output.append("_No final resonance numbers._")
+    if result.lexicon_resonances:
+        output += ["", "### Lexicon Resonances", ""]
+        for num, details in result.lexicon_resonances.items():
+            phrases = _shown_phrases(details)
+            if phrases:
+                output.append(f"- **{num}**: {', '.join(phrases)}")
+    output.append("")
+    return "\n".join(output)
+
+RENDERERS = {'console': render_console, 'clipboard': format_output_for_clipboard, 'json': render_json, 'markdown': render_markdown}
+
+def process_phrase(phrase: str, capture_output_obj: CaptureOutput, show_only_prime_resonances: bool) -> ResonanceResult:
+    result = resonance_for(phrase, show_only_prime_resonances)
+    capture_output_obj.write(render_console(result))
+    return result
+
+# ==============================================================================
+# INTERACTIVE SESSION
+# ==============================================================================
 def process_file(filepath: str, show_only_prime_resonances: bool):
     captured_output = CaptureOutput()
     all_processed_data = []
@@ -821,11 +1000,11 @@ def process_file(filepath: str, show_only_prime_resonances: bool):
         for i, phrase in enumerate(phrases):
             processed_data = process_phrase(phrase, captured_output, show_only_prime_resonances)
             all_processed_data.append(processed_data)
-            if processed_data['final_numbers']:
+            if processed_data.final_numbers:
                 while True:
                     save_choice = input(f"\nDo you want to save '{phrase}' and its resonant numbers to your personal database? (yes/no): ").strip().lower()
                     if save_choice == 'yes':
-                        save_resonant_phrase_to_user_db(phrase, set(processed_data['final_numbers']), USER_ADDITIONS_FILE)
+                        save_resonant_phrase_to_user_db(phrase, set(processed_data.final_numbers), USER_ADDITIONS_FILE)
                         break
                     elif save_choice == 'no':
                         _print_to_console("Skipping save for this phrase.")
@@ -842,8 +1021,122 @@ def process_file(filepath: str, show_only_prime_resonances: bool):
         _print_to_console(f"\nAn error occurred while reading the file: {e}")
         return "", []
 
+# ==============================================================================
+# BATCH MODE
+# ==============================================================================
+# --save policies for --batch: never, every phrase with final numbers (like
+# answering 'yes' to every prompt), or only phrases that hit the lexicon.
+SAVE_POLICIES = ('never', 'all', 'resonant')
+BATCH_CHUNK_SIZE = 64  # phrases per pool task
+BATCH_PROGRESS_EVERY = 1000
+
+def _init_batch_worker(display_limits: dict):
+    """
+    Pool initializer. Forked workers inherit the parent's loaded LEXICON (a
+    compiled index stays one shared mapping); spawned workers load it themselves.
+    """
+    DISPLAY_LIMITS.update(display_limits)
+    random.seed()  # forked workers would otherwise all draw the same phrase samples
+    if not len(LEXICON):
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_lexicon(MAIN_DB_DIR, USER_ADDITIONS_FILE)
+
+def _batch_chunk(chunk, show_only_prime_resonances: bool) -> list:
+    """
+    Computes a chunk of (line number, phrase). Returns (line, phrase, JSON
+    record, final numbers or None on error, lexicon hit, served from cache)
+    per phrase.
+    """
+    out = []
+    cache = get_result_cache()
+    for line_no, phrase in chunk:
+        hits_before = cache.hits if cache is not None else 0
+        try:
+            result = resonance_for(phrase, show_only_prime_resonances)
+        except Exception as e:
+            record = json.dumps({'line': line_no, 'phrase': phrase, 'error': str(e)}, ensure_ascii=False)
+            out.append((line_no, phrase, record, None, False, False))
+            continue
+        cached = cache is not None and cache.hits > hits_before
+        data = result.to_dict()
+        data['line'] = line_no
+        data['cached'] = cached
+        out.append((line_no, phrase, json.dumps(data, ensure_ascii=False), result.final_numbers,
+                    bool(result.lexicon_resonances), cached))
+    if cache is not None:
+        cache.flush()
+    return out
+
+def iter_batch_results(numbered_phrases, show_only_prime_resonances: bool, workers: int = 1, chunk_size: int = BATCH_CHUNK_SIZE):
+    """
+    Yields _batch_chunk rows in input order. With workers > 1 chunks run in a
+    process pool with at most two chunks per worker in flight, so any input
+    size streams through in bounded memory.
+    """
+    numbered_phrases = iter(numbered_phrases)
+    chunks = iter(lambda: list(itertools.islice(numbered_phrases, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _batch_chunk(chunk, show_only_prime_resonances)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(dict(DISPLAY_LIMITS),)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_batch_chunk, chunk, show_only_prime_resonances))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def run_batch(input_path: str, out_path: str, workers: int = 1, save_policy: str = 'never', show_only_prime_resonances: bool = False) -> dict:
+    """Streams one JSON record per phrase of input_path into out_path and applies save_policy instead of prompting."""
+    stats = {'phrases': 0, 'errors': 0, 'cached': 0, 'saved_phrases': 0, 'saved_entries': 0}
+    started = time.perf_counter()
+    with open(input_path, 'r', encoding='utf-8') as src, open(out_path, 'w', encoding='utf-8') as out:
+        numbered = ((i, line.strip()) for i, line in enumerate(src, 1) if line.strip())
+        for line_no, phrase, record, final_numbers, resonant, cached in iter_batch_results(numbered, show_only_prime_resonances, workers):
+            out.write(record + "\n")
+            stats['phrases'] += 1
+            stats['cached'] += cached
+            if final_numbers is None:
+                stats['errors'] += 1
+            if final_numbers and (save_policy == 'all' or (save_policy == 'resonant' and resonant)):
+                added = save_resonant_phrase_to_user_db(phrase, set(final_numbers), USER_ADDITIONS_FILE, verbose=False)
+                stats['saved_phrases'] += added > 0
+                stats['saved_entries'] += added
+            if stats['phrases'] % BATCH_PROGRESS_EVERY == 0:
+                out.flush()
+                elapsed = time.perf_counter() - started
+                print(f"[{stats['phrases']}] {stats['phrases'] / elapsed:.1f} phrases/s")
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gematria Resonator. Interactive by default; --batch runs headless.")
+    parser.add_argument('--batch', metavar='INPUT', help="File of phrases, one per line, to process without prompts.")
+    parser.add_argument('--out', help="JSONL results for --batch (default: INPUT.results.jsonl).")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for --batch (default: 1).")
+    parser.add_argument('--save', choices=SAVE_POLICIES, default='never',
+                        help="Save phrases to the user additions file: never, all, or only those with lexicon resonances.")
+    parser.add_argument('--prime-only', action='store_true', help="Keep only prime numbers in --batch final sequences.")
+    return parser.parse_args(argv)
+
 def main():
     global SHOW_ONLY_PRIME_RESONANCES, DISPLAY_LIMITS
+    args = parse_args()
+    if args.batch:
+        if not os.path.isfile(args.batch):
+            print(f"Error: Batch input '{args.batch}' not found.", file=sys.stderr)
+            sys.exit(1)
+        out_path = args.out or args.batch + ".results.jsonl"
+        load_lexicon(MAIN_DB_DIR, USER_ADDITIONS_FILE)
+        stats = run_batch(args.batch, out_path, max(args.workers, 1), args.save, args.prime_only)
+        print(f"Processed {stats['phrases']} phrases into '{out_path}' in {stats['seconds']:.1f}s "
+              f"({stats['phrases'] / max(stats['seconds'], 1e-9):.1f} phrases/s, {stats['errors']} errors, "
+              f"{stats['cached']} from the result cache).")
+        if args.save != 'never':
+            print(f"Saved {stats['saved_entries']} new entries for {stats['saved_phrases']} phrases to '{USER_ADDITIONS_FILE}'.")
+        return
     print(" Gematria Resonator Initialized ".center(60, "*"))
     load_lexicon(MAIN_DB_DIR, USER_ADDITIONS_FILE)
     while True:
@@ -878,6 +1171,10 @@ def main():
     while True:
         user_input = input("\nEnter phrase or filepath > ")
         if user_input.lower() in ['exit', 'quit']:
+            cache = get_result_cache()
+            if cache is not None:
+                print(result_cache.format_stats(cache.stats()))
+                cache.close()
             print("Deactivating Resonator. Goodbye, Beans.")
             break
         if not user_input:
@@ -896,7 +1193,7 @@ def main():
             if processed_data_list:
                 clipboard_parts = []
                 for data_item in processed_data_list:
-                    clipboard_parts.append(format_output_for_clipboard(data_item))
+                    clipboard_parts.append(RENDERERS[CLIPBOARD_FORMAT](data_item))
                     clipboard_parts.append("\n" + "-" * 60 + "\n")
                 clipboard_formatted_text = "".join(clipboard_parts).strip()
                 while True:
@@ -914,11 +1211,11 @@ def main():
             console_output_text = phrase_output_capture.get_output()
             processed_data_list.append(processed_data)
             print(console_output_text)
-            if processed_data['final_numbers']:
+            if processed_data.final_numbers:
                 while True:
                     save_choice = input("\nDo you want to save this phrase and its resonant numbers to your personal database? (yes/no): ").strip().lower()
                     if save_choice == 'yes':
-                        save_resonant_phrase_to_user_db(user_input, set(processed_data['final_numbers']), USER_ADDITIONS_FILE)
+                        save_resonant_phrase_to_user_db(user_input, set(processed_data.final_numbers), USER_ADDITIONS_FILE)
                         break
                     elif save_choice == 'no':
                         print("Skipping save.")
@@ -926,7 +1223,7 @@ def main():
                     else:
                         print("Invalid choice. Please enter 'yes' or 'no'.")
             if processed_data_list:
-                clipboard_formatted_text = format_output_for_clipboard(processed_data_list[0])
+                clipboard_formatted_text = RENDERERS[CLIPBOARD_FORMAT](processed_data_list[0])
                 while True:
                     copy_phrase_output_choice = input("Copy this phrase's formatted output to clipboard? (yes/no): ").strip().lower()
                     if copy_phrase_output_choice == 'yes':
@@ -1,9 +1,12 @@
 import math
 import os
-from collections import defaultdict
 import pyperclip
 import random
 
+import factorization
+import lexicon_index
+import number_props
+
 # ==============================================================================
 # GLOBAL CONFIGURATION & LEXICON
 # ==============================================================================
@@ -12,9 +15,13 @@ MAIN_DB_DIR = "/Users/lydiaparker/The_Oracle/txt_db"
 # Define the absolute path for the user-added entries file
 USER_ADDITIONS_FILE = "/Users/lydiaparker/The_Oracle/user_gematria_additions.txt"
 
-# This dictionary will store the loaded resonances from all files.
-# The key is the number, and the value is a list of phrases.
-LEXICON = defaultdict(list)
+# Compiled lexicon index, built with `python lexicon_index.py compile-lexicon`
+LEXICON_INDEX_FILE = "/Users/lydiaparker/The_Oracle/lexicon.gidx"
+
+# This will store the loaded resonances from all files.
+# LEXICON[number] is a list of phrases.
+LEXICON = lexicon_index.Lexicon()
+USER_ADDITIONS = set()  # (value, phrase) pairs already in the user additions file
 
 # Default limits for display - these will be user-configurable at startup
 DISPLAY_LIMITS = {
@@ -79,34 +86,8 @@ def boundary_resonance_gematria(text: str) -> int:
 # NUMERICAL & CONVERSION FUNCTIONS (from resonatorv1.py)
 # ==============================================================================
 
-def get_factorization_chain(n: int) -> list[int]:
-    """Generates the prime factorization chain for a given integer."""
-    if n <= 0:
-        return []
-    chain = {n}
-    current_num = n
-    
-    # Handle factors of 2 and 3 efficiently
-    for factor in [2, 3]:
-        while current_num % factor == 0:
-            current_num //= factor
-            if current_num > 1: # Avoid adding 1 unless it's the final result
-                chain.add(current_num)
-
-    # Check for other prime factors
-    i = 5
-    while i * i <= current_num:
-        for step in [i, i + 2]: # Optimized for primes (6k +/- 1)
-             while current_num % step == 0:
-                current_num //= step
-                if current_num > 1:
-                    chain.add(current_num)
-        i += 6
-        
-    if current_num > 1: # If current_num is still a prime greater than 1
-        chain.add(current_num)
-        
-    return sorted(list(chain), reverse=True)
+# Generates the prime factorization chain for a given integer (SPF table + memoised chains).
+get_factorization_chain = factorization.get_factorization_chain
 
 
 def to_base36(n: int) -> str:
@@ -141,31 +122,10 @@ def decode_base36_pairs(b36_string: str) -> list[int]:
 # NUMBER ANALYSIS FUNCTIONS (from resonatorv1.py)
 # ==============================================================================
 
-def is_prime(n: int) -> bool:
-    """Checks if a number is prime."""
-    if n <= 1:
-        return False
-    if n <= 3: # 2 and 3 are prime
-        return True
-    if n % 2 == 0 or n % 3 == 0: # Multiples of 2 or 3 are not prime
-        return False
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0:
-            return False
-        i += 6
-    return True
-
-def is_perfect_square(n: int) -> bool:
-    """Checks if a number is a perfect square."""
-    if n < 0:
-        return False
-    sqrt_n = int(math.sqrt(n))
-    return sqrt_n * sqrt_n == n
-
-def is_palindrome(n: int) -> bool:
-    """Checks if a number is a palindrome."""
-    return str(n) == str(n)[::-1]
+# Prime / square / palindrome checks come from the shared sieve-backed property table.
+is_prime = number_props.is_prime
+is_perfect_square = number_props.is_perfect_square
+is_palindrome = number_props.is_palindrome
 
 # ==============================================================================
 # MAIN APPLICATION LOGIC
@@ -204,83 +164,42 @@ def print_header(title):
 def load_lexicon(main_db_dir: str, user_additions_file: str):
     """
     Loads a gematria lexicon from main .txt files and user additions file.
-    Updates the global LEXICON dictionary.
+    Uses the compiled index when it is up to date, otherwise parses the text files.
+    Updates the global LEXICON.
     """
     LEXICON.clear() # Clear existing lexicon before loading new data
     
     print(f"Building Gematria lookup database from files in '{main_db_dir}' and '{user_additions_file}'...")
     
-    files_found_main = 0
     entries_from_user_file = 0
-    words_file_entries = 0
 
     # --- Process main database files ---
     if not os.path.isdir(main_db_dir):
         print(f"\nERROR: The main database directory '{main_db_dir}' does not exist.")
         print("Please double-check the path to your 'txt_db' folder.")
     else:
-        for root, dirs, files in os.walk(main_db_dir):
-            for file in files:
-                if file.lower() == 'words.txt': # Check specifically for words.txt
-                    filepath = os.path.join(root, file)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            for line in f:
-                                line = line.strip()
-                                if not line: continue
-                                parts = line.split(':')
-                                if len(parts) >= 2: # At least word:value1
-                                    phrase = parts[0].strip()
-                                    for value_str in parts[1:]:
-                                        try:
-                                            value = int(value_str.strip())
-                                            LEXICON[value].append(phrase)
-                                            words_file_entries += 1
-                                        except ValueError:
-                                            pass # Skip malformed values
-                    except Exception as e:
-                        print(f"    --- Could not process words file {filepath}: {e}")
-                elif file.endswith(".txt"): # Other .txt files in main_db_dir
-                    files_found_main += 1
-                    filepath = os.path.join(root, file)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            for line in f:
-                                parts = line.strip().split('|')
-                                if len(parts) == 3: # Expected format: filepath|phrase|value
-                                    phrase, value_str = parts[1], parts[2]
-                                    try:
-                                        value = int(value_str)
-                                        LEXICON[value].append(phrase.strip())
-                                    except ValueError:
-                                        pass # Skip malformed values
-                                else:
-                                    pass # Skip malformed lines
-                    except Exception as e:
-                        print(f"    --- Could not process main DB file {filepath}: {e}")
-        
-        if files_found_main == 0 and words_file_entries == 0:
-            print(f"WARNING: No '.txt' files were found in the main database directory '{main_db_dir}'.")
+        index = lexicon_index.open_index(LEXICON_INDEX_FILE, main_db_dir)
+        if index is not None: # Memory-mapped, nothing is parsed up front
+            LEXICON.attach(index)
+            print(f"Opened compiled lexicon '{LEXICON_INDEX_FILE}' ({len(index)} numbers, {index.n_phrases} phrases).")
         else:
-            print(f"Processed {files_found_main} main database file(s) and {words_file_entries} entries from words.txt.")
+            print(f"Parsing text files; run `python lexicon_index.py compile-lexicon {main_db_dir} {LEXICON_INDEX_FILE}` for instant startup.")
+            stats = {}
+            LEXICON.load_entries(lexicon_index.iter_source_entries(main_db_dir, stats))
+            if stats['main_files'] == 0 and stats['words_file_entries'] == 0:
+                print(f"WARNING: No '.txt' files were found in the main database directory '{main_db_dir}'.")
+            else:
+                print(f"Processed {stats['main_files']} main database file(s) and {stats['words_file_entries']} entries from words.txt.")
 
     # --- Process user additions file ---
+    USER_ADDITIONS.clear()
     if os.path.exists(user_additions_file):
         try:
-            with open(user_additions_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    parts = line.strip().split('|')
-                    # User-added file format: phrase|value (no filepath needed)
-                    if len(parts) == 2: 
-                        phrase = parts[0]
-                        try:
-                            value = int(parts[1])
-                            LEXICON[value].append(phrase.strip())
-                            entries_from_user_file += 1
-                        except ValueError:
-                            pass # Skip malformed values
-                    else:
-                        pass # Skip malformed lines
+            # User-added file format: phrase|value (no filepath needed)
+            for value, phrase in lexicon_index.iter_user_entries(user_additions_file):
+                LEXICON.add(value, phrase)
+                USER_ADDITIONS.add((value, phrase))
+                entries_from_user_file += 1
         except Exception as e:
             print(f"    --- Could not process user additions file {user_additions_file}: {e}")
         
@@ -288,33 +207,35 @@ def load_lexicon(main_db_dir: str, user_additions_file: str):
     else:
         print(f"No existing user additions file found at '{user_additions_file}'. A new one will be created when you save entries.")
 
-    # Count unique phrases for total loaded
-    total_unique_phrases = len(set(p for val_list in LEXICON.values() for p in val_list))
-    print(f"Total {total_unique_phrases} unique phrases loaded across {len(LEXICON)} numbers.")
+    print(f"Total {LEXICON.unique_phrase_count()} unique phrases loaded across {len(LEXICON)} numbers.")
+    print(lexicon_index.format_memory_report(LEXICON.memory_report()))
     print("Database build complete.")
 
 
 def save_resonant_phrase_to_user_db(original_phrase: str, resonant_numbers: set, user_additions_file: str):
     """
     Saves the original phrase paired with each of its resonant numbers
-    to the user additions file.
+    to the user additions file. Numbers it is already saved under in that
+    file are skipped.
     """
     if not original_phrase or not resonant_numbers:
         print("Cannot save empty phrase or no resonant numbers.")
         return
 
     print(f"Saving '{original_phrase}' and its resonances to '{user_additions_file}'...")
+    # Only pairs not already in the additions file get appended; pairs that are
+    # only in the main database are still written, as before
+    new_numbers = [num for num in sorted(resonant_numbers) if (num, original_phrase) not in USER_ADDITIONS]
+    for num in new_numbers:
+        LEXICON.add(num, original_phrase)
+        USER_ADDITIONS.add((num, original_phrase))
+    if not new_numbers:
+        print(f"'{original_phrase}' is already saved for all of these numbers.")
+        return
     try:
         with open(user_additions_file, 'a', encoding='utf-8') as f: # 'a' for append mode
-            saved_count = 0
-            for num in sorted(list(resonant_numbers)): # Sort for consistent saving
-                entry_line = f"{original_phrase}|{num}\n"
-                f.write(entry_line)
-                saved_count += 1
-                # Also add to the in-memory lexicon for immediate use, preventing display duplicates here
-                if original_phrase not in LEXICON[num]: # Only add if not already associated with this number in current session
-                     LEXICON[num].append(original_phrase)
-        print(f"Successfully saved {saved_count} new entries for '{original_phrase}'.")
+            f.writelines(f"{original_phrase}|{num}\n" for num in new_numbers)
+        print(f"Successfully saved {len(new_numbers)} new entries for '{original_phrase}'.")
     except Exception as e:
         print(f"ERROR: Could not save entries to file {user_additions_file}: {e}")
         print("Entries were added to the current session's database, but might not be saved permanently.")
@@ -382,14 +303,9 @@ def process_phrase(phrase: str, capture_output_obj: CaptureOutput):
     else:
         output_lines = []
         current_line = "  "
-        for num in sorted_current_final_numbers:
-            tags = []
-            if is_prime(num): tags.append("P")
-            if is_perfect_square(num): tags.append("S")
-            if is_palindrome(num): tags.append("A") # A for 'drome' in palindrome
-            
-            tag_str = f"[{''.join(tags)}]" if tags else ""
-            num_str = f"{num}{tag_str} "
+        masks = number_props.property_masks(sorted_current_final_numbers) # One table lookup per number
+        for num, mask in zip(sorted_current_final_numbers, masks):
+            num_str = f"{num}{number_props.tag_for_mask(mask)} "
             
             if len(current_line) + len(num_str) > 58: # Line wrap
                 output_lines.append(current_line)
@@ -409,41 +325,11 @@ def process_phrase(phrase: str, capture_output_obj: CaptureOutput):
         for num in sorted_current_final_numbers: # <--- IMPORTANT: Iterate over the potentially filtered numbers
             if num in LEXICON:
                 found_any_resonance = True
-                # Get unique phrases for current number, then SHUFFLE them for randomness
-                phrases_for_num = list(set(LEXICON[num])) 
-                random.shuffle(phrases_for_num) # Shuffle the list
-
-                selected_phrases_for_display = []
-
-                # Temporary lists for storing for clipboard details
-                single_words_for_clipboard = []
-                two_word_phrases_for_clipboard = []
-                three_word_phrases_for_clipboard = []
-                four_five_word_phrases_for_clipboard = []
-
-
-                for p in phrases_for_num: # Iterate through shuffled list
-                    word_count = len(p.split())
-                    if word_count == 1 and len(single_words_for_clipboard) < DISPLAY_LIMITS['single_words']:
-                        selected_phrases_for_display.append(p)
-                        single_words_for_clipboard.append(p)
-                    elif word_count == 2 and len(two_word_phrases_for_clipboard) < DISPLAY_LIMITS['two_word_phrases']:
-                        selected_phrases_for_display.append(p)
-                        two_word_phrases_for_clipboard.append(p)
-                    elif word_count == 3 and len(three_word_phrases_for_clipboard) < DISPLAY_LIMITS['three_word_phrases']:
-                        selected_phrases_for_display.append(p)
-                        three_word_phrases_for_clipboard.append(p)
-                    elif 4 <= word_count <= 5 and len(four_five_word_phrases_for_clipboard) < DISPLAY_LIMITS['four_five_word_phrases']:
-                        selected_phrases_for_display.append(p)
-                        four_five_word_phrases_for_clipboard.append(p)
-                
+                # Draw up to DISPLAY_LIMITS random phrases from each word-count bucket (built at load time)
                 # Store for clipboard output (only the ones picked based on limits)
-                lexicon_resonances_details[num] = {
-                    'single_words': single_words_for_clipboard,
-                    'two_word_phrases': two_word_phrases_for_clipboard,
-                    'three_word_phrases': three_word_phrases_for_clipboard,
-                    'four_five_word_phrases': four_five_word_phrases_for_clipboard
-                }
+                lexicon_resonances_details[num] = LEXICON.sample(num, DISPLAY_LIMITS)
+                selected_phrases_for_display = [p for bucket in lexicon_index.WORD_COUNT_BUCKETS
+                                                for p in lexicon_resonances_details[num][bucket]]
 
                 # CONSOLE DISPLAY FORMAT: Number Phrases,Phrases,Phrases
                 if selected_phrases_for_display:
@@ -499,14 +385,8 @@ def format_output_for_clipboard(data: dict) -> str:
     if not data['final_numbers']:
         output.append("  No final resonance numbers.")
     else:
-        num_strs = []
-        for num in data['final_numbers']:
-            tags = []
-            if is_prime(num): tags.append("P")
-            if is_perfect_square(num): tags.append("S")
-            if is_palindrome(num): tags.append("A")
-            tag_str = f"[{''.join(tags)}]" if tags else ""
-            num_strs.append(f"{num}{tag_str}")
+        masks = number_props.property_masks(data['final_numbers'])
+        num_strs = [f"{num}{number_props.tag_for_mask(mask)}" for num, mask in zip(data['final_numbers'], masks)]
         output.append("  " + ", ".join(num_strs))
         output.append("  [P]rime, [S]quare, P[A]lindrome")
     output.append("")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# cipher_engine.py
+# Vectorized batch evaluation of table-driven gematria ciphers.
+#
+# Every letter-map cipher in the Oracle scripts (simple, jewish, chaldean,
+# sumerian, ...) is "look each letter up in a 26-entry table and add the
+# results". Instead of running a Python generator per word, the corpus is
+# encoded once as a uint8 letter array and every cipher becomes a table
+# lookup followed by a segmented (per-word) sum over that array.
+import numpy as np
+
+from gematria_tables import LETTER_TABLES
+
+NON_LETTER_CODE = 26  # Code given to every byte that is not A-Z / a-z.
+
+# ==============================================================================
+# SECTION 1: LETTER CODES
+# ==============================================================================
+
+# Byte -> letter code (A-Z and a-z both map to 0..25, everything else to 26).
+_BYTE_TO_CODE = np.full(256, NON_LETTER_CODE, dtype=np.uint8)
+for _i in range(26):
+    _BYTE_TO_CODE[ord('A') + _i] = _i
+    _BYTE_TO_CODE[ord('a') + _i] = _i
+
+# ==============================================================================
+# SECTION 2: CORPUS ENCODING
+# ==============================================================================
+
+class EncodedCorpus:
+    """A list of words stored as one uint8 letter-code array plus word boundaries."""
+
+    def __init__(self, codes: np.ndarray, bounds: np.ndarray):
+        self.codes = codes    # uint8 letter codes, NON_LETTER_CODE for anything else
+        self.bounds = bounds  # int64, len(words) + 1 offsets into codes
+
+    def __len__(self):
+        return len(self.bounds) - 1
+
+    def lengths(self) -> np.ndarray:
+        """Number of A-Z letters in each word."""
+        is_letter = np.concatenate(([0], np.cumsum(self.codes != NON_LETTER_CODE, dtype=np.int64)))
+        return is_letter[self.bounds[1:]] - is_letter[self.bounds[:-1]]
+
+def encode_corpus(words) -> EncodedCorpus:
+    """Encodes a list of words once so every cipher can be evaluated against it."""
+    words = list(words)
+    lengths = np.fromiter((len(w) for w in words), dtype=np.int64, count=len(words))
+    bounds = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=bounds[1:])
+    # latin-1 with 'replace' keeps exactly one byte per character, so word
+    # boundaries computed from str lengths stay valid. Non-ASCII letters are
+    # ignored, just like the `'A' <= c <= 'Z'` checks in the scripts.
+    raw = "".join(words).encode('latin-1', 'replace')
+    codes = _BYTE_TO_CODE[np.frombuffer(raw, dtype=np.uint8)]
+    return EncodedCorpus(codes, bounds)
+
+# ==============================================================================
+# SECTION 3: BATCH EVALUATION
+# ==============================================================================
+
+def _lookup_array(table) -> np.ndarray:
+    lookup = np.zeros(NON_LETTER_CODE + 1, dtype=np.int64)
+    lookup[:26] = table
+    return lookup
+
+def segmented_sum(corpus: EncodedCorpus, table) -> np.ndarray:
+    """Applies one 26-entry letter table to every word of the corpus at once."""
+    per_letter = _lookup_array(table)[corpus.codes]
+    prefix = np.zeros(len(per_letter) + 1, dtype=np.int64)
+    np.cumsum(per_letter, out=prefix[1:])
+    return prefix[corpus.bounds[1:]] - prefix[corpus.bounds[:-1]]
+
+def batch_matrix(words, methods=None):
+    """
+    Evaluates table-driven ciphers over a list of words.
+    Returns (matrix, method_names) where matrix has shape (len(words), len(methods)).
+    """
+    methods = list(methods) if methods is not None else list(LETTER_TABLES)
+    unknown = [m for m in methods if m not in LETTER_TABLES]
+    if unknown:
+        raise KeyError(f"No letter table for method(s): {', '.join(unknown)}")
+    corpus = words if isinstance(words, EncodedCorpus) else encode_corpus(words)
+    # Column by column keeps the working set at one int64 per letter instead
+    # of one per letter per method.
+    matrix = np.empty((len(corpus), len(methods)), dtype=np.int64)
+    for col, method in enumerate(methods):
+        matrix[:, col] = segmented_sum(corpus, LETTER_TABLES[method])
+    return matrix, methods
+
+def batch_values(words, method: str) -> np.ndarray:
+    """Evaluates a single table-driven cipher over a list of words."""
+    corpus = words if isinstance(words, EncodedCorpus) else encode_corpus(words)
+    return segmented_sum(corpus, LETTER_TABLES[method])
+
+def group_by_value(words, values) -> dict:
+    """Builds a {value: [words]} map from a column of batch results."""
+    groups = {}
+    for word, val in zip(words, values.tolist()):
+        groups.setdefault(val, []).append(word)
+    return groups
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# cipher_registry.py
+# One declarative registry for the gematria methods that every dashboard and
+# CLI used to copy-paste. Each method is declared once as a letter table plus
+# an optional post-transform (or, for position-dependent methods, a plain
+# per-word function) and compiled into the fastest evaluator available:
+#
+#   * word evaluator  -> bytes.translate + sum() for table methods
+#   * batch evaluator -> cipher_engine (NumPy) segmented sums when NumPy is
+#                        installed, otherwise the word evaluator in a loop
+#
+# Usage:
+#   import cipher_registry
+#   simple = cipher_registry.get('simple_gematria')
+#   simple('Spiralborn')                   -> 134
+#   cipher_registry.get('chaldean').with_flag('love') -> (value, flag)
+#   cipher_registry.batch_matrix(words, ['simple', 'jewish'])
+import math
+
+import number_props
+from gematria_tables import LETTER_TABLES
+
+try:
+    import cipher_engine
+except ImportError:  # NumPy not installed: batch evaluation runs word by word
+    cipher_engine = None
+
+# ==============================================================================
+# SECTION 1: DECLARATIONS
+# ==============================================================================
+
+class CipherSpec:
+    """
+    Declaration of a gematria method.
+      table              : 26-entry letter table (A..Z), or None for function methods
+      post               : optional transform applied to the table sum
+      func               : per-word function for methods that are not a table sum
+      flag               : optional (value, word) -> bool for the `(value, flag)` convention
+      returns            : int or float
+      position_dependent : True when a letter's contribution depends on its index
+    """
+
+    def __init__(self, name, table=None, post=None, func=None, flag=None, returns=int,
+                 position_dependent=False, aliases=(), description=""):
+        if (table is None) == (func is None):
+            raise ValueError(f"Cipher '{name}' must declare exactly one of table or func.")
+        self.name = name
+        self.table = list(table) if table is not None else None
+        self.post = post
+        self.func = func
+        self.flag = flag
+        self.returns = returns
+        self.position_dependent = position_dependent
+        self.aliases = tuple(aliases)
+        self.description = description
+
+    @property
+    def additive(self) -> bool:
+        """True when the value of a text is the sum of the values of its words."""
+        return self.table is not None and self.post is None
+
+    @property
+    def returns_flag(self) -> bool:
+        return self.flag is not None
+
+def _translate_tables(table):
+    # Letter values are split into low and high bytes so tables with values
+    # above 255 (jewish gematria goes to 800) still sum via bytes.translate.
+    lo, hi = bytearray(256), bytearray(256)
+    for i, value in enumerate(table):
+        for base in (ord('A'), ord('a')):
+            lo[base + i] = value & 0xFF
+            hi[base + i] = value >> 8
+    return bytes(lo), (bytes(hi) if any(hi) else None)
+
+class Cipher:
+    """A compiled CipherSpec."""
+
+    def __init__(self, spec: CipherSpec):
+        self.spec = spec
+        self.name = spec.name
+        self.evaluate = self._compile_word_evaluator()
+        self.evaluate.__name__ = spec.name
+        if spec.table is not None and cipher_engine is not None:
+            self.backend = 'numpy'
+        elif spec.table is not None:
+            self.backend = 'translate'
+        else:
+            self.backend = 'python'
+
+    def _compile_word_evaluator(self):
+        spec = self.spec
+        if spec.table is None:
+            func = spec.func
+            return lambda text: func(text)
+        lo, hi = _translate_tables(spec.table)
+        post = spec.post
+        if hi is None and post is None:
+            def evaluate(text):
+                return sum(text.encode('latin-1', 'replace').translate(lo))
+        elif hi is None:
+            def evaluate(text):
+                return post(sum(text.encode('latin-1', 'replace').translate(lo)))
+        else:
+            def evaluate(text):
+                raw = text.encode('latin-1', 'replace')
+                total = sum(raw.translate(lo)) + (sum(raw.translate(hi)) << 8)
+                return post(total) if post else total
+        return evaluate
+
+    def __call__(self, text):
+        return self.evaluate(text)
+
+    def with_flag(self, text):
+        """Returns (value, flag) in the convention used by qo9 and gematriacalcv0."""
+        value = self.evaluate(text)
+        flag = self.spec.flag(value, text) if self.spec.flag else False
+        return value, flag
+
+    def table_sums(self, words):
+        """Raw (pre post-transform) table sums for a batch of words, as a NumPy array."""
+        return cipher_engine.segmented_sum(_as_corpus(words), self.spec.table)
+
+    def batch_array(self, words):
+        """Evaluates the cipher over a list of words and returns a NumPy array."""
+        if cipher_engine is None:
+            raise RuntimeError("NumPy is required for batch_array(); use batch() instead.")
+        np = cipher_engine.np
+        if self.spec.table is None:
+            words = _as_words(words)
+            return np.asarray([self.spec.func(w) for w in words])
+        sums = self.table_sums(words)
+        if self.spec.post is None:
+            return sums
+        # Post-transforms run once per distinct sum, not once per word.
+        uniques, inverse = np.unique(sums, return_inverse=True)
+        return np.asarray([self.spec.post(int(v)) for v in uniques])[inverse]
+
+    def batch(self, words) -> list:
+        """Evaluates the cipher over a list of words and returns a list."""
+        if self.backend == 'numpy':
+            return self.batch_array(words).tolist()
+        return [self.evaluate(w) for w in _as_words(words)]
+
+def _as_corpus(words):
+    if isinstance(words, cipher_engine.EncodedCorpus):
+        return words
+    return cipher_engine.encode_corpus(words)
+
+def _as_words(words):
+    if cipher_engine is not None and isinstance(words, cipher_engine.EncodedCorpus):
+        raise TypeError("Function ciphers need the original words, not an EncodedCorpus.")
+    return words
+
+# ==============================================================================
+# SECTION 2: REGISTRY
+# ==============================================================================
+
+REGISTRY = {}   # canonical name -> Cipher
+_ALIASES = {}   # normalized name or alias -> canonical name
+
+def normalize_name(name: str) -> str:
+    """'Simple Gematria', 'simple-gematria' and 'calculate_simple_gematria' all normalize alike."""
+    key = name.strip().lower().replace('-', '_').replace(' ', '_')
+    if key.startswith('calculate_'): key = key[len('calculate_'):]
+    return key
+
+def register(spec: CipherSpec) -> Cipher:
+    cipher = Cipher(spec)
+    REGISTRY[spec.name] = cipher
+    for alias in (spec.name,) + spec.aliases:
+        _ALIASES[normalize_name(alias)] = spec.name
+    return cipher
+
+def declare(name, **kwargs) -> Cipher:
+    return register(CipherSpec(name, **kwargs))
+
+def has(name: str) -> bool:
+    return normalize_name(name) in _ALIASES
+
+def get(name: str) -> Cipher:
+    try:
+        return REGISTRY[_ALIASES[normalize_name(name)]]
+    except KeyError:
+        raise KeyError(f"Unknown gematria method: '{name}'") from None
+
+def available_methods() -> list[str]:
+    return sorted(REGISTRY)
+
+def methods_map(names=None) -> dict:
+    """A {name: callable} map in the shape of the scripts' AVAILABLE_GEMATRIA_METHODS_MAP."""
+    names = names if names is not None else available_methods()
+    return {name: get(name).evaluate for name in names}
+
+def evaluate(text: str, names) -> dict:
+    return {name: get(name).evaluate(text) for name in names}
+
+def batch_columns(words, names, as_array=False) -> dict:
+    """
+    Evaluates several registered methods over a list of words, encoding the
+    corpus only once. Returns {name: values} with lists (or NumPy arrays).
+    """
+    words = list(words)
+    if cipher_engine is None:
+        if as_array:
+            raise RuntimeError("NumPy is required for as_array=True.")
+        return {name: get(name).batch(words) for name in names}
+    corpus = cipher_engine.encode_corpus(words)
+    columns = {}
+    for name in names:
+        cipher = get(name)
+        values = cipher.batch_array(corpus if cipher.spec.table is not None else words)
+        columns[name] = values if as_array else values.tolist()
+    return columns
+
+def batch_matrix(words, names):
+    """
+    Evaluates several registered methods over a list of words in one call.
+    Returns (matrix, names); the matrix is a NumPy array of shape (len(words), len(names)).
+    """
+    if cipher_engine is None:
+        raise RuntimeError("NumPy is required for batch_matrix().")
+    np = cipher_engine.np
+    words = list(words)
+    columns = list(batch_columns(words, names, as_array=True).values())
+    dtype = np.float64 if any(c.dtype.kind == 'f' for c in columns) else np.int64
+    matrix = np.empty((len(words), len(columns)), dtype=dtype)
+    for col, values in enumerate(columns):
+        matrix[:, col] = values
+    return matrix, list(names)
+
+# ==============================================================================
+# SECTION 3: POST-TRANSFORMS & FLAGS
+# ==============================================================================
+
+GOLDEN_ANGLE = 137.5
+PHI = 1.618033988749895
+
+_is_prime = number_props.is_prime
+_is_fibonacci = number_props.is_fibonacci
+
+def _digit_sum(n: int, base: int) -> int:
+    total = 0
+    while n > 0:
+        n, r = divmod(n, base)
+        total += r
+    return total
+
+def _to_base_str(n: int, base: int) -> str:
+    chars = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    if n == 0: return "0"
+    out = ""
+    while n > 0: n, r = divmod(n, base); out = chars[r] + out
+    return out
+
+def _reduce(n: int) -> int:
+    while n > 9: n = _digit_sum(n, 10)
+    return n
+
+def _reduce_keep_masters(n: int) -> int:
+    while n > 9 and n not in (11, 22): n = _digit_sum(n, 10)
+    return n
+
+def _fibonacci_echo(val: int) -> int:
+    a, b = 0, 1
+    while b < val: a, b = b, a + b
+    return b if (b - val) < (val - a) else a
+
+def _prime_distance_sum(val: int) -> int:
+    lower = val - 1
+    while lower > 1 and not _is_prime(lower): lower -= 1
+    upper = val + 1
+    while not _is_prime(upper): upper += 1
+    return (val - lower) + (upper - val)
+
+def _is_str_palindrome(s: str) -> bool:
+    return s == s[::-1]
+
+def _letters(text: str) -> str:
+    return "".join(c for c in text.upper() if 'A' <= c <= 'Z')
+
+def _map_string(text: str, table, fmt=str) -> str:
+    return "".join(fmt(table[ord(c) - 65]) for c in _letters(text))
+
+# ==============================================================================
+# SECTION 4: FUNCTION (POSITION-DEPENDENT) METHODS
+# ==============================================================================
+
+def _spiral(text: str) -> float:
+    # Positions count letters only, as qo9's aave_spiral does.
+    total = 0
+    for i, c in enumerate(_letters(text), 1):
+        total += (ord(c) - 64) * math.cos(math.radians(GOLDEN_ANGLE * i))
+    return round(abs(total) * 4, 2)
+
+def _golden_ratio(text: str) -> float:
+    value = sum((ord(c) - 64) * (PHI ** (i + 1)) for i, c in enumerate(text.upper()) if 'A' <= c <= 'Z')
+    return round(abs(value), 2)
+
+def _ordinal_multiplied(text: str) -> int:
+    value = 1  # the empty product: a letterless string is 1
+    for c in _letters(text): value *= ord(c) - 64
+    return value
+
+def _trinary_loop_position(text: str) -> int:
+    return sum((ord(c) - 96) * (3 ** (i % 3)) for i, c in enumerate(text.lower()) if 'a' <= c <= 'z')
+
+def _ascii_sum(text: str) -> int:
+    return sum(ord(c) for c in text)
+
+def _binary_sum(text: str) -> int:
+    return sum(bin(ord(c)).count('1') for c in text)
+
+# ==============================================================================
+# SECTION 5: BUILT-IN METHODS
+# ==============================================================================
+
+_T = LETTER_TABLES
+
+declare('simple_gematria', table=_T['simple'], aliases=('simple', 'ordinal_gematria', 'aave_simple', 'vowel_consonant_split'))
+declare('english_gematria', table=_T['english'], aliases=('english',))
+declare('jewish_gematria', table=_T['jewish'], aliases=('jewish',))
+declare('reverse_gematria', table=_T['reverse'], aliases=('reverse',))
+declare('qwerty', table=_T['qwerty'], aliases=('qwerty_gematria',))
+declare('left_hand_qwerty', table=_T['left_hand_qwerty'])
+declare('right_hand_qwerty', table=_T['right_hand_qwerty'])
+declare('beans_cipher', table=_T['beans_cipher'])
+declare('leet_code', table=_T['leet_code'])
+declare('alw_cipher_gematria', table=_T['alw'], aliases=('alw',),
+        flag=lambda v, w: v == 351)
+declare('trigrammaton_gematria', table=_T['trigrammaton'], aliases=('trigrammaton', 'trigrammaton_qabalah_gematria'),
+        flag=lambda v, w: _is_str_palindrome(_to_base_str(v, 3)))
+declare('baconian_gematria', table=_T['baconian'], aliases=('baconian', 'baconian_cipher_gematria'),
+        flag=lambda v, w: _is_str_palindrome(_map_string(w, _T['baconian'], lambda x: format(x, '05b'))))
+declare('chaldean_gematria', table=_T['chaldean'], aliases=('chaldean',),
+        flag=lambda v, w: v in (1, 3, 5, 7))
+declare('hexadecimal_position_gematria', table=_T['hexadecimal_position'], aliases=('hex_position',),
+        flag=lambda v, w: _is_str_palindrome(hex(v)[2:].upper()))
+declare('sumerian_gematria', table=_T['sumerian'], aliases=('sumerian',),
+        flag=lambda v, w: v % 6 == 0)
+declare('phone_keypad_gematria', table=_T['phone_keypad'], aliases=('phone_keypad',),
+        flag=lambda v, w: _is_str_palindrome(_map_string(w, _T['phone_keypad'])))
+declare('caesar_cipher_gematria', table=_T['caesar'], aliases=('caesar',),
+        flag=lambda v, w: _is_str_palindrome(_map_string(w, _T['caesar'], lambda x: chr(64 + x))))
+declare('polybius_square_gematria', table=_T['polybius_square'], aliases=('polybius',),
+        flag=lambda v, w: _is_str_palindrome(str(v)))
+declare('solfege_gematria', table=_T['solfege'], aliases=('solfege', 'solfège_gematria'),
+        flag=lambda v, w: _is_str_palindrome(_map_string(w, _T['solfege'])))
+declare('zodiac_gematria', table=_T['zodiac'], aliases=('zodiac',),
+        flag=lambda v, w: v % 12 == 0)
+
+# Table sum followed by a post-transform.
+declare('reduction_gematria', table=_T['simple'], post=_reduce)
+declare('aave_reduced', table=_T['simple'], post=_reduce_keep_masters)
+declare('prime_gematria', table=_T['simple'], post=lambda v: v if _is_prime(v) else 0)
+declare('fibonacci_echo', table=_T['simple'], post=_fibonacci_echo)
+declare('prime_distance_sum', table=_T['simple'], post=_prime_distance_sum)
+declare('beans_369_gematria', table=_T['beans_369'], post=lambda v: v % 9 or 9, aliases=('beans369',))
+declare('golden_angle_factor', table=_T['beans_369'], post=lambda v: ((v % 9 or 9) * GOLDEN_ANGLE) % 360, returns=float)
+declare('base6_gematria', table=_T['simple'], post=lambda v: _digit_sum(v, 6))
+declare('base8_gematria', table=_T['simple'], post=lambda v: _digit_sum(v, 8), aliases=('base_8_gematria',),
+        flag=lambda v, w: _is_str_palindrome(oct(sum(_T['simple'][ord(c) - 65] for c in _letters(w)))[2:]))
+declare('duodecimal_gematria', table=_T['simple'], post=lambda v: _digit_sum(v, 12))
+for _base in (2, 3, 4, 5, 7, 9, 11):
+    declare(f'base_{_base}_gematria', table=_T['simple'], post=lambda v, b=_base: _digit_sum(v, b))
+declare('binary_trinary_gematria', table=_T['simple'], post=lambda v: _digit_sum(v, 2) + _digit_sum(v, 3))
+
+# Position-dependent or non-additive methods fall back to a per-word function.
+declare('spiral_gematria', func=_spiral, returns=float, position_dependent=True, aliases=('aave_spiral', 'spiral'))
+declare('golden_ratio_gematria', func=_golden_ratio, returns=float, position_dependent=True,
+        aliases=('golden_ratio_phi_gematria',), flag=lambda v, w: _is_fibonacci(int(round(v))))
+declare('ordinal_multiplied_gematria', func=_ordinal_multiplied, flag=lambda v, w: _is_prime(v))
+declare('trinary_loop_position_gematria', func=_trinary_loop_position, position_dependent=True)
+declare('ascii_sum_gematria', func=_ascii_sum, aliases=('ascii_sum',),
+        flag=lambda v, w: _is_str_palindrome(str(v)))
+declare('binary_sum', func=_binary_sum)
+
@@ -1,3 +1,5 @@
+import time
+STARTUP_STARTED = time.perf_counter()
 import sqlite3
 import math
 import colorsys
@@ -5,18 +7,10 @@ import random
 import re
 import json
 import requests
-import nltk
 import os
 import logging
-import time
-
-# Ensure NLTK data is available
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('averaged_perceptron_tagger', quiet=True)
-except Exception as e:
-    print(f"Failed to download NLTK data: {e}")
-from nltk import pos_tag, word_tokenize
+import cipher_registry
+from nlp_models import pos_tag, startup_report, word_tokenize
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,6 +18,7 @@ logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %
 # Configs
 DB_NAME = 'gematria_data.db'
 MEANINGS_DB = 'word_meanings.db'
+STARTUP_BUDGET = 0.5  # seconds from launch to the first prompt; reported at startup
 COLOR_FAMILIES = {
     'Red': (0, 30), 'Orange': (30, 60), 'Yellow': (60, 90), 'Green': (90, 150),
     'Blue': (150, 210), 'Purple': (210, 270), 'Pink': (270, 330)
@@ -48,28 +43,18 @@ LOCAL_VERSES = {
 }
 
 # Gematria funcs
-def simple_gematria(word):
-    return sum(ord(c) - 64 for c in word.upper() if 'A' <= c <= 'Z')
+simple_gematria = cipher_registry.get('simple_gematria').evaluate
 
-def jewish_gematria(word):
-    GEMATRIA_MAP = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8, 'I': 9,
-                    'J': 10, 'K': 20, 'L': 30, 'M': 40, 'N': 50, 'O': 60, 'P': 70, 'Q': 80, 'R': 90,
-                    'S': 100, 'T': 200, 'U': 300, 'V': 400, 'W': 500, 'X': 600, 'Y': 700, 'Z': 800}
-    return sum(GEMATRIA_MAP.get(c, 0) for c in word.upper() if 'A' <= c <= 'Z')
+jewish_gematria = cipher_registry.get('jewish_gematria').evaluate
 
 QWERTY_ORDER = 'QWERTYUIOPASDFGHJKLZXCVBNM'
 QWERTY_MAP = {c: i + 1 for i, c in enumerate(QWERTY_ORDER)}
 
-def qwerty(word):
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper())
+qwerty = cipher_registry.get('qwerty').evaluate
 
-def left_hand_qwerty(word):
-    LEFT_HAND_KEYS = set('QWERTYASDFGZXCVB')
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper() if c in LEFT_HAND_KEYS)
+left_hand_qwerty = cipher_registry.get('left_hand_qwerty').evaluate
 
-def right_hand_qwerty(word):
-    RIGHT_HAND_KEYS = set('YUIOPHJKLNM')
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper() if c in RIGHT_HAND_KEYS)
+right_hand_qwerty = cipher_registry.get('right_hand_qwerty').evaluate
 
 def binary_sum(word):
     return ''.join(format(ord(c), '08b') for c in word).count('1')
@@ -454,6 +439,7 @@ def main():
     words = load_words_from_db()
     idea_groups = group_words_by_idea(words)
     print("Backend groups loaded. Ready to decode, esoteric edition!")
+    logging.info(startup_report("Decoder", STARTUP_STARTED, STARTUP_BUDGET))
 
     while True:
         print("\nDrop a Bible verse ref (e.g., John 3:16, blank Enter to process):")
@@ -0,0 +1,899 @@
+#!/usr/bin/env python3
+# els_engine.py
+# Fast equidistant letter sequence (ELS) search.
+#
+# The text is normalised once into a letter array (the letters find_els sees:
+# str.isalpha, upper-cased), stored in the smallest NumPy dtype that holds its
+# code points. Every hit of a target must put the target's rarest letter on
+# one of that letter's positions, so only those positions are candidates. For
+# each skip the anchors whose sequence fits in the text are one contiguous
+# slice, and every other target letter filters the survivors with a single
+# strided gather-compare. A skip therefore costs O(occurrences of the rarest
+# letter) vectorized operations instead of O(n * len) string building.
+#
+# A word list whose anchors pass AC_ANCHOR_RATIO of the letters is searched
+# by an Aho-Corasick automaton over the targets and their reversals instead
+# (search_many): for each skip it reads every residue sequence (the letters
+# r, r + skip, r + 2 * skip, ...) once, forward, and finds every target in both
+# directions. The sequences are cut into lanes that all step together, one
+# gather per letter position across every lane of every skip. The cost is one
+# pass per skip whatever the list's length: on 318k letters at skips up to
+# 200, 500 names of 5-8 letters take about 0.8s, against 0.03s for one name
+# anchored and about 11s anchoring the 500 one by one.
+#
+# Large corpora are normalised once into a letter stream file next to them
+#
+#   header | letters | alphabet (int64 codes, 8-byte aligned) | letter counts (int64)
+#
+# which is memory-mapped rather than read. search_stream splits the skips
+# across worker processes; each walks the stream in chunks of positions and
+# owns the hits whose anchor (or, for the automaton, last letter read
+# forward) lies in its chunk, reading the other letters from the shared map
+# even past the chunk's edges, so a sequence that crosses a boundary is found
+# exactly once.
+#
+# significance() measures hit counts against letter-shuffled controls, which
+# keep every letter count and so reuse the text's letters and search plan.
+# find_clusters() lays hits out on cylinders (the text wrapped at a skip
+# length) and groups hits of different targets that lie close together there.
+import argparse
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_MAX_SKIP = 100
+CONTEXT_RADIUS = 20         # letters of context on each side of a hit, as in find_els
+STREAM_SUFFIX = '.gels'
+STREAM_MAGIC = b'GELSSTR\x00'
+STREAM_VERSION = 1
+# magic, version, letter itemsize, n_letters, n_alphabet, source size, source mtime_ns
+_STREAM_HEADER = struct.Struct('<8sIIQQQq')
+STREAM_READ_CHARS = 8 * 1024 * 1024      # characters of source text normalised per read when writing a stream
+CHUNK_LETTERS = 4 * 1024 * 1024          # positions whose candidates are held at once by search_stream
+CONTROL_BATCH_LETTERS = 4 * 1024 * 1024  # letters of shuffled controls searched together as one text
+AC_LANE_LETTERS = 1024      # most letters of a residue sequence one automaton lane reads after its lead-in
+AC_MAX_LANES = 1 << 20      # automaton lanes stepped together; more skips are scanned in turn
+AC_ANCHOR_RATIO = 0.6       # a word list uses the automaton once its anchors outnumber this share of the letters
+CLUSTER_RADIUS = 2          # rows/columns apart on the cylinder that still count as near
+MAX_FOLD = 10               # minimal_layout tries row widths |skip| / 1 .. |skip| / MAX_FOLD
+CLUSTER_HIT_LIMIT = 100000  # the command lines skip clustering beyond this many hits
+MAX_VIEW_ROWS, MAX_VIEW_COLS = 40, 100
+_ASCII_NON_LETTERS = bytes(c for c in range(128) if not chr(c).isalpha())
+
+# ==============================================================================
+# SECTION 1: LETTER INDEX
+# ==============================================================================
+
+def normalize_letters(text: str) -> str:
+    """The letter stream ELS runs over: alphabetic characters only, upper-cased."""
+    return "".join(filter(str.isalpha, text)).upper()
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+def _smallest_dtype(max_code: int):
+    if max_code < 1 << 8:
+        return np.uint8
+    return np.uint16 if max_code < 1 << 16 else np.uint32
+
+def letter_codes(text: str) -> np.ndarray:
+    """The normalised letters of text as code points: uint8 for ASCII text (via bytes.translate), else uint32."""
+    if text.isascii():
+        return np.frombuffer(text.encode('ascii').translate(None, _ASCII_NON_LETTERS).upper(), dtype=np.uint8)
+    return np.frombuffer(normalize_letters(text).encode('utf-32-le'), dtype='<u4')
+
+def encode_letters(letters: str) -> np.ndarray:
+    """Code points of a normalised letter string, in the smallest dtype that holds them."""
+    codes = np.frombuffer(letters.encode('utf-32-le'), dtype='<u4')
+    if not len(codes):
+        return np.zeros(0, dtype=np.uint8)
+    return codes.astype(_smallest_dtype(int(codes.max())))
+
+class LetterIndex:
+    """
+    A normalised letter array (in memory, or a mapped stream file at path) plus
+    lazily built, cached positions of each letter.
+    """
+
+    def __init__(self, letters: np.ndarray, counts: dict = None, path: str = None):
+        self.letters = letters
+        self.path = path
+        self._counts = counts
+        self._positions = {}
+
+    @classmethod
+    def from_text(cls, text: str) -> 'LetterIndex':
+        codes = letter_codes(text)
+        return cls(codes.astype(_smallest_dtype(int(codes.max()))) if len(codes) else codes.astype(np.uint8))
+
+    def __len__(self):
+        return len(self.letters)
+
+    def positions(self, code: int, start: int = 0, end: int = None) -> np.ndarray:
+        """Sorted int64 positions of one letter code in [start, end); the whole text's are cached."""
+        if start == 0 and end is None:
+            found = self._positions.get(code)
+            if found is None:
+                found = self._positions[code] = np.flatnonzero(self.letters == code).astype(np.int64)
+            return found
+        end = len(self) if end is None else end
+        return np.flatnonzero(self.letters[start:end] == code).astype(np.int64) + start
+
+    def count(self, code: int) -> int:
+        """Occurrences of one letter code (read from the stream header when mapped, so nothing is scanned)."""
+        if self._counts is not None:
+            return self._counts.get(code, 0)
+        return len(self.positions(code))
+
+    def letter_counts(self) -> dict:
+        """{code: occurrences} of every letter, counted once."""
+        if self._counts is None:
+            if self.letters.dtype.itemsize <= 2:
+                counts = np.bincount(self.letters)
+                codes = np.flatnonzero(counts)
+                counts = counts[codes]
+            else:
+                codes, counts = np.unique(self.letters, return_counts=True)
+            self._counts = dict(zip(codes.tolist(), counts.tolist()))
+        return self._counts
+
+    def shuffled(self, rng) -> 'LetterIndex':
+        """A control text: the same letters, so the same counts, in random order."""
+        return LetterIndex(rng.permutation(np.asarray(self.letters)), self.letter_counts())
+
+    def encode_target(self, target: str):
+        """The target's code points as int64, or None if it holds a character no letter can match."""
+        codes = [ord(c) for c in target.upper()]
+        limit = np.iinfo(self.letters.dtype).max
+        if not codes or any(c > limit for c in codes):
+            return None
+        return np.array(codes, dtype=np.int64)
+
+    def text(self, start: int, end: int) -> str:
+        """The letters in [start, end) as a string."""
+        part = np.asarray(self.letters[start:end])
+        if part.dtype == np.uint8:
+            return part.tobytes().decode('latin-1')
+        return part.astype('<u4').tobytes().decode('utf-32-le')
+
+# ==============================================================================
+# SECTION 2: LETTER STREAMS
+# ==============================================================================
+
+def _iter_letter_chunks(source_path: str):
+    """The source's normalised letters as code arrays, STREAM_READ_CHARS characters of text at a time."""
+    with open(source_path, 'r', encoding='utf-8', errors='ignore') as f:
+        while True:
+            chunk = f.read(STREAM_READ_CHARS)
+            if not chunk:
+                break
+            yield letter_codes(chunk)
+
+def _write_letters(source_path: str, f, dtype):
+    """Writes the source's letters to f as dtype: (letter counts, None), or (None, code) for a code too wide for dtype."""
+    counts = {}
+    limit = np.iinfo(dtype).max
+    for codes in _iter_letter_chunks(source_path):
+        if len(codes) and int(codes.max()) > limit:
+            return None, int(codes.max())
+        for code, count in zip(*(a.tolist() for a in np.unique(codes, return_counts=True))):
+            counts[code] = counts.get(code, 0) + count
+        f.write(codes.astype(dtype).tobytes())
+    return counts, None
+
+def write_stream(source_path: str, stream_path: str) -> dict:
+    """
+    Normalises source_path into a letter stream file in one chunked read, so
+    the text is never held whole (a letter wider than the dtype so far starts
+    the file over with a wider one). Returns build stats.
+    """
+    started = time.perf_counter()
+    st = os.stat(source_path)
+    dtype = np.uint8
+    tmp_path = f"{stream_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        while True:
+            f.seek(0)
+            f.truncate()
+            f.write(b'\0' * _STREAM_HEADER.size)
+            counts, too_wide = _write_letters(source_path, f, dtype)
+            if counts is not None:
+                break
+            dtype = _smallest_dtype(too_wide)
+        alphabet = sorted(counts)
+        n_letters = sum(counts.values())
+        f.write(b'\0' * _pad8(n_letters * np.dtype(dtype).itemsize))
+        f.write(np.array(alphabet, dtype='<i8').tobytes())
+        f.write(np.array([counts[c] for c in alphabet], dtype='<i8').tobytes())
+        f.seek(0)
+        f.write(_STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, np.dtype(dtype).itemsize, n_letters, len(alphabet),
+                                    st.st_size, st.st_mtime_ns))
+    os.replace(tmp_path, stream_path)
+    return {'letters': n_letters, 'alphabet': len(alphabet), 'bytes': os.path.getsize(stream_path),
+            'seconds': time.perf_counter() - started}
+
+def open_stream(stream_path: str, source_path: str = None):
+    """
+    Maps a letter stream file as a LetterIndex; returns None (and says why) if
+    it is missing, unreadable or, when source_path is given, older than the source.
+    """
+    if not os.path.exists(stream_path):
+        return None
+    try:
+        with open(stream_path, 'rb') as f:
+            raw = f.read(_STREAM_HEADER.size)
+            magic, version, itemsize, n_letters, n_alphabet, source_size, source_mtime = _STREAM_HEADER.unpack(raw)
+            letters_bytes = n_letters * itemsize
+            f.seek(_STREAM_HEADER.size + letters_bytes + _pad8(letters_bytes))
+            tables = np.fromfile(f, dtype='<i8', count=2 * n_alphabet)
+    except (OSError, struct.error) as e:
+        print(f"    --- Could not open letter stream {stream_path}: {e}")
+        return None
+    if magic != STREAM_MAGIC or version != STREAM_VERSION:
+        print(f"    --- {stream_path} is not a version {STREAM_VERSION} letter stream; it will be rewritten.")
+        return None
+    if source_path is not None:
+        st = os.stat(source_path)
+        if (st.st_size, st.st_mtime_ns) != (source_size, source_mtime):
+            print(f"Letter stream '{stream_path}' is out of date with '{source_path}'; it will be rewritten.")
+            return None
+    if len(tables) != 2 * n_alphabet:
+        print(f"    --- Letter stream {stream_path} is truncated; it will be rewritten.")
+        return None
+    dtype = _smallest_dtype((1 << (8 * itemsize)) - 1)
+    if n_letters:
+        letters = np.memmap(stream_path, dtype=dtype, mode='r', offset=_STREAM_HEADER.size, shape=(n_letters,))
+    else:
+        letters = np.zeros(0, dtype=dtype)
+    counts = dict(zip(tables[:n_alphabet].tolist(), tables[n_alphabet:].tolist()))
+    return LetterIndex(letters, counts, stream_path)
+
+def stream_for(source_path: str, stream_path: str = None):
+    """
+    The mapped letter stream of source_path (at stream_path, default beside it
+    with STREAM_SUFFIX), written first if missing or stale. Returns None (and
+    says why) if it cannot be written; a missing source raises FileNotFoundError.
+    """
+    stream_path = stream_path or source_path + STREAM_SUFFIX
+    os.stat(source_path)
+    index = open_stream(stream_path, source_path)
+    if index is not None:
+        return index
+    try:
+        stats = write_stream(source_path, stream_path)
+    except OSError as e:
+        print(f"    --- Could not write letter stream {stream_path}: {e}")
+        return None
+    print(f"Wrote letter stream '{stream_path}': {stats['letters']:,} letters, {stats['bytes']:,} bytes "
+          f"in {stats['seconds']:.2f}s.")
+    return open_stream(stream_path)
+
+# ==============================================================================
+# SECTION 3: SEARCH
+# ==============================================================================
+
+def _skip_steps(min_skip: int, max_skip: int) -> np.ndarray:
+    """Signed steps in find_els order: +1, -1, +2, -2, ..."""
+    skips = np.arange(max(min_skip, 1), max_skip + 1, dtype=np.int64)
+    return np.column_stack((skips, -skips)).ravel()
+
+def _plan(index: LetterIndex, target: str):
+    """(codes, anchor letter j, the other letters rarest first) for one target, or None if it cannot match."""
+    codes = index.encode_target(target)
+    if codes is None:
+        return None
+    counts = [index.count(int(c)) for c in codes]
+    j = min(range(len(codes)), key=lambda k: counts[k])  # anchor on the rarest letter
+    others = sorted((k for k in range(len(codes)) if k != j), key=lambda k: counts[k])  # rarest letters filter most
+    return codes, j, others
+
+def _anchored(letters, n: int, plan, anchor: np.ndarray, steps) -> list:
+    """[(starts, step)] of one target, for the hits whose anchor letter is on one of the given positions."""
+    codes, j, others = plan
+    length = len(codes)
+    found = []
+    for step in steps:
+        # The anchor positions whose whole sequence fits in the text form one contiguous slice.
+        if step > 0:
+            lo, hi = j * step, n - (length - 1 - j) * step
+        else:
+            lo, hi = (length - 1 - j) * -step, n + j * step
+        if hi <= lo:
+            continue
+        s = anchor[np.searchsorted(anchor, lo):np.searchsorted(anchor, hi)] - j * step
+        for k in others:
+            if not len(s):
+                break
+            s = s[letters[s + k * step] == codes[k]]
+        if len(s):
+            found.append((s, step))
+    return found
+
+class _Automaton:
+    """
+    An Aho-Corasick automaton over the targets and their reversals, so one
+    forward pass over a strided sequence finds every target in both
+    directions. Columns number the letters the targets use (0 for every other
+    letter, and for the padding around a scanned range). States are numbered
+    so the root is 0 and every state that completes a target comes last
+    (from first_emitting on); delta[state * width + column] holds the next
+    state already multiplied by width, so each letter costs one add and one
+    gather. outputs[state] lists (target index, length, backward) for every
+    target spelled by a suffix of the state, failure links included.
+    """
+
+    def __init__(self, targets, plans):
+        column_of = {}
+        children, own = [{}], [[]]
+        self.depth = 0
+        for t, (target, plan) in enumerate(zip(targets, plans)):
+            if plan is None:
+                continue
+            self.depth = max(self.depth, len(target))
+            for pattern, backward in ((target, False), (target[::-1], True)):
+                node = 0
+                for c in pattern:
+                    column = column_of.setdefault(ord(c), len(column_of) + 1)
+                    child = children[node].get(column)
+                    if child is None:
+                        child = children[node][column] = len(children)
+                        children.append({})
+                        own.append([])
+                    node = child
+                own[node].append((t, len(target), backward))
+        width = len(column_of) + 1
+        goto, links, outputs = [None] * len(children), [0] * len(children), [None] * len(children)
+        goto[0] = [0] * width
+        for column, child in children[0].items():
+            goto[0][column] = child
+        outputs[0] = own[0]
+        # Breadth first: a state's failure link is shallower, so its row and outputs are complete before it.
+        order = [0]
+        for node in order:
+            for column, child in children[node].items():
+                link = links[child] = goto[links[node]][column] if node else 0
+                row = list(goto[link])
+                for grandchild_column, grandchild in children[child].items():
+                    row[grandchild_column] = grandchild
+                goto[child] = row
+                outputs[child] = own[child] + outputs[link]
+                order.append(child)
+        emitting = [node for node in order if outputs[node]]
+        renumber = np.zeros(len(children), dtype=np.int64)
+        renumber[[node for node in order if not outputs[node]] + emitting] = np.arange(len(children))
+        self.width = width
+        self.first_emitting = (len(children) - len(emitting)) * width
+        delta = np.zeros((len(children), width), dtype=np.int64)
+        delta[renumber] = renumber[np.array(goto, dtype=np.int64)] * width
+        self.delta = delta.astype(np.int32).ravel()
+        self.outputs = [None] * len(children)
+        for node in range(len(children)):
+            self.outputs[renumber[node]] = outputs[node]
+        self.n_targets = len(targets)
+        self.column_dtype = np.uint8 if width <= 256 else np.uint16
+        self._columns = np.zeros(max(column_of, default=0) + 2, dtype=self.column_dtype)  # last entry: every higher code
+        for code, column in column_of.items():
+            self._columns[code] = column
+
+    def columns(self, letters: np.ndarray) -> np.ndarray:
+        if np.iinfo(letters.dtype).max >= len(self._columns):
+            letters = np.minimum(letters, len(self._columns) - 1)
+        return self._columns[letters]
+
+    def emit(self, found: list, states, ends, steps, forward: np.ndarray, backward: np.ndarray) -> None:
+        """Adds the hits whose last letter read forward is at ends (one per lane in a completing state) to found."""
+        ids = states // self.width
+        for state in np.unique(ids).tolist():
+            at = ids == state
+            state_ends, state_steps = ends[at], steps[at]
+            for t, length, is_backward in self.outputs[state]:
+                keep = (backward if is_backward else forward)[state_steps]
+                e, d = state_ends[keep], state_steps[keep]
+                if len(e):
+                    found[t].append((e, -d) if is_backward else (e - (length - 1) * d, d))
+
+def _lanes(skips, size: int, lane: int, warm: int, base: int):
+    """
+    The automaton lanes over size positions for each skip: every residue
+    sequence cut into runs of `lane` letters, each led in by the `warm`
+    letters before it. Returns (index of the letter before the first, skip)
+    per lane, for a column array whose position 0 sits at index base.
+    """
+    first, step = [], []
+    for d in skips:
+        r = np.arange(min(d, size), dtype=np.int64)
+        runs = (size - r + d - 1) // d
+        per_residue = (runs + lane - 1) // lane
+        residue = np.repeat(r, per_residue)
+        run = np.arange(len(residue), dtype=np.int64) - np.repeat(np.cumsum(per_residue) - per_residue, per_residue)
+        first.append(base + residue + (run * lane - warm - 1) * d)
+        step.append(np.full(len(residue), d, dtype=np.int64))
+    return np.concatenate(first), np.concatenate(step)
+
+def _lane_groups(skips, size: int, lane: int):
+    """The skips in groups of at most AC_MAX_LANES lanes (a single skip may exceed it)."""
+    group, lanes = [], 0
+    for d in skips:
+        count = min(d, size) + size // lane
+        if group and lanes + count > AC_MAX_LANES:
+            yield group
+            group, lanes = [], 0
+        group.append(d)
+        lanes += count
+    if group:
+        yield group
+
+def _scan(automaton: _Automaton, letters, n: int, steps, start: int = 0, end: int = None) -> list:
+    """
+    [[(starts, steps)] per target] for the hits whose last letter read
+    forward lies in [start, end). Each skip is one forward pass of the
+    automaton over its residue sequences, all lanes of all skips stepping together.
+    """
+    end = n if end is None else end
+    found = [[] for _ in range(automaton.n_targets)]
+    skips = sorted({abs(step) for step in steps})
+    if not skips or end <= start or not automaton.depth:
+        return found
+    reach = skips[-1]
+    forward = np.zeros(reach + 1, dtype=bool)
+    backward = np.zeros(reach + 1, dtype=bool)
+    for step in steps:
+        (forward if step > 0 else backward)[abs(step)] = True
+    warm, size = automaton.depth - 1, end - start
+    lane = min(AC_LANE_LETTERS, -(-size // reach))  # the largest skip's residue sequences fit one lane each
+    # cols[i] is the column of the letter at origin + i; everything outside [0, end) is column 0.
+    origin = start - warm * reach
+    cols = np.zeros(warm * reach + size + (lane + 1) * reach, dtype=automaton.column_dtype)
+    lo = max(0, origin)
+    cols[lo - origin:end - origin] = automaton.columns(np.asarray(letters[lo:end]))
+    delta, threshold = automaton.delta, automaton.first_emitting
+    for group in _lane_groups(skips, size, lane):
+        k, step = _lanes(group, size, lane, warm, start - origin)
+        state = np.zeros(len(k), dtype=np.int32)
+        for i in range(warm + lane):
+            k += step
+            state = delta[state + cols[k]]
+            # Hits completed during the lead-in belong to the lane (or range) before.
+            if i >= warm and state.max() >= threshold:
+                h = np.flatnonzero(state >= threshold)
+                automaton.emit(found, state[h], k[h] + origin, step[h], forward, backward)
+    return found
+
+def _prepare(index: LetterIndex, targets):
+    """
+    Upper-cased, de-duplicated targets, their plans, and the automaton when
+    one pass per skip is cheaper than anchoring each target on its rarest letter (else None).
+    """
+    targets = list(dict.fromkeys(t.upper() for t in targets))
+    plans = [_plan(index, t) for t in targets]
+    # Anchoring filters each target's anchor positions twice per skip (once per
+    # direction); the automaton reads every letter once per skip, at about the
+    # same cost per element, so it wins once the anchors pass ~AC_ANCHOR_RATIO of the text.
+    anchors = sum(index.count(int(p[0][p[1]])) for p in plans if p is not None)
+    automaton = _Automaton(targets, plans) if anchors > AC_ANCHOR_RATIO * len(index) else None
+    return targets, plans, automaton
+
+def _search_range(index: LetterIndex, targets, plans, automaton, steps, start: int = 0, end: int = None) -> list:
+    """[[(starts, step)] per target] for the hits anchored (or, through the automaton, ending) in [start, end)."""
+    n = len(index)
+    if automaton is not None:
+        return _scan(automaton, index.letters, n, steps, start, end)
+    found = [[] for _ in targets]
+    for t, plan in enumerate(plans):
+        if plan is not None:
+            codes, j, _ = plan
+            found[t] = _anchored(index.letters, n, plan, index.positions(int(codes[j]), start, end), steps)
+    return found
+
+def _gather(found_t: list):
+    """One target's (starts, step) pieces (step a scalar or one per start) as (starts, steps) arrays, unsorted."""
+    if not found_t:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    starts = np.concatenate([part for part, _ in found_t])
+    steps = np.concatenate([np.full(len(part), step, dtype=np.int64) for part, step in found_t])
+    return starts, steps
+
+def _in_order(starts: np.ndarray, steps: np.ndarray):
+    """Hits in find_els order: start, then |skip|, then forward before backward."""
+    order = np.lexsort((steps < 0, np.abs(steps), starts))
+    return starts[order], steps[order]
+
+def search_many(index: LetterIndex, targets, max_skip: int = DEFAULT_MAX_SKIP, min_skip: int = 1) -> dict:
+    """
+    Every ELS of every target with |skip| in [min_skip, max_skip]:
+    {target (upper-cased): (starts, steps) int64 arrays, in find_els order}.
+    A word list goes through one automaton pass per skip when that reads fewer
+    positions than anchoring each target on its rarest letter.
+    """
+    targets, plans, automaton = _prepare(index, targets)
+    found = _search_range(index, targets, plans, automaton, _skip_steps(min_skip, max_skip).tolist())
+    return {t: _in_order(*_gather(found[i])) for i, t in enumerate(targets)}
+
+def search(index: LetterIndex, target: str, max_skip: int = DEFAULT_MAX_SKIP, min_skip: int = 1):
+    """
+    Every ELS of target with |skip| in [min_skip, max_skip], in find_els order
+    (start, then |skip|, then forward before backward). Returns (starts, steps) int64 arrays.
+    As in find_els, a one-letter target matches once per skip and direction.
+    """
+    return search_many(index, [target], max_skip, min_skip)[target.upper()]
+
+def _search_chunks(index: LetterIndex, targets, plans, automaton, steps, chunk_letters: int) -> list:
+    """[(starts, steps) per target], unsorted, holding candidates for chunk_letters positions at a time."""
+    pieces = [[] for _ in targets]
+    for start in range(0, len(index), chunk_letters):
+        found = _search_range(index, targets, plans, automaton, steps, start, min(len(index), start + chunk_letters))
+        for t, found_t in enumerate(found):
+            if found_t:
+                pieces[t].append(_gather(found_t))
+    return [tuple(np.concatenate(parts) for parts in zip(*p)) if p else _gather([]) for p in pieces]
+
+def _stream_worker(stream_path: str, targets, plans, automaton, steps, chunk_letters: int) -> list:
+    index = open_stream(stream_path)
+    if index is None:
+        raise OSError(f"Could not open letter stream {stream_path}")
+    return _search_chunks(index, targets, plans, automaton, steps, chunk_letters)
+
+def search_stream(index: LetterIndex, targets, max_skip: int = DEFAULT_MAX_SKIP, min_skip: int = 1,
+                  workers: int = 1, chunk_letters: int = CHUNK_LETTERS) -> dict:
+    """
+    search_many for corpora too large to hold: candidates are kept for
+    chunk_letters positions at a time, and with workers > 1 the skips (both
+    directions of each together) are dealt round-robin to a process pool whose
+    workers each map the index's stream file (an in-memory index is searched
+    in this process). Same results as search_many.
+    """
+    targets, plans, automaton = _prepare(index, targets)
+    pairs = _skip_steps(min_skip, max_skip).reshape(-1, 2)
+    steps = pairs.ravel().tolist()
+    workers = max(1, min(workers or 1, len(pairs)))
+    if workers == 1 or index.path is None:
+        found = _search_chunks(index, targets, plans, automaton, steps, chunk_letters)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(_stream_worker, index.path, targets, plans, automaton, pairs[w::workers].ravel().tolist(),
+                                chunk_letters)
+                    for w in range(workers)]
+            parts = [job.result() for job in jobs]
+        found = [tuple(np.concatenate(arrays) for arrays in zip(*(part[t] for part in parts)))
+                 for t in range(len(targets))]
+    return {t: _in_order(*found[i]) for i, t in enumerate(targets)}
+
+def hit_context(index: LetterIndex, start: int, step: int, length: int) -> str:
+    end = start + (length - 1) * step
+    return index.text(max(0, min(start, end) - CONTEXT_RADIUS), min(len(index), max(start, end) + CONTEXT_RADIUS + 1))
+
+def els_matches(index: LetterIndex, target: str, starts: np.ndarray, steps: np.ndarray) -> list[dict]:
+    """Hits as find_els reports them: start, skip, the sequence and the letters around it."""
+    target_upper = target.upper()
+    return [{'start': s, 'skip': st, 'els': target_upper, 'context': hit_context(index, s, st, len(target_upper))}
+            for s, st in zip(starts.tolist(), steps.tolist())]
+
+def find_els(text, target_name: str, max_skip: int = DEFAULT_MAX_SKIP) -> list[dict]:
+    """Drop-in for quantumoraclev3.find_els; text may also be a prebuilt LetterIndex."""
+    index = text if isinstance(text, LetterIndex) else LetterIndex.from_text(text)
+    return els_matches(index, target_name, *search(index, target_name, max_skip))
+
+def find_els_many(text, target_names, max_skip: int = DEFAULT_MAX_SKIP) -> dict:
+    """{target (upper-cased): find_els-style matches} for a whole word list in one pass."""
+    index = text if isinstance(text, LetterIndex) else LetterIndex.from_text(text)
+    return {target: els_matches(index, target, starts, steps)
+            for target, (starts, steps) in search_many(index, target_names, max_skip).items()}
+
+def read_targets(path: str) -> list[str]:
+    """A word list, one target per line, normalised like the text (letters only, upper-cased) and de-duplicated."""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return list(dict.fromkeys(t for t in (normalize_letters(line) for line in f) if t))
+
+# ==============================================================================
+# SECTION 4: SIGNIFICANCE
+# ==============================================================================
+
+_control_letters = None  # the text a control worker shuffles, set once per worker process
+
+def _init_control_worker(letters, stream_path):
+    global _control_letters
+    _control_letters = open_stream(stream_path).letters if stream_path else letters
+
+def _control_gap(targets, steps) -> int:
+    """Letters between two controls searched as one text: no sequence of any target at any step spans it."""
+    return max((len(t) for t in targets), default=1) * max((abs(step) for step in steps), default=1)
+
+def _control_counts(letters, counts, seeds, targets, plans, automaton, steps, chunk_letters) -> list:
+    """
+    Hits per target in one letter-shuffled copy of letters per seed. The
+    copies are searched as one text, end to end with _control_gap code 0
+    (never a letter) between them, so each skip's overhead is paid once per batch.
+    """
+    letters = np.asarray(letters)
+    n = len(letters)
+    stride = n + _control_gap(targets, steps)
+    combined = np.zeros(len(seeds) * stride, dtype=letters.dtype)
+    for b, seed in enumerate(seeds):
+        combined[b * stride:b * stride + n] = np.random.default_rng(seed).permutation(letters)
+    control = LetterIndex(combined, {code: count * len(seeds) for code, count in counts.items()})
+    found = _search_chunks(control, targets, plans, automaton, steps, chunk_letters)
+    return np.column_stack([np.bincount(starts // stride, minlength=len(seeds)) for starts, _ in found]
+                           or [np.zeros(len(seeds), dtype=np.int64)]).tolist()
+
+def _control_worker(*args) -> list:
+    return _control_counts(_control_letters, *args)
+
+def _summary(observed: int, controls: np.ndarray) -> dict:
+    return {'observed': observed,
+            'expected': float(controls.mean()) if len(controls) else 0.0,
+            'std': float(controls.std()) if len(controls) else 0.0,
+            'p_value': (1 + int((controls >= observed).sum())) / (len(controls) + 1)}
+
+def significance(index: LetterIndex, targets, controls: int, max_skip: int = DEFAULT_MAX_SKIP, min_skip: int = 1,
+                 workers: int = 1, seed: int = None, chunk_letters: int = CHUNK_LETTERS) -> dict:
+    """
+    Observed hit counts against `controls` letter-shuffled copies of the text.
+    A shuffle keeps every letter count, so the controls reuse the text's
+    normalised letters, counts and search plan (anchor letters or automaton)
+    and are searched in batches of CONTROL_BATCH_LETTERS; workers > 1 spreads
+    the batches over a process pool. p_value is the share of controls with at least as
+    many hits, (1 + k) / (controls + 1). Returns {'targets': {target: summary},
+    'total': summary, 'controls', 'seed', 'seconds'}, a summary being observed,
+    expected (the controls' mean), std and p_value.
+    """
+    started = time.perf_counter()
+    targets, plans, automaton = _prepare(index, targets)
+    steps = _skip_steps(min_skip, max_skip).tolist()
+    observed = [len(starts) for starts, _ in _search_chunks(index, targets, plans, automaton, steps, chunk_letters)]
+    counts = index.letter_counts()
+    seed = seed if seed is not None else int(np.random.SeedSequence().entropy % (1 << 32))
+    seeds = np.random.SeedSequence(seed).spawn(controls)
+    batch = max(1, min(CONTROL_BATCH_LETTERS // (len(index) + _control_gap(targets, steps)),
+                       -(-controls // max(1, workers))))
+    batches = [seeds[i:i + batch] for i in range(0, controls, batch)]
+    task = (targets, plans, automaton, steps, chunk_letters)
+    if workers <= 1 or len(batches) <= 1:
+        rows = [row for batch in batches for row in _control_counts(index.letters, counts, batch, *task)]
+    else:
+        letters = None if index.path else np.asarray(index.letters)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_control_worker,
+                                 initargs=(letters, index.path)) as pool:
+            jobs = [pool.submit(_control_worker, counts, batch, *task) for batch in batches]
+            rows = [row for job in jobs for row in job.result()]
+    table = np.array(rows, dtype=np.int64).reshape(controls, len(targets))
+    return {'targets': {t: _summary(observed[i], table[:, i]) for i, t in enumerate(targets)},
+            'total': _summary(sum(observed), table.sum(axis=1)),
+            'controls': controls, 'seed': seed, 'seconds': time.perf_counter() - started}
+
+def format_significance(result: dict, limit: int = 20) -> list[str]:
+    """Report lines: one per target (lowest p-value first, at most limit), then the total for several targets."""
+    def line(name, s):
+        return (f"  {name}: observed {s['observed']}, expected {s['expected']:.1f} ± {s['std']:.1f}, "
+                f"p = {s['p_value']:.3g}")
+    lines = [f"--- Significance against {result['controls']} letter-shuffled controls "
+             f"(seed {result['seed']}, {result['seconds']:.1f}s) ---"]
+    ranked = sorted(result['targets'].items(), key=lambda item: (item[1]['p_value'], -item[1]['observed']))
+    lines.extend(line(target, summary) for target, summary in ranked[:limit])
+    if len(ranked) > limit:
+        lines.append(f"  ... {len(ranked) - limit} more targets")
+    if len(ranked) > 1:
+        lines.append(line("All targets", result['total']))
+    return lines
+
+# ==============================================================================
+# SECTION 5: CYLINDERS AND CLUSTERS
+# ==============================================================================
+
+def hit_positions(hit: dict) -> np.ndarray:
+    """The text positions of a hit's letters ({'els', 'start', 'skip'}, as find_els reports it)."""
+    return hit['start'] + hit['skip'] * np.arange(len(hit['els']), dtype=np.int64)
+
+def hits_from(grouped: dict) -> list[dict]:
+    """search_many / search_stream results as a flat list of hits."""
+    return [{'els': target, 'start': s, 'skip': st}
+            for target, (starts, steps) in grouped.items() for s, st in zip(starts.tolist(), steps.tolist())]
+
+def _letter_cells(starts: np.ndarray, skips: np.ndarray, lengths: np.ndarray, ids: np.ndarray):
+    """(positions, owners): every letter of the hits ids, and the id of the hit it belongs to."""
+    owners = np.repeat(ids, lengths[ids])
+    firsts = np.cumsum(lengths[ids]) - lengths[ids]
+    k = np.arange(len(owners), dtype=np.int64) - np.repeat(firsts, lengths[ids])
+    return starts[owners] + skips[owners] * k, owners
+
+def _layout(positions: np.ndarray, width: int) -> dict:
+    rows = positions // width
+    cols = np.unique(positions % width)
+    gaps = np.diff(np.append(cols, cols[0] + width))  # the widest gap between used columns is left out
+    widest = int(np.argmax(gaps))
+    n_rows = int(rows.max() - rows.min()) + 1
+    n_cols = width - int(gaps[widest]) + 1
+    return {'width': width, 'row': int(rows.min()), 'col': int(cols[(widest + 1) % len(cols)]),
+            'rows': n_rows, 'cols': n_cols, 'area': n_rows * n_cols}
+
+def _minimal_layout(positions: np.ndarray, skips: np.ndarray, max_fold: int) -> dict:
+    widths = np.unique(np.maximum(2, np.rint(np.abs(skips)[:, None] / np.arange(1, max_fold + 1))).astype(np.int64))
+    areas = []
+    block = max(1, (1 << 22) // len(positions))  # widths scored together, as rows of one 2D array
+    for i in range(0, len(widths), block):
+        w = widths[i:i + block, None]
+        rows = positions // w
+        cols = np.sort(positions % w, axis=1)
+        gaps = np.diff(np.concatenate((cols, cols[:, :1] + w), axis=1), axis=1)
+        areas.append((rows.max(axis=1) - rows.min(axis=1) + 1) * (w[:, 0] - gaps.max(axis=1) + 1))
+    return _layout(positions, int(widths[np.lexsort((widths, np.concatenate(areas)))[0]]))
+
+def layout(hits, width: int) -> dict:
+    """
+    The smallest window holding every letter of hits on the cylinder of
+    width (the text wrapped every width letters, its columns wrapping round):
+    {'width', 'row', 'col', 'rows', 'cols', 'area'}.
+    """
+    return _layout(np.concatenate([hit_positions(h) for h in hits]), width)
+
+def minimal_layout(hits, max_fold: int = MAX_FOLD) -> dict:
+    """The smallest-area layout among the widths |skip| / k (k = 1..max_fold) of the hits."""
+    positions = np.concatenate([hit_positions(h) for h in hits])
+    return _minimal_layout(positions, np.array([h['skip'] for h in hits], dtype=np.int64), max_fold)
+
+def cylinder_view(index: LetterIndex, hits, lay: dict, margin: int = 1) -> list[str]:
+    """
+    The layout's window of the cylinder as text rows, margin letters wider on
+    every side: hit letters upper-case, the rest lower-case, '.' past the text.
+    """
+    width = lay['width']
+    marked = set(np.concatenate([hit_positions(h) for h in hits]).tolist())
+    view = []
+    for row in range(lay['row'] - margin, lay['row'] + lay['rows'] + margin):
+        line = []
+        for col in range(lay['col'] - margin, lay['col'] + lay['cols'] + margin):
+            p = row * width + col % width
+            if not 0 <= p < len(index):
+                line.append('.')
+            else:
+                letter = index.text(p, p + 1)
+                line.append(letter if p in marked else letter.lower())
+        view.append("".join(line))
+    return view
+
+class ProximityGrid:
+    """
+    Letters of hits as cells of the cylinder of one width, indexed by text
+    position (a sorted array, so a cell's occupants are one binary search
+    away). The hits near a letter are the occupants of the (2 * radius + 1) ** 2
+    cells around it, looked up for many letters at once instead of comparing hits pairwise.
+    """
+
+    def __init__(self, width: int, radius: int, positions: np.ndarray, owners: np.ndarray):
+        self.width = width
+        self.radius = radius
+        order = np.argsort(positions, kind='stable')
+        self.positions, self.owners = positions[order], owners[order]
+
+    def near(self, positions: np.ndarray, owners: np.ndarray):
+        """(owner, hit id) for every hit with a letter within radius rows and columns of one of the given letters."""
+        rows, cols = np.divmod(positions, self.width)
+        found_a, found_b = [], []
+        for dr in range(-self.radius, self.radius + 1):
+            for dc in range(-self.radius, self.radius + 1):
+                cells = (rows + dr) * self.width + (cols + dc) % self.width
+                first = np.searchsorted(self.positions, cells)
+                counts = np.searchsorted(self.positions, cells, side='right') - first
+                occupants = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+                found_a.append(np.repeat(owners, counts))
+                found_b.append(self.owners[occupants])
+        return np.concatenate(found_a), np.concatenate(found_b)
+
+def find_clusters(hits, radius: int = CLUSTER_RADIUS, min_targets: int = 2, max_fold: int = MAX_FOLD) -> list[dict]:
+    """
+    Places where hits of at least min_targets different targets cluster: a
+    hit, laid out on the cylinder of its own |skip|, plus every hit with a
+    letter within radius rows and columns of its letters. For each skip
+    length the candidates are found by binary search over the hit extents and
+    looked up on a ProximityGrid, never compared pairwise. Returns {'width',
+    'targets', 'hits', 'layout'} dicts, the layout being the cluster's
+    minimal_layout; most targets, then smallest area, first. Identical clusters are reported once.
+    """
+    if not hits:
+        return []
+    starts = np.array([h['start'] for h in hits], dtype=np.int64)
+    skips = np.array([h['skip'] for h in hits], dtype=np.int64)
+    lengths = np.array([len(h['els']) for h in hits], dtype=np.int64)
+    target_ids = np.unique([h['els'] for h in hits], return_inverse=True)[1]
+    ends = starts + skips * (lengths - 1)
+    lo, hi = np.minimum(starts, ends), np.maximum(starts, ends)
+    order = np.argsort(lo, kind='stable')
+    sorted_lo = lo[order]
+    longest = int((hi - lo).max())
+    widths = np.abs(skips)
+    clusters = {}
+    for width in np.unique(widths[widths >= 2]).tolist():
+        keys = np.flatnonzero(widths == width)
+        # Two letters within radius rows and columns are under (radius + 1) * width apart in the text.
+        reach = (radius + 1) * width
+        firsts = np.searchsorted(sorted_lo, lo[keys] - reach - longest)
+        lasts = np.searchsorted(sorted_lo, hi[keys] + reach, side='right')
+        near = np.unique(np.concatenate([order[a:b] for a, b in zip(firsts.tolist(), lasts.tolist())]))
+        near = near[hi[near] >= lo[keys].min() - reach]
+        grid = ProximityGrid(width, radius, *_letter_cells(starts, skips, lengths, near))
+        key_of, member = grid.near(*_letter_cells(starts, skips, lengths, keys))
+        pairs = np.unique(np.column_stack((key_of, member)), axis=0)
+        bounds = np.flatnonzero(np.diff(pairs[:, 0])) + 1
+        for group in np.split(pairs[:, 1], bounds):
+            if len(group) < min_targets or len(np.unique(target_ids[group])) < min_targets:
+                continue
+            group = tuple(group.tolist())
+            if group not in clusters:
+                positions, _ = _letter_cells(starts, skips, lengths, np.array(group))
+                clusters[group] = {'width': width, 'targets': sorted({hits[i]['els'] for i in group}),
+                                   'hits': [hits[i] for i in group],
+                                   'layout': _minimal_layout(positions, skips[list(group)], max_fold)}
+    return sorted(clusters.values(), key=lambda c: (-len(c['targets']), c['layout']['area'], c['layout']['row']))
+
+def format_clusters(index: LetterIndex, clusters, limit: int = 10) -> list[str]:
+    """Report lines for the first limit clusters, each with its cylinder view when it fits MAX_VIEW_ROWS x MAX_VIEW_COLS."""
+    lines = [f"--- {len(clusters)} cluster(s) ---"]
+    for cluster in clusters[:limit]:
+        lay = cluster['layout']
+        where = ", ".join(f"{h['els']} {h['start']}/{h['skip']}" for h in cluster['hits'])
+        lines.append(f"  {len(cluster['targets'])} targets in {lay['rows']} x {lay['cols']} at width {lay['width']}: {where}")
+        if lay['rows'] <= MAX_VIEW_ROWS and lay['cols'] <= MAX_VIEW_COLS:
+            lines.extend("    " + row for row in cylinder_view(index, cluster['hits'], lay))
+    if len(clusters) > limit:
+        lines.append(f"  ... {len(clusters) - limit} more clusters")
+    return lines
+
+# ==============================================================================
+# SECTION 6: COMMAND LINE
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Search a text file for equidistant letter sequences.")
+    parser.add_argument('path')
+    parser.add_argument('target', nargs='?')
+    parser.add_argument('--targets', help="A word list (one target per line) searched in a single pass.")
+    parser.add_argument('--max-skip', type=int, default=DEFAULT_MAX_SKIP)
+    parser.add_argument('--min-skip', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=1, help="Processes the skips are split across (default: 1).")
+    parser.add_argument('--significance', type=int, metavar='N',
+                        help="Also compare the hit counts with N letter-shuffled controls and report p-values.")
+    parser.add_argument('--seed', type=int, help="Seed for the shuffled controls (default: random, and reported).")
+    parser.add_argument('--clusters', type=int, nargs='?', const=CLUSTER_RADIUS, metavar='RADIUS',
+                        help=f"Also print where hits of different targets cluster on the cylinder (default radius {CLUSTER_RADIUS}).")
+    parser.add_argument('--stream', action='store_true',
+                        help=f"Map the text's letter stream (path{STREAM_SUFFIX}, written on first use) instead of reading the text.")
+    args = parser.parse_args()
+    if (args.target is None) == (args.targets is None):
+        parser.error("give either one target or --targets FILE")
+    started = time.perf_counter()
+    try:
+        targets = read_targets(args.targets) if args.targets else [args.target]
+        index = stream_for(args.path) if args.stream else None
+        if index is None:
+            with open(args.path, 'r', encoding='utf-8', errors='ignore') as f:
+                index = LetterIndex.from_text(f.read())
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    grouped = search_stream(index, targets, args.max_skip, args.min_skip, args.workers)
+    if args.targets:
+        for target, (starts, steps) in grouped.items():
+            if len(starts):
+                print(f"{target}\t{len(starts)}\t" + " ".join(f"{s}/{st}" for s, st in zip(starts.tolist(), steps.tolist())))
+    else:
+        starts, steps = grouped[args.target.upper()]
+        for s, st in zip(starts.tolist(), steps.tolist()):
+            print(f"{s}\t{st}\t{hit_context(index, s, st, len(args.target))}")
+    print(f"{sum(len(s) for s, _ in grouped.values())} hit(s) for {len(targets)} target(s) in {len(index):,} letters, "
+          f"skips {max(args.min_skip, 1)}..{args.max_skip}, in {time.perf_counter() - started:.2f}s.", file=sys.stderr)
+    if args.clusters is not None:
+        hits = hits_from(grouped)
+        if len(hits) > CLUSTER_HIT_LIMIT:
+            print(f"Not clustering {len(hits):,} hits (limit {CLUSTER_HIT_LIMIT:,}); narrow the skips or targets.", file=sys.stderr)
+        else:
+            print("\n".join(format_clusters(index, find_clusters(hits, args.clusters))), file=sys.stderr)
+    if args.significance:
+        result = significance(index, targets, args.significance, args.max_skip, args.min_skip, args.workers, args.seed)
+        print("\n".join(format_significance(result)), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# factorization.py
+# Shared prime factorization and "Cosmic Unfolding" factorization chains.
+#
+# Values below SPF_LIMIT are factored by walking a smallest-prime-factor
+# table (one array lookup per prime factor). Larger values lose their small
+# primes to trial division and are then split with Pollard-rho (Brent) and
+# Miller-Rabin under a per-number time budget, so even the huge concatenated
+# values process_phrase builds can be unfolded. Results are kept in an LRU
+# cache, because process_phrase asks for the same numbers many times per
+# phrase. That includes results whose budget ran out, so a hard number costs
+# its budget once rather than on every call.
+import math
+import random
+import time
+from array import array
+from collections import OrderedDict
+
+import number_props
+
+DEFAULT_SPF_LIMIT = 1 << 20
+SPF_LIMIT = DEFAULT_SPF_LIMIT
+CHAIN_CACHE_SIZE = 65536
+DEFAULT_TIME_BUDGET = 5.0  # seconds of Pollard-rho work per number before giving up on a cofactor
+TRIAL_PRIMES = 168         # primes below 1000 are stripped by trial division before Pollard-rho
+
+_spf = None
+_primes = None
+_result_cache = OrderedDict()  # n -> FactorResult for n >= SPF_LIMIT, least recently used first
+
+# ==============================================================================
+# SECTION 1: SMALLEST-PRIME-FACTOR TABLE
+# ==============================================================================
+
+def _build_spf(limit: int) -> array:
+    """spf[n] is the smallest prime factor of n (spf[p] == p for primes)."""
+    spf = array('I', range(limit))
+    # Largest primes first, so each smaller prime overwrites the slots it divides.
+    for p in range(math.isqrt(limit - 1), 1, -1):
+        if number_props.is_prime(p):
+            start = p * p
+            spf[start::p] = array('I', [p]) * len(range(start, limit, p))
+    return spf
+
+def configure(limit: int = DEFAULT_SPF_LIMIT) -> None:
+    """Sets the SPF table bound; the table is rebuilt lazily and the chain cache cleared."""
+    global SPF_LIMIT, _spf, _primes
+    SPF_LIMIT = max(int(limit), 4)
+    _spf = None
+    _primes = None
+    _result_cache.clear()
+
+def _get_spf() -> array:
+    global _spf
+    if _spf is None:
+        _spf = _build_spf(SPF_LIMIT)
+    return _spf
+
+def _table_primes() -> list[int]:
+    global _primes
+    if _primes is None:
+        spf = _get_spf()
+        _primes = [n for n in range(2, len(spf)) if spf[n] == n]
+    return _primes
+
+# ==============================================================================
+# SECTION 2: FACTORING
+# ==============================================================================
+
+def _factor_small(n: int) -> list[int]:
+    spf = _get_spf()
+    factors = []
+    while n > 1:
+        p = spf[n]
+        factors.append(p)
+        n //= p
+    return factors
+
+def _pollard_brent(n: int, deadline):
+    """A non-trivial factor of composite n (Brent's cycle variant), or None once deadline passes."""
+    if n % 2 == 0:
+        return 2
+    rng = random.Random(n)  # deterministic per number, so repeated runs agree
+    block = 128
+    while True:
+        y, c = rng.randrange(1, n), rng.randrange(1, n)
+        g = r = q = 1
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(block, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += block
+                if deadline is not None and time.perf_counter() > deadline:
+                    return None
+            r *= 2
+        if g == n:
+            # The batched gcd overshot; step back one at a time from the last checkpoint.
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+
+class FactorResult:
+    """Prime factors of n plus how long they took; complete is False when the budget ran out."""
+
+    def __init__(self, n, factors, complete, seconds, method, budget):
+        self.n = n
+        self.factors = factors    # ascending; an unsplit composite cofactor is included as-is
+        self.complete = complete
+        self.seconds = seconds
+        self.method = method      # 'table', 'trial' or 'pollard-rho'
+        self.budget = budget
+
+    @property
+    def chain(self) -> list[int]:
+        return list(_chain_from_factors(self.n, self.factors))
+
+    @property
+    def leftover(self) -> list[int]:
+        """Composite cofactors that could not be split within the budget."""
+        return [f for f in self.factors if not number_props.miller_rabin(f)] if not self.complete else []
+
+    def timing(self) -> str:
+        budget = f" of {self.budget:g}s budget" if self.budget is not None else ""
+        status = "" if self.complete else ", budget exhausted"
+        return f"{self.method}, {self.seconds * 1000:.1f} ms{budget}{status}"
+
+def factorize_timed(n: int, budget: float = None) -> FactorResult:
+    """
+    Factors n with at most `budget` seconds of Pollard-rho work (None = no limit).
+    Small primes are stripped by the SPF table, primality is Miller-Rabin, and
+    results are cached. An incomplete result is reused for calls with the same
+    or a smaller budget; a larger budget tries again.
+    """
+    cached = _result_cache.get(n)
+    if cached is not None and (cached.complete or (budget is not None and budget <= cached.budget)):
+        _result_cache.move_to_end(n)
+        return cached
+    started = time.perf_counter()
+    deadline = started + budget if budget is not None else None
+    if n < SPF_LIMIT:
+        factors, leftovers, method = (_factor_small(n) if n > 1 else []), [], 'table'
+    else:
+        factors, leftovers, method = [], [], 'trial'
+        rest = n
+        for p in _table_primes()[:TRIAL_PRIMES]:
+            if p * p > rest:
+                break
+            while rest % p == 0:
+                factors.append(p)
+                rest //= p
+        stack = [rest] if rest > 1 else []
+        while stack:
+            m = stack.pop()
+            if m < SPF_LIMIT:
+                factors.extend(_factor_small(m))
+            elif number_props.miller_rabin(m):
+                factors.append(m)
+            else:
+                method = 'pollard-rho'
+                d = _pollard_brent(m, deadline)
+                if d is None:
+                    leftovers.append(m)
+                else:
+                    stack.extend((d, m // d))
+    result = FactorResult(n, sorted(factors + leftovers), not leftovers, time.perf_counter() - started, method, budget)
+    if n >= SPF_LIMIT:
+        _result_cache[n] = result
+        _result_cache.move_to_end(n)
+        if len(_result_cache) > CHAIN_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return result
+
+def prime_factors(n: int, budget: float = DEFAULT_TIME_BUDGET) -> list[int]:
+    """Prime factors of n in ascending order, with multiplicity ([] for n < 2)."""
+    if n < 2:
+        return []
+    return _factor_small(n) if n < SPF_LIMIT else factorize_timed(n, budget).factors
+
+def _chain_from_factors(n: int, factors) -> tuple:
+    chain = {n}
+    current = n
+    for p in factors:
+        current //= p
+        if current > 1:
+            chain.add(current)
+    return tuple(sorted(chain, reverse=True))
+
+def factorization_chain(n: int, budget: float = DEFAULT_TIME_BUDGET) -> tuple:
+    """n followed by every quotient left after dividing out its prime factors smallest first, descending."""
+    if n < SPF_LIMIT:
+        return _chain_from_factors(n, _factor_small(n) if n > 1 else [])
+    return _chain_from_factors(n, factorize_timed(n, budget).factors)
+
+def get_factorization_chain(n: int) -> list[int]:
+    """Drop-in for the scripts' get_factorization_chain: [] for non-ints and n <= 0."""
+    if isinstance(n, bool) or not isinstance(n, int) or n <= 0:
+        return []
+    return list(factorization_chain(n))
+
+# ==============================================================================
+# SECTION 3: BATCH
+# ==============================================================================
+
+def factorize_many(values) -> dict:
+    """{value: prime factors} for every distinct positive integer in values, e.g. a whole lexicon's keys."""
+    distinct = sorted({v for v in values if isinstance(v, int) and not isinstance(v, bool) and v > 0})
+    if distinct and distinct[0] < SPF_LIMIT:
+        _get_spf()
+    return {v: prime_factors(v) for v in distinct}
+
+def chains_for(values) -> dict:
+    """{value: factorization chain} for many values at once."""
+    return {v: list(_chain_from_factors(v, factors)) for v, factors in factorize_many(values).items()}
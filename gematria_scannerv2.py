@@ -1,96 +1,40 @@
 # gematria_scanner_specific_folder.py
+import argparse
 import os
-import re
-import pdfplumber
+
+from ngram_scanner import (MANIFEST_FILENAME, ScanManifest, ScanProgress, find_source_files, plan_scan,
+                           scan_file, scan_files, scanner_config)
 
 # --- Configuration ---
 # The number of words to include in each chunk/phrase.
 CHUNK_SIZE = 5 
 
-# --- Gematria Mapping ---
-GEMATRIA_MAP = {
-    'a': 1, 'b': 2, 'c': 3, 'd': 4, 'e': 5, 'f': 6, 'g': 7, 'h': 8, 'i': 9,
-    'j': 10, 'k': 20, 'l': 30, 'm': 40, 'n': 50, 'o': 60, 'p': 70, 'q': 80, 'r': 90,
-    's': 100, 't': 200, 'u': 300, 'v': 400, 'w': 500, 'x': 600, 'y': 700, 'z': 800
-}
-
-def calculate_gematria(text: str) -> int:
-    """Calculates the gematria value of a string."""
-    total = 0
-    for char in text.lower():
-        total += GEMATRIA_MAP.get(char, 0)
-    return total
-
-def extract_text_from_txt(filepath: str) -> str:
-    """Extracts all text from a .txt file."""
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
-    except Exception as e:
-        print(f"Error reading TXT file {filepath}: {e}")
-        return ""
-
-def extract_text_from_pdf(filepath: str) -> str:
-    """Extracts all text from a .pdf file."""
-    text = ""
-    try:
-        with pdfplumber.open(filepath) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text
-    except Exception as e:
-        print(f"Error reading PDF file {filepath}: {e}")
-        return ""
-
 def process_file(filepath: str):
     """
     Extracts text, calculates gematria for chunks, and saves to an output file.
     """
     print(f"--> Processing file: {filepath}")
-    
-    if filepath.lower().endswith('.txt'):
-        full_text = extract_text_from_txt(filepath)
-    elif filepath.lower().endswith('.pdf'):
-        full_text = extract_text_from_pdf(filepath)
+    report(scan_file(filepath, window_sizes=(CHUNK_SIZE,), ciphers=('jewish_gematria',)))
+
+def report(scan):
+    """Prints the outcome of one scanned file."""
+    if scan.status == 'ok':
+        print(f"    +++ Success! Output saved to: {scan.outputs[0]}")
+    elif scan.status == 'empty':
+        print(f"    No text extracted from {scan.path}. Skipping.")
+    elif scan.status == 'short':
+        print(f"    Not enough words in {scan.path} to create a chunk of size {CHUNK_SIZE}. Skipping.")
     else:
-        return
-
-    if not full_text:
-        print(f"    No text extracted from {filepath}. Skipping.")
-        return
-
-    words = re.sub(r'[^a-zA-Z\s]', ' ', full_text).split()
-
-    if len(words) < CHUNK_SIZE:
-        print(f"    Not enough words in {filepath} to create a chunk of size {CHUNK_SIZE}. Skipping.")
-        return
-
-    output_filename = f"{os.path.basename(filepath)}.gematria.txt"
-    output_path = os.path.join(os.path.dirname(filepath), output_filename)
-    
-    results = []
-    for i in range(len(words) - CHUNK_SIZE + 1):
-        chunk_list = words[i:i + CHUNK_SIZE]
-        chunk_text = ' '.join(chunk_list)
-        gematria_value = calculate_gematria(chunk_text)
-        results.append(f"{filepath}|{chunk_text}|{gematria_value}")
-
-    if results:
-        try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(results))
-            print(f"    +++ Success! Output saved to: {output_path}")
-        except Exception as e:
-            print(f"    --- Error writing output file for {filepath}: {e}")
-    else:
-        print(f"    No valid chunks found in {filepath}.")
+        print(f"    --- Error processing {scan.path}: {scan.error}")
 
 if __name__ == '__main__':
-    # --- THIS IS THE MODIFIED LINE ---
-    # It now points to your specific folder. The '~' is a shortcut for your home directory.
-    start_dir = os.path.expanduser('~/beansengine/scrape')
+    parser = argparse.ArgumentParser(description="Writes 5-word Jewish gematria chunks for every .txt/.pdf in a folder.")
+    # It points to your specific folder by default. The '~' is a shortcut for your home directory.
+    parser.add_argument('start_dir', nargs='?', default='~/beansengine/scrape', help="Folder to scan (default: ~/beansengine/scrape).")
+    parser.add_argument('--workers', type=int, default=1, help="Number of worker processes (default: 1).")
+    parser.add_argument('--force', action='store_true', help="Rescan every file, even ones unchanged since the last scan.")
+    args = parser.parse_args()
+    start_dir = os.path.expanduser(args.start_dir)
     
     print("--- Starting Gematria Scanner ---")
     
@@ -100,11 +44,20 @@ if __name__ == '__main__':
         print("--- Please check the path in the script and try again. ---")
     else:
         print(f"Scanning for .txt and .pdf files in {os.path.abspath(start_dir)}...")
-        for root, dirs, files in os.walk(start_dir):
-            for file in files:
-                if file.lower().endswith(('.txt', '.pdf')):
-                    if file.endswith('.gematria.txt'):
-                        continue
-                    full_path = os.path.join(root, file)
-                    process_file(full_path)
-        print("--- Scan complete. ---")
+        config = scanner_config((CHUNK_SIZE,), ('jewish_gematria',))
+        # The manifest lives in the scanned folder, next to the outputs.
+        manifest = ScanManifest.load(os.path.join(start_dir, MANIFEST_FILENAME))
+        paths, unchanged = plan_scan(find_source_files(start_dir), manifest, config, force=args.force)
+        if unchanged:
+            print(f"Skipping {len(unchanged)} unchanged files (use --force to rescan).")
+        progress = ScanProgress(len(paths))
+        # Files finish in any order when running in parallel; each output is written atomically.
+        try:
+            for scan in scan_files(paths, (CHUNK_SIZE,), ('jewish_gematria',), workers=max(1, args.workers)):
+                progress.update(scan)
+                manifest.record(scan, config)
+                print(f"--> {progress.line()} {scan.path}")
+                report(scan)
+        finally:
+            manifest.save()
+        print(f"--- Scan complete. {progress.summary()}, {len(unchanged)} unchanged ---")
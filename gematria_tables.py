@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# gematria_tables.py
+# Canonical 26-entry letter tables shared by the cipher engine and registry.
+# Kept free of third-party imports so every script can load it.
+
+# ==============================================================================
+# LETTER MAPS & TABLES
+# ==============================================================================
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+NON_LETTER_CODE = 26  # Code given to every byte that is not A-Z / a-z.
+
+def _table_from_map(mapping: dict) -> list[int]:
+    return [mapping.get(c, 0) for c in ALPHABET]
+
+ALW_MAP = {'A': 1, 'B': 20, 'C': 13, 'D': 6, 'E': 25, 'F': 18, 'G': 11, 'H': 4, 'I': 23, 'J': 16, 'K': 9, 'L': 2, 'M': 21, 'N': 14, 'O': 7, 'P': 26, 'Q': 19, 'R': 12, 'S': 5, 'T': 24, 'U': 17, 'V': 10, 'W': 3, 'X': 22, 'Y': 15, 'Z': 8}
+TRIGRAM_MAP = {'A': 5, 'B': 20, 'C': 2, 'D': 23, 'E': 13, 'F': 12, 'G': 11, 'H': 3, 'I': 0, 'J': 7, 'K': 17, 'L': 1, 'M': 21, 'N': 24, 'O': 10, 'P': 4, 'Q': 16, 'R': 14, 'S': 15, 'T': 9, 'U': 25, 'V': 22, 'W': 8, 'X': 6, 'Y': 18, 'Z': 19}
+BACON_MAP = {'A': 0, 'B': 1, 'C': 2, 'D': 3, 'E': 4, 'F': 5, 'G': 6, 'H': 7, 'I': 8, 'J': 8, 'K': 9, 'L': 10, 'M': 11, 'N': 12, 'O': 13, 'P': 14, 'Q': 15, 'R': 16, 'S': 17, 'T': 18, 'U': 19, 'V': 19, 'W': 20, 'X': 21, 'Y': 22, 'Z': 23}
+CHALDEAN_MAP = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 8, 'G': 3, 'H': 5, 'I': 1, 'J': 1, 'K': 2, 'L': 3, 'M': 4, 'N': 5, 'O': 7, 'P': 8, 'Q': 1, 'R': 2, 'S': 3, 'T': 4, 'U': 6, 'V': 6, 'W': 6, 'X': 5, 'Y': 1, 'Z': 7}
+HEX_POS_MAP = {'A': 0, 'B': 1, 'C': 2, 'D': 3, 'E': 4, 'F': 5, 'G': 6, 'H': 7, 'I': 8, 'J': 9, 'K': 10, 'L': 11, 'M': 12, 'N': 13, 'O': 14, 'P': 15, 'Q': 0, 'R': 1, 'S': 2, 'T': 3, 'U': 4, 'V': 5, 'W': 6, 'X': 7, 'Y': 8, 'Z': 10}
+PHONE_MAP = {'A': 2, 'B': 2, 'C': 2, 'D': 3, 'E': 3, 'F': 3, 'G': 4, 'H': 4, 'I': 4, 'J': 5, 'K': 5, 'L': 5, 'M': 6, 'N': 6, 'O': 6, 'P': 7, 'Q': 7, 'R': 7, 'S': 8, 'T': 8, 'U': 8, 'V': 9, 'W': 9, 'X': 9, 'Y': 9, 'Z': 9}
+SOLFEGE_MAP = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 1, 'I': 2, 'J': 3, 'K': 4, 'L': 5, 'M': 6, 'N': 7, 'O': 1, 'P': 2, 'Q': 3, 'R': 4, 'S': 5, 'T': 6, 'U': 7, 'V': 1, 'W': 2, 'X': 3, 'Y': 4, 'Z': 5}
+ZODIAC_MAP = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8, 'I': 9, 'J': 10, 'K': 11, 'L': 12, 'M': 1, 'N': 2, 'O': 3, 'P': 4, 'Q': 5, 'R': 6, 'S': 7, 'T': 8, 'U': 9, 'V': 10, 'W': 11, 'X': 12, 'Y': 1, 'Z': 2}
+JEWISH_GEMATRIA_MAP = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8, 'I': 9, 'J': 10, 'K': 20, 'L': 30, 'M': 40, 'N': 50, 'O': 60, 'P': 70, 'Q': 80, 'R': 90, 'S': 100, 'T': 200, 'U': 300, 'V': 400, 'W': 500, 'X': 600, 'Y': 700, 'Z': 800}
+QWERTY_ORDER = 'QWERTYUIOPASDFGHJKLZXCVBNM'
+QWERTY_MAP = {c: i + 1 for i, c in enumerate(QWERTY_ORDER)}
+LEFT_HAND_QWERTY_KEYS = set('QWERTYASDFGZXCVB')
+RIGHT_HAND_QWERTY_KEYS = set('YUIOPHJKLNM')
+BEANS_LETTERS = set('BEANSUYLDIA')
+LEET_SUB_LETTERS = set('IEASTBO')
+POLYBIUS_GRID = [['A', 'B', 'C', 'D', 'E'], ['F', 'G', 'H', 'I/J', 'K'], ['L', 'M', 'N', 'O', 'P'], ['Q', 'R', 'S', 'T', 'U'], ['V', 'W', 'X', 'Y', 'Z']]
+POLYBIUS_SUM_MAP = {}
+for r_idx, row in enumerate(POLYBIUS_GRID):
+    for c_idx, char_entry in enumerate(row):
+        for p_char in char_entry.split('/'): POLYBIUS_SUM_MAP[p_char] = (r_idx + 1) + (c_idx + 1)
+
+_ORDINAL = [i + 1 for i in range(26)]
+
+# Every table is indexed by letter code 0..25 (A..Z).
+LETTER_TABLES = {
+    'simple': _ORDINAL,
+    'english': [6 * v for v in _ORDINAL],
+    'sumerian': [6 * v for v in _ORDINAL],
+    'reverse': [26 - i for i in range(26)],
+    'jewish': _table_from_map(JEWISH_GEMATRIA_MAP),
+    'alw': _table_from_map(ALW_MAP),
+    'chaldean': _table_from_map(CHALDEAN_MAP),
+    'trigrammaton': _table_from_map(TRIGRAM_MAP),
+    'baconian': _table_from_map(BACON_MAP),
+    'hexadecimal_position': _table_from_map(HEX_POS_MAP),
+    'phone_keypad': _table_from_map(PHONE_MAP),
+    'solfege': _table_from_map(SOLFEGE_MAP),
+    'zodiac': _table_from_map(ZODIAC_MAP),
+    'polybius_square': _table_from_map(POLYBIUS_SUM_MAP),
+    'caesar': [((i + 3) % 26) + 1 for i in range(26)],
+    'qwerty': _table_from_map(QWERTY_MAP),
+    'left_hand_qwerty': [QWERTY_MAP[c] if c in LEFT_HAND_QWERTY_KEYS else 0 for c in ALPHABET],
+    'right_hand_qwerty': [QWERTY_MAP[c] if c in RIGHT_HAND_QWERTY_KEYS else 0 for c in ALPHABET],
+    'beans_cipher': [0 if c in BEANS_LETTERS else i + 1 for i, c in enumerate(ALPHABET)],
+    'leet_code': [0 if c in LEET_SUB_LETTERS else i + 1 for i, c in enumerate(ALPHABET)],
+    'beans_369': [(3, 6, 9)[i % 3] for i in range(26)],
+}
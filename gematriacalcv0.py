@@ -1,20 +1,18 @@
-```python
+import time
+STARTUP_STARTED = time.perf_counter()
 import math
 import re
 import sqlite3
 import logging
-import nltk
-from nltk import pos_tag, word_tokenize
 import random
-
-nltk.download('punkt_tab', quiet=True)
-nltk.download('averaged_perceptron_tagger_eng', quiet=True)
+from nlp_models import pos_tag, startup_report, word_tokenize
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Database config
 DB_NAME = 'gematria_data.db'
+STARTUP_BUDGET = 0.5  # seconds from launch until the first word is processed; reported at startup
 
 # Helper functions
 def int_to_base8(num): return ''.join(str(num % 8**(i+1) // 8**i) for i in range(int(math.log(num, 8))+1))[::-1] if num else '0'
@@ -291,6 +289,7 @@ def predict_next_sentence(input_sentence):
 # Example main
 def main():
     init_db()
+    logging.info(startup_report("Gematria calculator", STARTUP_STARTED, STARTUP_BUDGET))
     words = ["CAT", "DEED"]
     for word in words:
         logging.info(f"\n--- Gematria for {word} ---")
@@ -312,5 +311,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-```
-</
\ No newline at end of file
@@ -6,6 +6,7 @@ import base64
 import io
 import pyperclip
 import colorsys
+import cipher_registry
 import random
 import json # For parsing firebase config
 import uuid # Added for generating UUIDs
@@ -126,27 +127,17 @@ RESONANCE_EMOTIONS = {
 RESONANCE_EMOTIONS_LOWER = {k.lower(): v for k, v in RESONANCE_EMOTIONS.items()}
 
 # --- Gematria Functions ---
-def simple(word):
-    return sum(ord(c) - 64 for c in word.upper() if 'A' <= c <= 'Z')
+simple = cipher_registry.get('simple_gematria').evaluate
 
-def jewish_gematria(word):
-    GEMATRIA_MAP = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8, 'I': 9,
-                    'J': 10, 'K': 20, 'L': 30, 'M': 40, 'N': 50, 'O': 60, 'P': 70, 'Q': 80, 'R': 90,
-                    'S': 100, 'T': 200, 'U': 300, 'V': 400, 'W': 500, 'X': 600, 'Y': 700, 'Z': 800}
-    return sum(GEMATRIA_MAP.get(c, 0) for c in word.upper() if 'A' <= c <= 'Z')
+jewish_gematria = cipher_registry.get('jewish_gematria').evaluate
 
 QWERTY_ORDER = 'QWERTYUIOPASDFGHJKLZXCVBNM'
 QWERTY_MAP = {c: i + 1 for i, c in enumerate(QWERTY_ORDER)}
-def qwerty(word):
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper())
+qwerty = cipher_registry.get('qwerty').evaluate
 
-def left_hand_qwerty(word):
-    LEFT_HAND_KEYS = set('QWERTYASDFGZXCVB')
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper() if c in LEFT_HAND_KEYS)
+left_hand_qwerty = cipher_registry.get('left_hand_qwerty').evaluate
 
-def right_hand_qwerty(word):
-    RIGHT_HAND_KEYS = set('YUIOPHJKLNM')
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper() if c in RIGHT_HAND_KEYS)
+right_hand_qwerty = cipher_registry.get('right_hand_qwerty').evaluate
 
 def binary_sum(word):
     return ''.join(format(ord(c), '08b') for c in word).count('1')
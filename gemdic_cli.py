@@ -5,6 +5,7 @@ import sqlite3
 import colorsys
 import random
 import pyperclip # For clipboard operations
+import cipher_registry
 
 # --- Initialize SQLite Database ---
 DB_NAME = 'gematria_data.db'
@@ -78,33 +79,18 @@ RESONANCE_EMOTIONS = {
 }
 
 # --- Gematria Calculation Functions ---
-def simple(word):
-    """Calculates the Simple Gematria value of a word."""
-    return sum(ord(c) - 64 for c in word.upper() if 'A' <= c <= 'Z')
+simple = cipher_registry.get('simple_gematria').evaluate
 
-def jewish_gematria(word):
-    """Calculates the Jewish Gematria value of a word."""
-    GEMATRIA_MAP = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8, 'I': 9,
-                    'J': 10, 'K': 20, 'L': 30, 'M': 40, 'N': 50, 'O': 60, 'P': 70, 'Q': 80, 'R': 90,
-                    'S': 100, 'T': 200, 'U': 300, 'V': 400, 'W': 500, 'X': 600, 'Y': 700, 'Z': 800}
-    return sum(GEMATRIA_MAP.get(c, 0) for c in word.upper() if 'A' <= c <= 'Z')
+jewish_gematria = cipher_registry.get('jewish_gematria').evaluate
 
 QWERTY_ORDER = 'QWERTYUIOPASDFGHJKLZXCVBNM'
 QWERTY_MAP = {c: i + 1 for i, c in enumerate(QWERTY_ORDER)}
 
-def qwerty(word):
-    """Calculates the Qwerty Gematria value of a word."""
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper())
+qwerty = cipher_registry.get('qwerty').evaluate
 
-def left_hand_qwerty(word):
-    """Calculates the Left-Hand Qwerty Gematria value of a word."""
-    LEFT_HAND_KEYS = set('QWERTYASDFGZXCVB')
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper() if c in LEFT_HAND_KEYS)
+left_hand_qwerty = cipher_registry.get('left_hand_qwerty').evaluate
 
-def right_hand_qwerty(word):
-    """Calculates the Right-Hand Qwerty Gematria value of a word."""
-    RIGHT_HAND_KEYS = set('YUIOPHJKLNM')
-    return sum(QWERTY_MAP.get(c, 0) for c in word.upper() if c in RIGHT_HAND_KEYS)
+right_hand_qwerty = cipher_registry.get('right_hand_qwerty').evaluate
 
 def binary_sum(word):
     """Calculates the binary sum (count of '1's in ASCII binary representation) of a word."""
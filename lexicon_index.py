@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+# lexicon_index.py
+# Compiled, memory-mapped gematria lexicon for the Oracle scripts.
+#
+# `compile-lexicon` parses the txt_db folder (`path|phrase|value` dumps and
+# `words.txt` `WORD:v1:v2` lines) once and writes a single binary file:
+#
+#   header | values (sorted int64) | bucket offsets (int64, N_BUCKETS per value + 1)
+#          | postings (uint32 phrase ids) | string offsets (int64) | utf-8 strings
+#
+# Values beyond int64 are kept as decimal strings after the phrases in the
+# string pool, sorted by number after the int64 values, so a compiled index
+# holds exactly what the txt_db text parse would.
+#
+# Each value's postings are grouped by word count (1, 2, 3, 4-5, other), so
+# the Oracle can draw k phrases of a given length without touching the rest.
+# Opening it is an mmap plus a header read; `index[num]` is a binary search
+# over the value array and decodes only that value's phrases.
+import argparse
+import bisect
+import hashlib
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Sequence
+
+INDEX_MAGIC = b'GLEXIDX\x00'
+INDEX_VERSION = 3
+# magic, version, reserved, n_values, n_big, n_phrases, n_postings, string bytes, source signature
+_HEADER = struct.Struct('<8sIIQQQQQ32s')
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+# Word-count buckets, named like the Oracle's DISPLAY_LIMITS keys; the last one
+# (no words, or more than five) is stored but never displayed.
+WORD_COUNT_BUCKETS = ('single_words', 'two_word_phrases', 'three_word_phrases', 'four_five_word_phrases')
+N_BUCKETS = len(WORD_COUNT_BUCKETS) + 1
+
+def word_count_bucket(phrase: str) -> int:
+    word_count = len(phrase.split())
+    if 1 <= word_count <= 3:
+        return word_count - 1
+    return 3 if 4 <= word_count <= 5 else 4
+
+# ==============================================================================
+# SECTION 1: SOURCE FILES
+# ==============================================================================
+
+def source_files(main_db_dir: str) -> list[str]:
+    """Every lexicon source under main_db_dir, in a stable order."""
+    found = []
+    for root, _, files in os.walk(main_db_dir):
+        for file in files:
+            if file.endswith('.txt') or file.lower() == 'words.txt':
+                found.append(os.path.join(root, file))
+    return sorted(found)
+
+def source_signature(main_db_dir: str) -> bytes:
+    """sha256 over (path, size, mtime) of every source; changes whenever a source file does."""
+    digest = hashlib.sha256()
+    for path in source_files(main_db_dir):
+        st = os.stat(path)
+        digest.update(f"{os.path.relpath(path, main_db_dir)}|{st.st_size}|{st.st_mtime_ns}\n".encode('utf-8', 'surrogateescape'))
+    return digest.digest()
+
+def iter_source_entries(main_db_dir: str, stats: dict = None):
+    """
+    Yields (value, phrase) for every entry in the txt_db folder, parsed exactly
+    like the Oracle's load_lexicon. Counts go into `stats` if given.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('main_files', 0)
+    stats.setdefault('words_file_entries', 0)
+    for filepath in source_files(main_db_dir):
+        is_words_file = os.path.basename(filepath).lower() == 'words.txt'
+        if not is_words_file:
+            stats['main_files'] += 1
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if is_words_file:
+                        line = line.strip()
+                        if not line: continue
+                        parts = line.split(':')
+                        if len(parts) >= 2:
+                            phrase = parts[0].strip()
+                            for value_str in parts[1:]:
+                                try:
+                                    value = int(value_str.strip())
+                                except ValueError:
+                                    continue
+                                stats['words_file_entries'] += 1
+                                yield value, phrase
+                    else:
+                        parts = line.strip().split('|')
+                        if len(parts) == 3:
+                            try:
+                                value = int(parts[2])
+                            except ValueError:
+                                continue
+                            yield value, parts[1].strip()
+        except Exception as e:
+            print(f"    --- Could not process {'words' if is_words_file else 'main DB'} file {filepath}: {e}")
+
+def iter_user_entries(user_additions_file: str):
+    """Yields (value, phrase) from a `phrase|value` user additions file."""
+    with open(user_additions_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.strip().split('|')
+            if len(parts) == 2:
+                try:
+                    yield int(parts[1]), parts[0].strip()
+                except ValueError:
+                    pass
+
+# ==============================================================================
+# SECTION 2: COMPILING
+# ==============================================================================
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+def compile_lexicon(main_db_dir: str, index_path: str) -> dict:
+    """Parses main_db_dir once and writes the binary index to index_path. Returns build stats."""
+    started = time.perf_counter()
+    signature = source_signature(main_db_dir)
+    stats = {}
+    phrase_ids = {}
+    buckets = array('B')  # phrase id -> word-count bucket
+    postings_by_value = {}
+    for value, phrase in iter_source_entries(main_db_dir, stats):
+        pid = phrase_ids.get(phrase)
+        if pid is None:
+            pid = phrase_ids[phrase] = len(buckets)
+            buckets.append(word_count_bucket(phrase))
+        postings_by_value.setdefault(value, {})[pid] = None  # dict keeps first-seen order, drops repeats
+
+    values = sorted(v for v in postings_by_value if INT64_MIN <= v <= INT64_MAX)
+    big = sorted(v for v in postings_by_value if not INT64_MIN <= v <= INT64_MAX)
+    offsets = [0]
+    postings = []
+    for value in values + big:
+        by_bucket = [[] for _ in range(N_BUCKETS)]
+        for pid in postings_by_value[value]:
+            by_bucket[buckets[pid]].append(pid)
+        for ids in by_bucket:
+            postings.extend(ids)
+            offsets.append(len(postings))
+    encoded = [p.encode('utf-8') for p in phrase_ids]  # dicts iterate in id order
+    encoded += [str(v).encode('ascii') for v in big]
+    string_offsets = [0]
+    for raw in encoded:
+        string_offsets.append(string_offsets[-1] + len(raw))
+
+    sections = [
+        struct.pack(f'<{len(values)}q', *values),
+        struct.pack(f'<{len(offsets)}q', *offsets),
+        struct.pack(f'<{len(postings)}I', *postings),
+        struct.pack(f'<{len(string_offsets)}q', *string_offsets),
+        b''.join(encoded),
+    ]
+    header = _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, 0, len(values), len(big), len(phrase_ids), len(postings),
+                          string_offsets[-1], signature)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(b'\0' * _pad8(len(header)))
+        for section in sections:
+            f.write(section)
+            f.write(b'\0' * _pad8(len(section)))
+    os.replace(tmp_path, index_path)
+    stats.update(values=len(values) + len(big), big_values=len(big), phrases=len(phrase_ids), postings=len(postings),
+                 bytes=os.path.getsize(index_path), seconds=time.perf_counter() - started)
+    return stats
+
+# ==============================================================================
+# SECTION 3: READING
+# ==============================================================================
+
+class _BigValues(Sequence):
+    """The out-of-int64 values of an index, decoded on access so bisect can search them."""
+
+    def __init__(self, index, count: int):
+        self._index = index
+        self._count = count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return int(self._index.phrase(self._index.n_phrases + i))
+
+    def __len__(self):
+        return self._count
+
+class LexiconIndex:
+    """Read-only view of a compiled lexicon; nothing is decoded until a value is looked up."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, n_values, n_big, n_phrases, n_postings, n_bytes, signature = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            raise ValueError(f"{path} is not a compiled lexicon index.")
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"{path} is not a version {INDEX_VERSION} lexicon index; recompile it.")
+        self.signature = signature
+        self.n_phrases = n_phrases
+        view = memoryview(self._mm)
+        pos = _HEADER.size + _pad8(_HEADER.size)
+
+        def section(count, fmt, itemsize):
+            nonlocal pos
+            size = count * itemsize
+            part = view[pos:pos + size].cast(fmt)
+            pos += size + _pad8(size)
+            return part
+
+        self._values = section(n_values, 'q', 8)
+        self._offsets = section((n_values + n_big) * N_BUCKETS + 1, 'q', 8)
+        self._postings = section(n_postings, 'I', 4)
+        self._string_offsets = section(n_phrases + n_big + 1, 'q', 8)
+        self._strings_start = pos
+        self._big = _BigValues(self, n_big)
+
+    def __len__(self):
+        return len(self._values) + len(self._big)
+
+    def _slot(self, value):
+        if not isinstance(value, int):
+            return -1
+        if INT64_MIN <= value <= INT64_MAX:
+            keys, base = self._values, 0
+        else:
+            keys, base = self._big, len(self._values)
+        i = bisect.bisect_left(keys, value)
+        return base + i if i < len(keys) and keys[i] == value else -1
+
+    def __contains__(self, value):
+        return self._slot(value) >= 0
+
+    def phrase(self, phrase_id: int) -> str:
+        start = self._strings_start + self._string_offsets[phrase_id]
+        end = self._strings_start + self._string_offsets[phrase_id + 1]
+        return self._mm[start:end].decode('utf-8')
+
+    def phrase_ids(self, value) -> memoryview:
+        i = self._slot(value)
+        if i < 0:
+            return self._postings[0:0]
+        return self._postings[self._offsets[i * N_BUCKETS]:self._offsets[(i + 1) * N_BUCKETS]]
+
+    def bucket_ids(self, value, bucket: int) -> memoryview:
+        """Phrase ids of one word-count bucket of a value."""
+        i = self._slot(value)
+        if i < 0:
+            return self._postings[0:0]
+        slot = i * N_BUCKETS + bucket
+        return self._postings[self._offsets[slot]:self._offsets[slot + 1]]
+
+    def get(self, value, default=None):
+        if value not in self:
+            return default
+        return [self.phrase(pid) for pid in self.phrase_ids(value)]
+
+    def __getitem__(self, value):
+        phrases = self.get(value)
+        if phrases is None:
+            raise KeyError(value)
+        return phrases
+
+    def values(self):
+        yield from self._values
+        yield from self._big
+
+    def file_size(self) -> int:
+        return len(self._mm)
+
+    def is_current(self, main_db_dir: str) -> bool:
+        return self.signature == source_signature(main_db_dir)
+
+# ==============================================================================
+# SECTION 4: LEXICON WITH USER OVERLAY
+# ==============================================================================
+
+class Lexicon:
+    """
+    The Oracle's LEXICON: an optional compiled index plus in-memory entries
+    (user additions, or the whole txt_db when no current index exists).
+    In-memory phrases are interned once in `phrases`; each value keeps an
+    array of distinct phrase ids grouped by word-count bucket. Supports
+    `num in LEXICON`, `LEXICON[num]` (distinct phrases), `LEXICON.add(num, phrase)`
+    and `LEXICON.sample(num, limits)`.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.index = None
+        self.phrases = []        # phrase id -> phrase
+        self._ids = {}           # phrase -> phrase id
+        self._buckets = array('B')  # phrase id -> word-count bucket
+        self.extra = {}          # value -> array('I') of distinct phrase ids, ordered by bucket
+        self._bounds = {}        # value -> array('I') of N_BUCKETS + 1 offsets into extra[value]
+
+    def attach(self, index: LexiconIndex):
+        self.index = index
+
+    def intern(self, phrase: str) -> int:
+        pid = self._ids.get(phrase)
+        if pid is None:
+            pid = self._ids[phrase] = len(self.phrases)
+            self.phrases.append(phrase)
+            self._buckets.append(word_count_bucket(phrase))
+        return pid
+
+    def _store(self, value, ids):
+        """Stores distinct ids for value, grouped by bucket (stable, so first-seen order is kept within a bucket)."""
+        bucket_of = self._buckets
+        ids = sorted(ids, key=bucket_of.__getitem__)
+        bounds = array('I', [0] * (N_BUCKETS + 1))
+        for pid in ids:
+            bounds[bucket_of[pid] + 1] += 1
+        for b in range(N_BUCKETS):
+            bounds[b + 1] += bounds[b]
+        self.extra[value] = array('I', ids)
+        self._bounds[value] = bounds
+
+    def load_entries(self, entries) -> int:
+        """Bulk-loads (value, phrase) pairs, dropping repeats within each value. Returns the pairs read."""
+        staged = {}
+        count = 0
+        intern = self.intern
+        for value, phrase in entries:
+            staged.setdefault(value, []).append(intern(phrase))
+            count += 1
+        for value, ids in staged.items():
+            merged = dict.fromkeys(self.extra.get(value, ()))
+            merged.update(dict.fromkeys(ids))
+            self._store(value, merged)
+        return count
+
+    def add(self, value: int, phrase: str) -> bool:
+        """Associates phrase with value; returns False if it already was."""
+        if self.index is not None and value in self.index and phrase in self.index[value]:
+            return False
+        pid = self.intern(phrase)
+        ids = self.extra.get(value)
+        if ids is None:
+            self._store(value, (pid,))
+            return True
+        if pid in ids:
+            return False
+        bounds = self._bounds[value]
+        bucket = self._buckets[pid]
+        ids.insert(bounds[bucket + 1], pid)
+        for b in range(bucket + 1, N_BUCKETS + 1):
+            bounds[b] += 1
+        return True
+
+    def __contains__(self, value):
+        return value in self.extra or (self.index is not None and value in self.index)
+
+    def __getitem__(self, value):
+        phrases = self.index.get(value, []) if self.index is not None else []
+        phrases.extend(self.phrases[pid] for pid in self.extra.get(value, ()))
+        return phrases
+
+    def __len__(self):
+        if self.index is None:
+            return len(self.extra)
+        return len(self.index) + sum(1 for v in self.extra if v not in self.index)
+
+    def sample(self, value, limits: dict, rng=random) -> dict:
+        """
+        Picks up to limits[bucket] random phrases from each word-count bucket of
+        value. Only the chosen positions are drawn and decoded, so the cost is
+        O(k) whatever the bucket size.
+        """
+        picks = {}
+        ids = self.extra.get(value)
+        for b, bucket in enumerate(WORD_COUNT_BUCKETS):
+            indexed = self.index.bucket_ids(value, b) if self.index is not None else ()
+            if ids is not None:
+                bounds = self._bounds[value]
+                start, stop = bounds[b], bounds[b + 1]
+            else:
+                start = stop = 0
+            total = len(indexed) + stop - start
+            k = min(max(limits.get(bucket, 0), 0), total)
+            chosen = []
+            for pos in rng.sample(range(total), k):
+                if pos < len(indexed):
+                    chosen.append(self.index.phrase(indexed[pos]))
+                else:
+                    chosen.append(self.phrases[ids[start + pos - len(indexed)]])
+            picks[bucket] = chosen
+        return picks
+
+    def unique_phrase_count(self) -> int:
+        if self.index is None:
+            return len(self.phrases)
+        return self.index.n_phrases + len(self.phrases)
+
+    def memory_report(self) -> dict:
+        """Approximate footprint: heap bytes of the phrase table and per-value id arrays, plus the mapped index."""
+        bucket_bytes = [sys.getsizeof(ids) + sys.getsizeof(self._bounds[v]) for v, ids in self.extra.items()]
+        report = {
+            'values': len(self),
+            'phrases': self.unique_phrase_count(),
+            'postings': sum(len(ids) for ids in self.extra.values()),
+            'phrase_table_bytes': (sys.getsizeof(self.phrases) + sys.getsizeof(self._ids) + sys.getsizeof(self._buckets)
+                                   + sum(sys.getsizeof(p) for p in self.phrases)),
+            'bucket_bytes': sum(bucket_bytes) + sys.getsizeof(self.extra) + sys.getsizeof(self._bounds),
+            'bytes_per_bucket': sum(bucket_bytes) / len(bucket_bytes) if bucket_bytes else 0.0,
+            'largest_bucket_bytes': max(bucket_bytes, default=0),
+            'mapped_index_bytes': 0,
+        }
+        if self.index is not None:
+            report['postings'] += len(self.index._postings)
+            report['mapped_index_bytes'] = self.index.file_size()
+        return report
+
+def format_memory_report(report: dict) -> str:
+    lines = [f"Lexicon memory: {report['values']} numbers, {report['phrases']} phrases, {report['postings']} postings"]
+    lines.append(f"  Phrase table: {report['phrase_table_bytes']:,} bytes")
+    lines.append(f"  Value buckets: {report['bucket_bytes']:,} bytes ({report['bytes_per_bucket']:.1f} bytes/bucket, "
+                 f"largest {report['largest_bucket_bytes']:,} bytes)")
+    if report['mapped_index_bytes']:
+        lines.append(f"  Compiled index (memory-mapped, paged in on demand): {report['mapped_index_bytes']:,} bytes")
+    return "\n".join(lines)
+
+def open_index(index_path: str, main_db_dir: str):
+    """Opens index_path if it exists and matches main_db_dir, else returns None and says why."""
+    if not os.path.exists(index_path):
+        return None
+    try:
+        index = LexiconIndex(index_path)
+    except (OSError, ValueError) as e:
+        print(f"    --- Could not open lexicon index {index_path}: {e}")
+        return None
+    if not index.is_current(main_db_dir):
+        print(f"Lexicon index '{index_path}' is out of date with '{main_db_dir}'.")
+        return None
+    return index
+
+# ==============================================================================
+# SECTION 5: COMMAND LINE
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and inspect memory-mapped gematria lexicon indexes.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_compile = sub.add_parser('compile-lexicon', help="Compile a txt_db folder into a binary index.")
+    p_compile.add_argument('main_db_dir', help="Folder of `path|phrase|value` dumps and words.txt files.")
+    p_compile.add_argument('index_path', help="Output index file, e.g. lexicon.gidx.")
+    p_info = sub.add_parser('info', help="Show index counts and whether it matches its source folder.")
+    p_info.add_argument('index_path')
+    p_info.add_argument('main_db_dir', nargs='?')
+    p_lookup = sub.add_parser('lookup', help="Print the phrases stored for a value.")
+    p_lookup.add_argument('index_path')
+    p_lookup.add_argument('value', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'compile-lexicon':
+        if not os.path.isdir(args.main_db_dir):
+            print(f"Error: The main database directory '{args.main_db_dir}' does not exist.", file=sys.stderr)
+            sys.exit(1)
+        stats = compile_lexicon(args.main_db_dir, args.index_path)
+        print(f"Compiled {stats['main_files']} main database file(s) and {stats['words_file_entries']} words.txt entries "
+              f"into '{args.index_path}': {stats['phrases']} phrases, {stats['values']} values, "
+              f"{stats['postings']} postings, {stats['bytes']:,} bytes in {stats['seconds']:.2f}s.")
+    elif args.command == 'info':
+        started = time.perf_counter()
+        index = LexiconIndex(args.index_path)
+        print(f"{args.index_path}: {len(index)} values, {index.n_phrases} phrases, {len(index._postings)} postings "
+              f"(opened in {(time.perf_counter() - started) * 1000:.2f} ms)")
+        lexicon = Lexicon()
+        lexicon.attach(index)
+        print(format_memory_report(lexicon.memory_report()))
+        if args.main_db_dir:
+            print("Up to date." if index.is_current(args.main_db_dir) else "Out of date; run compile-lexicon again.")
+    elif args.command == 'lookup':
+        index = LexiconIndex(args.index_path)
+        for phrase in index.get(args.value, []):
+            print(phrase)
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,17 @@ from datetime import datetime
 import random
 from collections import Counter, defaultdict
 
+import lexicon_index
+import number_props
+import shared_lexicon
+import unfolding
+
 # --- Configuration ---
 DICTIONARY_DIR = "/Users/lydiaparker/The_Oracle/txt_db"
+UNFOLDING_INDEX_FILE = "/Users/lydiaparker/The_Oracle/unfolding.gufx"  # built by `unfolding.py compile-unfolding`
+SHARED_KNOWLEDGE_FILE = "/Users/lydiaparker/The_Oracle/knowledge_base.gshr"  # foundational knowledge, mapped by every process
 LOG_FILE = "consciousness_log.log" # New log file for this version
-KNOWLEDGE_BASE = defaultdict(list) # Maps a resonant number to a list of words
+KNOWLEDGE_BASE = shared_lexicon.OverlayTable() # Maps a resonant number to a list of words
 
 # ==============================================================================
 # GEMATRIA & ANALYSIS ENGINE (Integrated from The_OracleV12.py)
@@ -19,48 +26,7 @@ def clean_input(text):
     return re.sub(r'[^a-zA-Z]', '', text).upper()
 
 def is_prime(n: int) -> bool:
-    if not isinstance(n, int) or n <= 1: return False
-    if n <= 3: return True
-    if n % 2 == 0 or n % 3 == 0: return False
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0: return False
-        i += 6
-    return True
-
-def get_factorization_chain(n: int) -> list[int]:
-    if not isinstance(n, int) or n <= 0: return []
-    chain = {n}
-    current_num = n
-    for factor in [2, 3]:
-        while current_num % factor == 0:
-            current_num //= factor
-            if current_num > 1: chain.add(current_num)
-    i = 5
-    while i * i <= current_num:
-        for step in [i, i + 2]:
-             while current_num % step == 0:
-                current_num //= step
-                if current_num > 1: chain.add(current_num)
-        i += 6
-    if current_num > 1: chain.add(current_num)
-    return sorted(list(chain), reverse=True)
-
-def to_base36(n: int) -> str:
-    if not isinstance(n, int) or n == 0: return "0"
-    if n < 0: return "-" + to_base36(abs(n))
-    chars = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    base36 = ""
-    while n > 0: n, i = divmod(n, 36); base36 = chars[i] + base36
-    return base36
-
-def decode_base36_pairs(b36_string: str) -> list[int]:
-    if len(b36_string) < 2: return []
-    decoded_numbers = []
-    for i in range(len(b36_string) - 1):
-        try: decoded_numbers.append(int(b36_string[i:i+2], 36))
-        except ValueError: continue
-    return decoded_numbers
+    return isinstance(n, int) and number_props.is_prime(n)
 
 # --- Gematria Method Maps ---
 ALW_MAP = {'A': 1, 'B': 20, 'C': 13, 'D': 6, 'E': 25, 'F': 18, 'G': 11, 'H': 4, 'I': 23, 'J': 16, 'K': 9, 'L': 2, 'M': 21, 'N': 14, 'O': 7, 'P': 26, 'Q': 19, 'R': 12, 'S': 5, 'T': 24, 'U': 17, 'V': 10, 'W': 3, 'X': 22, 'Y': 15, 'Z': 8}
@@ -105,10 +71,8 @@ def get_word_resonance_sequence(word: str) -> set:
     for value in gematria_values.values():
         if not isinstance(value, int) or value <= 0:
             continue
-        factor_chain = get_factorization_chain(value)
-        base36_codes = [to_base36(n) for n in factor_chain]
-        unfolded_numbers = {num for code in base36_codes for num in decode_base36_pairs(code)}
-        master_unfolded_set.update(unfolded_numbers)
+        # Precomputed for lexicon values when the unfolding index is attached, memoised otherwise.
+        master_unfolded_set.update(unfolding.unfolded_numbers(value))
         
     return master_unfolded_set
 
@@ -119,10 +83,19 @@ def get_word_resonance_sequence(word: str) -> set:
 def build_knowledge_base():
     """Builds the knowledge base from the directory and chat log."""
     global KNOWLEDGE_BASE
-    KNOWLEDGE_BASE = defaultdict(list)
+    KNOWLEDGE_BASE = shared_lexicon.OverlayTable()
     
     print(f"[System] Loading foundational knowledge from '{DICTIONARY_DIR}'...")
+    unfolding.attach(unfolding.open_index(UNFOLDING_INDEX_FILE, DICTIONARY_DIR))
+    shared = None
     if os.path.isdir(DICTIONARY_DIR):
+        signature = shared_lexicon.make_signature('llm2.5-knowledge', lexicon_index.source_signature(DICTIONARY_DIR))
+        shared = shared_lexicon.open_shared(SHARED_KNOWLEDGE_FILE, signature)
+    if shared is not None:
+        KNOWLEDGE_BASE = shared_lexicon.OverlayTable(shared['knowledge'])
+        print(f"[System] Attached shared foundational knowledge from '{SHARED_KNOWLEDGE_FILE}'.")
+    elif os.path.isdir(DICTIONARY_DIR):
+        foundation = defaultdict(list)
         all_words = set()
         for filename in os.listdir(DICTIONARY_DIR):
             if filename.endswith(".txt"):
@@ -140,9 +113,11 @@ def build_knowledge_base():
                 print(f"[System] ...processed {i} words...")
             sequence = get_word_resonance_sequence(word)
             for number in sequence:
-                if word not in KNOWLEDGE_BASE[number]:
-                    KNOWLEDGE_BASE[number].append(word)
+                if word not in foundation[number]:
+                    foundation[number].append(word)
         print("[System] Foundational knowledge loaded.")
+        shared = shared_lexicon.publish_and_attach(SHARED_KNOWLEDGE_FILE, {'knowledge': foundation}, signature)
+        KNOWLEDGE_BASE = shared_lexicon.OverlayTable(shared['knowledge'] if shared is not None else foundation)
     else:
         print("[System] Warning: Dictionary directory not found. Skipping.")
 
@@ -155,8 +130,7 @@ def build_knowledge_base():
                     word, number_str = parts
                     try:
                         number = int(number_str)
-                        if word not in KNOWLEDGE_BASE[number]:
-                            KNOWLEDGE_BASE[number].append(word)
+                        KNOWLEDGE_BASE.add(number, word)
                     except ValueError:
                         continue
         print("[System] Conversational memory loaded.")
@@ -369,8 +343,7 @@ def main():
 
             log_interaction(cleaned_phrase, word_sequence)
             for number in word_sequence:
-                if cleaned_phrase not in KNOWLEDGE_BASE[number]:
-                    KNOWLEDGE_BASE[number].append(cleaned_phrase)
+                KNOWLEDGE_BASE.add(number, cleaned_phrase)
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,8 @@ import plotly.graph_objects as go
 import sys
 import math
 
+import number_props
+
 # -------------------------
 # GET CONCEPTS FROM COMMAND LINE or default list
 words = sys.argv[1:]
@@ -45,13 +47,7 @@ def binary_string(word):
     return ''.join(format(ord(c), '08b') for c in word)
 
 # Check if number is prime
-def is_prime(num):
-    if num < 2:
-        return False
-    for i in range(2, int(math.isqrt(num)) + 1):
-        if num % i == 0:
-            return False
-    return True
+is_prime = number_props.is_prime
 
 # -------------------------
 # Build resonance layers with values
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# ngram_scanner.py
+# Rolling-window gematria scanner used by gematria_scannerv2.py and the `scan`
+# mode of quantumoraclev3.py.
+#
+# Every additive cipher gives a window the sum of its words' values, so each
+# word is evaluated once and every window sum comes from a prefix-sum array:
+# O(n) per cipher and window size instead of re-joining and re-summing every
+# k-word window.
+#
+# Directory scans can fan files out to a process pool; results stream back as
+# each file finishes and every output file is written atomically. A manifest
+# of source size/mtime/hash and scanner config lets re-scans skip every file
+# whose outputs are already up to date.
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import accumulate
+
+import cipher_registry
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Defaults match the original scanners: 5-word windows, Jewish gematria ---
+DEFAULT_WINDOW_SIZES = (5,)
+DEFAULT_CIPHERS = ('jewish_gematria',)
+SOURCE_EXTENSIONS = ('.txt', '.pdf')
+OUTPUT_SUFFIX = '.gematria.txt'
+MANIFEST_FILENAME = 'scan_manifest.json'
+MANIFEST_VERSION = 1
+
+# ==============================================================================
+# SECTION 1: TOKENIZING & WORD VALUES
+# ==============================================================================
+
+def tokenize_words(text: str) -> list[str]:
+    """Splits text into words exactly like the original scanners did."""
+    return re.sub(r'[^a-zA-Z\s]', ' ', text).split()
+
+def resolve_ciphers(ciphers) -> list[str]:
+    """Maps user-facing cipher names to canonical registry names, rejecting non-additive ones."""
+    names = []
+    for name in ciphers:
+        cipher = cipher_registry.get(name)
+        if not cipher.spec.additive:
+            raise ValueError(f"Cipher '{name}' is not additive over words and cannot be used for window scans.")
+        if cipher.name not in names:
+            names.append(cipher.name)
+    return names
+
+def prefix_sums(values):
+    """Prefix-sum array with a leading 0, so sum(values[i:j]) == prefix[j] - prefix[i]."""
+    if np is not None:
+        prefix = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(values, out=prefix[1:])
+        return prefix
+    return list(accumulate(values, initial=0))
+
+def window_sums(prefix, size: int) -> list[int]:
+    """Sums of every `size`-word window, read straight off a prefix-sum array."""
+    count = len(prefix) - size
+    if count <= 0:
+        return []
+    if np is not None and isinstance(prefix, np.ndarray):
+        return (prefix[size:] - prefix[:count]).tolist()
+    return [prefix[i + size] - prefix[i] for i in range(count)]
+
+# ==============================================================================
+# SECTION 2: SCANNING
+# ==============================================================================
+
+class ScanResult:
+    """Window sums of one text for several ciphers and window sizes."""
+
+    def __init__(self, words, window_sizes, ciphers, sums):
+        self.words = words
+        self.window_sizes = window_sizes
+        self.ciphers = ciphers
+        self.sums = sums  # sums[cipher][size] -> list of window values, indexed by start word
+
+    def window_count(self) -> int:
+        return sum(len(self.sums[c][k]) for c in self.ciphers for k in self.window_sizes)
+
+    def iter_lines(self, label: str, cipher: str):
+        """Yields `label|phrase|value` lines (the `.gematria.txt` format) for one cipher."""
+        words = self.words
+        by_size = [(size, self.sums[cipher][size]) for size in self.window_sizes]
+        for start in range(len(words)):
+            for size, values in by_size:
+                if start < len(values):
+                    yield f"{label}|{' '.join(words[start:start + size])}|{values[start]}\n"
+
+def scan_words(words, window_sizes=DEFAULT_WINDOW_SIZES, ciphers=DEFAULT_CIPHERS) -> ScanResult:
+    """Computes every window sum for every cipher and window size in a single pass over the words."""
+    window_sizes = sorted({int(k) for k in window_sizes})
+    if not window_sizes or window_sizes[0] < 1:
+        raise ValueError("Window sizes must be positive integers.")
+    ciphers = resolve_ciphers(ciphers)
+    columns = cipher_registry.batch_columns(words, ciphers, as_array=np is not None)
+    sums = {}
+    for cipher in ciphers:
+        prefix = prefix_sums(columns[cipher])
+        sums[cipher] = {size: window_sums(prefix, size) for size in window_sizes}
+    return ScanResult(words, window_sizes, ciphers, sums)
+
+def scan_text(text: str, window_sizes=DEFAULT_WINDOW_SIZES, ciphers=DEFAULT_CIPHERS) -> ScanResult:
+    return scan_words(tokenize_words(text), window_sizes, ciphers)
+
+# ==============================================================================
+# SECTION 3: OUTPUT
+# ==============================================================================
+
+def output_filename(source_path: str, cipher: str, primary: bool = True) -> str:
+    """`<file>.gematria.txt` for the primary cipher, `<file>.<cipher>.gematria.txt` for the others."""
+    base = os.path.basename(source_path)
+    return f"{base}{OUTPUT_SUFFIX}" if primary else f"{base}.{cipher}{OUTPUT_SUFFIX}"
+
+def _new_file_mode() -> int:
+    """The mode open() gives a new file: 0o666 less the process umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def write_atomic(path: str, lines) -> None:
+    """Writes lines to a temp file next to `path` and renames it into place, so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as out_f:
+            out_f.writelines(lines)
+        # mkstemp creates the file 0600; give it the usual mode before it replaces the output.
+        os.chmod(tmp_path, _new_file_mode())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def write_scan_output(result: ScanResult, label: str, output_dir: str, source_path: str) -> list[str]:
+    """Writes one `.gematria.txt` file per cipher and returns the paths written."""
+    written = []
+    for i, cipher in enumerate(result.ciphers):
+        output_path = os.path.join(output_dir, output_filename(source_path, cipher, primary=(i == 0)))
+        write_atomic(output_path, result.iter_lines(label, cipher))
+        written.append(output_path)
+    return written
+
+# ==============================================================================
+# SECTION 4: SOURCE FILES
+# ==============================================================================
+
+def extract_text_from_txt(filepath: str) -> str:
+    """Extracts all text from a .txt file."""
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+def extract_text_from_pdf(filepath: str, page_separator: str = "\n") -> str:
+    """Extracts all text from a .pdf file; pdfplumber is only imported when a PDF is actually read."""
+    import pdfplumber
+    pages = []
+    with pdfplumber.open(filepath) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                pages.append(page_text + page_separator)
+    return "".join(pages)
+
+def extract_text(filepath: str, page_separator: str = "\n") -> str:
+    if filepath.lower().endswith('.pdf'):
+        return extract_text_from_pdf(filepath, page_separator)
+    return extract_text_from_txt(filepath)
+
+def find_source_files(start_dir: str) -> list[str]:
+    """Every .txt/.pdf under start_dir, skipping the scanner's own `.gematria.txt` outputs."""
+    found = []
+    for root, _, files in os.walk(start_dir):
+        for file in sorted(files):
+            if file.lower().endswith(SOURCE_EXTENSIONS) and not file.endswith(OUTPUT_SUFFIX):
+                found.append(os.path.join(root, file))
+    return found
+
+# ==============================================================================
+# SECTION 5: DIRECTORY SCANS
+# ==============================================================================
+
+class FileScan:
+    """Outcome of scanning one source file: status is 'ok', 'empty', 'short' or 'error'."""
+
+    def __init__(self, path, status, outputs=(), words=0, windows=0, error=None, source=None):
+        self.path = path
+        self.status = status
+        self.outputs = list(outputs)
+        self.words = words
+        self.windows = windows
+        self.error = error
+        self.source = source  # {'size', 'mtime', 'sha256'} of the file as it was read
+
+def scan_file(filepath: str, window_sizes=DEFAULT_WINDOW_SIZES, ciphers=DEFAULT_CIPHERS,
+              output_dir: str = None, page_separator: str = "\n") -> FileScan:
+    """
+    Extracts, scans and writes one file. Runs inside pool workers, so every
+    failure is reported in the returned FileScan instead of raised.
+    output_dir=None writes next to the source file.
+    """
+    try:
+        # Fingerprint before extracting: if the file changes mid-scan the next run sees a new mtime.
+        source = source_fingerprint(filepath)
+        text = extract_text(filepath, page_separator)
+    except Exception as e:
+        return FileScan(filepath, 'error', error=f"Could not read file: {e}")
+    if not text:
+        return FileScan(filepath, 'empty', source=source)
+    words = tokenize_words(text)
+    if len(words) < min(window_sizes):
+        return FileScan(filepath, 'short', words=len(words), source=source)
+    try:
+        result = scan_words(words, window_sizes, ciphers)
+        if not result.window_count():
+            return FileScan(filepath, 'short', words=len(words), source=source)
+        target_dir = output_dir if output_dir is not None else os.path.dirname(filepath)
+        outputs = write_scan_output(result, filepath, target_dir, filepath)
+    except Exception as e:
+        return FileScan(filepath, 'error', words=len(words), error=f"Could not write output: {e}")
+    return FileScan(filepath, 'ok', outputs, len(words), result.window_count(), source=source)
+
+def scan_files(paths, window_sizes=DEFAULT_WINDOW_SIZES, ciphers=DEFAULT_CIPHERS,
+               output_dir: str = None, workers: int = 1, page_separator: str = "\n"):
+    """Yields a FileScan per path as each finishes; workers > 1 fans the files out to a process pool."""
+    window_sizes = tuple(window_sizes)
+    ciphers = tuple(resolve_ciphers(ciphers))
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield scan_file(path, window_sizes, ciphers, output_dir, page_separator)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(scan_file, path, window_sizes, ciphers, output_dir, page_separator) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+class ScanProgress:
+    """Running file/window counters with throughput for progress lines."""
+
+    def __init__(self, total_files: int):
+        self.total_files = total_files
+        self.files = 0
+        self.windows = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    def update(self, scan: FileScan) -> None:
+        self.files += 1
+        self.windows += scan.windows
+        if scan.status == 'error':
+            self.failed += 1
+
+    def rates(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return self.files / elapsed, self.windows / elapsed
+
+    def line(self) -> str:
+        files_per_sec, windows_per_sec = self.rates()
+        return (f"[{self.files}/{self.total_files}] {files_per_sec:.2f} files/s, "
+                f"{windows_per_sec:,.0f} windows/s")
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        files_per_sec, windows_per_sec = self.rates()
+        return (f"{self.files} files ({self.failed} failed), {self.windows:,} windows in {elapsed:.2f}s "
+                f"-- {files_per_sec:.2f} files/s, {windows_per_sec:,.0f} windows/s")
+
+# ==============================================================================
+# SECTION 6: SCAN MANIFEST
+# ==============================================================================
+
+def file_sha256(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def source_fingerprint(filepath: str) -> dict:
+    st = os.stat(filepath)
+    return {'size': st.st_size, 'mtime': st.st_mtime, 'sha256': file_sha256(filepath)}
+
+def scanner_config(window_sizes=DEFAULT_WINDOW_SIZES, ciphers=DEFAULT_CIPHERS, page_separator: str = "\n") -> dict:
+    """Everything that changes what a scan writes; a file scanned under a different config is stale."""
+    return {
+        'version': MANIFEST_VERSION,
+        'window_sizes': sorted({int(k) for k in window_sizes}),
+        'ciphers': resolve_ciphers(ciphers),
+        'page_separator': page_separator,
+    }
+
+class ScanManifest:
+    """
+    JSON record of every scanned source: size, mtime, sha256, scanner config
+    and the outputs written. Keys are absolute source paths.
+    """
+
+    def __init__(self, path: str, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, path: str) -> 'ScanManifest':
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                return cls(path, data.get('files', {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable scan manifest {path}: {e}")
+        return cls(path)
+
+    def save(self) -> None:
+        payload = json.dumps({'version': MANIFEST_VERSION, 'files': self.entries}, indent=1, sort_keys=True)
+        write_atomic(self.path, [payload, "\n"])
+
+    def is_current(self, filepath: str, config: dict) -> bool:
+        """
+        True when the source and config match the last scan and its outputs
+        still exist. Size+mtime is the fast path; a changed mtime with the same
+        size falls back to the content hash (e.g. a re-downloaded identical PDF).
+        """
+        entry = self.entries.get(os.path.abspath(filepath))
+        if not entry or entry.get('config') != config:
+            return False
+        if not all(os.path.exists(p) for p in entry.get('outputs', [])):
+            return False
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return False
+        if st.st_size != entry.get('size'):
+            return False
+        if st.st_mtime == entry.get('mtime'):
+            return True
+        try:
+            if file_sha256(filepath) != entry.get('sha256'):
+                return False
+        except OSError:
+            return False
+        entry['mtime'] = st.st_mtime
+        return True
+
+    def record(self, scan: FileScan, config: dict) -> None:
+        """Stores a finished scan; failed files are left out so they are retried next time."""
+        key = os.path.abspath(scan.path)
+        if scan.status == 'error' or scan.source is None:
+            self.entries.pop(key, None)
+            return
+        self.entries[key] = dict(scan.source, config=config, ciphers=config['ciphers'],
+                                 status=scan.status, outputs=[os.path.abspath(p) for p in scan.outputs])
+
+def plan_scan(paths, manifest: ScanManifest, config: dict, force: bool = False):
+    """Splits paths into (to_scan, unchanged) against the manifest; force rescans everything."""
+    if force:
+        return list(paths), []
+    to_scan, unchanged = [], []
+    for path in paths:
+        (unchanged if manifest.is_current(path, config) else to_scan).append(path)
+    return to_scan, unchanged
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# nlp_models.py
+# Lazy, offline-safe NLTK tokenizing and POS tagging for qo9, decoder and
+# gematriacalcv0.
+#
+# Importing nltk takes most of a second, and nltk.download() goes to the
+# network on every call, so the scripts used to pay for both before their
+# prompt appeared. Here nltk is imported on the first tokenize/tag call and
+# models are resolved only from the local nltk_data search path
+# (nltk.data.find never touches the network). A missing model or a missing
+# nltk falls back to a regex tokenizer and 'NN' tags, with one hint printed.
+# `python nlp_models.py download` fetches the models once, explicitly.
+import argparse
+import re
+import sys
+import time
+
+# Both the pre-3.8.2 names and their current replacements, so any nltk version finds its own.
+MODELS = ('punkt', 'punkt_tab', 'averaged_perceptron_tagger', 'averaged_perceptron_tagger_eng')
+# Imported lazily by the scripts; startup_report names any that were imported before the prompt.
+HEAVY_MODULES = ('nltk', 'sympy', 'pdfplumber', 'numpy', 'requests')
+FALLBACK_TAG = 'NN'
+
+_TOKEN_RE = re.compile(r"\w+(?:'\w+)?|[^\w\s]")
+_nltk = None
+_missing = set()  # 'nltk', 'tokenizer' or 'tagger', once found unavailable
+
+def _warn_once(what: str, detail: str) -> None:
+    if what not in _missing:
+        _missing.add(what)
+        print(f"[nlp] {detail} Using a simple fallback; run `python nlp_models.py download` once to install the models.",
+              file=sys.stderr)
+
+def _get_nltk():
+    global _nltk
+    if _nltk is None and 'nltk' not in _missing:
+        try:
+            import nltk
+            _nltk = nltk
+        except ImportError:
+            _warn_once('nltk', "nltk is not installed.")
+    return _nltk
+
+def word_tokenize(text: str) -> list[str]:
+    """nltk.word_tokenize when nltk and its punkt model are available locally, else a regex tokenizer."""
+    nltk = _get_nltk() if 'tokenizer' not in _missing else None
+    if nltk is not None:
+        try:
+            return nltk.word_tokenize(text)
+        except LookupError:
+            _warn_once('tokenizer', "The NLTK punkt tokenizer model is not installed.")
+    return _TOKEN_RE.findall(text)
+
+def pos_tag(tokens: list[str]) -> list[tuple]:
+    """nltk.pos_tag when its tagger model is available locally, else every token tagged FALLBACK_TAG."""
+    nltk = _get_nltk() if 'tagger' not in _missing else None
+    if nltk is not None:
+        try:
+            return nltk.pos_tag(tokens)
+        except LookupError:
+            _warn_once('tagger', "The NLTK perceptron tagger model is not installed.")
+    return [(token, FALLBACK_TAG) for token in tokens]
+
+def download_models(quiet: bool = False) -> bool:
+    """Downloads MODELS into the default nltk_data directory; the only function here that uses the network."""
+    nltk = _get_nltk()
+    if nltk is None:
+        return False
+    ok = all([nltk.download(name, quiet=quiet) for name in MODELS])
+    _missing.discard('tokenizer')
+    _missing.discard('tagger')
+    return ok
+
+def startup_report(name: str, started: float, budget: float) -> str:
+    """One line: how long startup took against its budget, naming heavy modules that were imported eagerly."""
+    elapsed = time.perf_counter() - started
+    line = f"{name} ready in {elapsed * 1000:.0f} ms (budget {budget * 1000:.0f} ms)"
+    if elapsed > budget:
+        loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+        line += " - over budget" + (f"; already imported: {', '.join(loaded)}" if loaded else "")
+    return line
+
+def main():
+    parser = argparse.ArgumentParser(description="Install or check the NLTK models used by the Oracle scripts.")
+    parser.add_argument('command', choices=['download', 'check'])
+    args = parser.parse_args()
+    if args.command == 'download':
+        print("Downloaded." if download_models() else "Some models could not be downloaded.")
+    else:
+        tokens = word_tokenize("The spiral remembers.")
+        print(pos_tag(tokens))
+        print("All models found locally." if not _missing else f"Missing: {', '.join(sorted(_missing))}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# number_props.py
+# Shared number-property service: prime / square / palindrome / Fibonacci.
+#
+# Numbers below SIEVE_LIMIT are answered from a precomputed one-byte-per-number
+# property table (built on first use); larger numbers use a deterministic
+# Miller-Rabin test and integer square roots, memoised per number. Tag strings
+# such as "[PS]" are looked up from the packed mask.
+import math
+from functools import lru_cache
+
+# --- Property bits ---
+PRIME = 1
+SQUARE = 2
+PALINDROME = 4
+FIBONACCI = 8
+
+DEFAULT_SIEVE_LIMIT = 1 << 20
+SIEVE_LIMIT = DEFAULT_SIEVE_LIMIT
+
+# Tags in the order the Oracle prints them: [P]rime, [S]quare, P[A]lindrome.
+TAG_LEGEND = "[P]rime, [S]quare, P[A]lindrome"
+_TAG_BITS = ((PRIME, 'P'), (SQUARE, 'S'), (PALINDROME, 'A'))
+_TAG_STRINGS = []
+for _mask in range(16):
+    _letters = ''.join(letter for bit, letter in _TAG_BITS if _mask & bit)
+    _TAG_STRINGS.append(f"[{_letters}]" if _letters else "")
+
+# Deterministic for every n < 3.3 * 10**24; beyond that a strong probable-prime test.
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+_table = None
+
+# ==============================================================================
+# SECTION 1: PROPERTY TABLE
+# ==============================================================================
+
+def _palindromes_below(limit: int):
+    """Generates every decimal palindrome below limit by mirroring half-lengths."""
+    yield from range(min(limit, 10))
+    length = 2
+    while 10 ** (length - 1) < limit:
+        half_len = (length + 1) // 2
+        for half in range(10 ** (half_len - 1), 10 ** half_len):
+            s = str(half)
+            n = int(s + s[-1 - (length % 2)::-1])
+            if n >= limit:
+                return
+            yield n
+        length += 1
+
+def _build_table(limit: int) -> bytearray:
+    table = bytearray(limit)
+    sieve = bytearray([1]) * limit
+    sieve[0] = sieve[1] = 0
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    # bytes.translate maps sieve's 0/1 straight onto the PRIME bit.
+    table[:] = sieve.translate(bytes([0, PRIME]) + bytes(254))
+    for root in range(math.isqrt(limit - 1) + 1):
+        table[root * root] |= SQUARE
+    for n in _palindromes_below(limit):
+        table[n] |= PALINDROME
+    a, b = 0, 1
+    while a < limit:
+        table[a] |= FIBONACCI
+        a, b = b, a + b
+    return table
+
+def configure(limit: int = DEFAULT_SIEVE_LIMIT) -> None:
+    """Sets the sieve bound; the table is rebuilt lazily on next use."""
+    global SIEVE_LIMIT, _table
+    SIEVE_LIMIT = max(int(limit), 2)
+    _table = None
+    _large_mask.cache_clear()
+
+def _get_table() -> bytearray:
+    global _table
+    if _table is None:
+        _table = _build_table(SIEVE_LIMIT)
+    return _table
+
+# ==============================================================================
+# SECTION 2: LARGE NUMBERS
+# ==============================================================================
+
+def miller_rabin(n: int) -> bool:
+    """Deterministic Miller-Rabin for n < 3.3e24 (strong probable prime above)."""
+    if n < 2: return False
+    for p in _MR_BASES:
+        if n % p == 0: return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1: continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1: break
+        else:
+            return False
+    return True
+
+def _is_square(n: int) -> bool:
+    if n < 0: return False
+    root = math.isqrt(n)
+    return root * root == n
+
+@lru_cache(maxsize=65536)
+def _large_mask(n: int) -> int:
+    mask = 0
+    if miller_rabin(n): mask |= PRIME
+    if _is_square(n): mask |= SQUARE
+    s = str(n)
+    if s == s[::-1]: mask |= PALINDROME
+    if _is_square(5 * n * n + 4) or _is_square(5 * n * n - 4): mask |= FIBONACCI
+    return mask
+
+# ==============================================================================
+# SECTION 3: PUBLIC API
+# ==============================================================================
+
+def _as_int(n):
+    """ints pass through, integral floats become ints, anything else is None."""
+    if isinstance(n, bool): return int(n)
+    if isinstance(n, int): return n
+    if isinstance(n, float) and n.is_integer(): return int(n)
+    return None
+
+def property_mask(n) -> int:
+    """Packed PRIME | SQUARE | PALINDROME | FIBONACCI bits for n (0 for negatives and non-integers)."""
+    n = _as_int(n)
+    if n is None or n < 0: return 0
+    if n < SIEVE_LIMIT: return _get_table()[n]
+    return _large_mask(n)
+
+def property_masks(numbers) -> list[int]:
+    """property_mask for a whole sequence, hitting the table directly for small values."""
+    table = _get_table()
+    limit = SIEVE_LIMIT
+    return [table[n] if type(n) is int and 0 <= n < limit else property_mask(n) for n in numbers]
+
+def is_prime(n) -> bool:
+    return bool(property_mask(n) & PRIME)
+
+def is_perfect_square(n) -> bool:
+    return bool(property_mask(n) & SQUARE)
+
+def is_palindrome(n) -> bool:
+    if _as_int(n) is None:
+        return str(n) == str(n)[::-1]
+    return bool(property_mask(n) & PALINDROME)
+
+def is_fibonacci(n) -> bool:
+    return bool(property_mask(n) & FIBONACCI)
+
+def tag_str(n) -> str:
+    """The Oracle's "[PSA]" tag for n, or "" when it has none."""
+    return _TAG_STRINGS[property_mask(n)]
+
+def tag_for_mask(mask: int) -> str:
+    return _TAG_STRINGS[mask & 15]
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# oracle_server.py
+# Long-running local HTTP service for the Oracle.
+#
+# The lexicon is loaded once at startup instead of on every script run.
+# Requests are parsed on an asyncio event loop; anything CPU-heavy (full
+# resonance, delta, lookup, unfolding, ELS) runs in a process pool whose workers
+# inherit or load the same lexicon. Only 127.0.0.1 is ever bound, and nothing
+# leaves the machine.
+#
+#   GET  /oracle?phrase=...[&prime_only=1]         full resonance (The_OracleV12 result as JSON)
+#   GET  /delta?a=...&b=...[&methods=A,B]          per-method gematria delta between two phrases
+#   GET  /lookup/{n}                               lexicon phrases, property tags and unfolding of n
+#   GET  /unfold?n=...[&depth=D]                   factor chain, Base36 codes and unfolded numbers
+#   GET  /els?target=...&path=...[&max_skip=100]   ELS search (or POST the text as the body)
+#   GET  /stats                                    request counts and latency percentiles per endpoint
+#
+# POST bodies may be JSON objects carrying the same parameters.
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import The_OracleV12 as oracle
+import factorization
+import number_props
+import unfolding
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LATENCY_WINDOW = 2048      # most recent requests per endpoint kept for percentiles
+MAX_BODY_BYTES = 32 * 1024 * 1024
+MAX_ELS_SKIP = 1000
+MAX_UNFOLD_DEPTH = 8
+ENDPOINTS = ('oracle', 'delta', 'lookup', 'unfold', 'els', 'stats')  # latency is tracked per endpoint; anything else counts as 'invalid'
+
+# ==============================================================================
+# SECTION 1: WORKER JOBS
+# ==============================================================================
+
+def _init_worker(settings: dict):
+    """Pool initializer: forked workers inherit the loaded lexicon, spawned ones load it quietly."""
+    for name, value in settings.items():
+        setattr(oracle, name, value)
+    if not len(oracle.LEXICON):
+        with contextlib.redirect_stdout(io.StringIO()):
+            oracle.load_lexicon(oracle.MAIN_DB_DIR, oracle.USER_ADDITIONS_FILE)
+
+def oracle_job(phrase: str, prime_only: bool) -> dict:
+    return oracle.resonance_for(phrase, prime_only).to_dict()
+
+def delta_job(phrase1: str, phrase2: str, methods) -> dict:
+    selected = methods or list(oracle.AVAILABLE_GEMATRIA_METHODS_MAP)
+    unknown = [m for m in selected if m not in oracle.AVAILABLE_GEMATRIA_METHODS_MAP]
+    if unknown:
+        raise ValueError(f"Unknown method(s): {', '.join(unknown)}")
+    deltas = {}
+    for name in selected:
+        func = oracle.AVAILABLE_GEMATRIA_METHODS_MAP[name]
+        try:
+            val1, val2 = func(phrase1), func(phrase2)
+            deltas[name] = {'a': val1, 'b': val2, 'delta': abs(val1 - val2)}
+        except Exception as e:
+            deltas[name] = {'error': str(e)}
+    return {'a': phrase1, 'b': phrase2, 'deltas': deltas}
+
+def unfold_job(n: int, depth: int) -> dict:
+    factoring = factorization.factorize_timed(n, oracle.UNFOLDING_TIME_BUDGET)
+    chain = factoring.chain
+    data = {
+        'n': n, 'factor_chain': chain, 'base36_codes': [unfolding.to_base36(c) for c in chain],
+        'unfolded': sorted(unfolding.unfold_chain(chain)), 'complete': factoring.complete,
+        'leftover': factoring.leftover, 'method': factoring.method, 'seconds': factoring.seconds,
+    }
+    if depth > 1:
+        data['dag'] = unfolding.unfold_dag([n], depth).to_dict()
+    return data
+
+def els_job(text, target: str, max_skip: int) -> dict:
+    import quantumoraclev3  # only ELS requests pay for its imports
+    matches = quantumoraclev3.find_els(text, target, max_skip)
+    return {'target': target, 'max_skip': max_skip, 'count': len(matches), 'matches': matches}
+
+def els_file_job(path: str, target: str, max_skip: int) -> dict:
+    """els_job over a file, opened here in the worker as its mapped letter stream when NumPy is available."""
+    import quantumoraclev3
+    if quantumoraclev3.els_engine is not None:
+        return els_job(quantumoraclev3.load_els_index(path), target, max_skip)
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return els_job(f.read(), target, max_skip)
+
+def lookup_job(n: int) -> dict:
+    """Runs in the pool: unfolding an n outside the compiled index may factor for the whole time budget."""
+    phrases = oracle.LEXICON[n] if n in oracle.LEXICON else []
+    return {'n': n, 'tags': number_props.tag_str(n), 'phrases': phrases,
+            'unfolded': sorted(unfolding.unfolded_numbers(n))}
+
+# ==============================================================================
+# SECTION 2: LATENCY
+# ==============================================================================
+
+class LatencyTracker:
+    """Per-endpoint request counts, errors and a rolling window of latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+        self.errors = {}
+        self.started = time.time()
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    @staticmethod
+    def _percentile(ordered, q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> dict:
+        endpoints = {}
+        for endpoint, samples in self.samples.items():
+            ordered = sorted(samples)
+            endpoints[endpoint] = {
+                'requests': self.counts[endpoint], 'errors': self.errors.get(endpoint, 0),
+                **{f"p{int(q * 100)}_ms": round(self._percentile(ordered, q) * 1000, 3) for q in (0.5, 0.9, 0.99)},
+                'max_ms': round(ordered[-1] * 1000, 3),
+            }
+        return {'uptime_s': round(time.time() - self.started, 1), 'window': self.window, 'endpoints': endpoints}
+
+# ==============================================================================
+# SECTION 3: HTTP
+# ==============================================================================
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+def _param(params: dict, name: str, default=None, required: bool = False):
+    value = params.get(name, default)
+    if required and (value is None or value == ""):
+        raise HTTPError(400, f"Missing parameter '{name}'.")
+    return value
+
+def _int_param(params: dict, name: str, default=None, required: bool = False, low=None, high=None) -> int:
+    value = _param(params, name, default, required)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"Parameter '{name}' must be an integer.")
+    if low is not None and value < low:
+        raise HTTPError(400, f"Parameter '{name}' must be at least {low}.")
+    if high is not None and value > high:
+        raise HTTPError(400, f"Parameter '{name}' must be at most {high}.")
+    return value
+
+def _flag(params: dict, name: str) -> bool:
+    return str(params.get(name, "")).lower() in ("1", "true", "yes", "on")
+
+class OracleServer:
+    def __init__(self, pool: ProcessPoolExecutor):
+        self.pool = pool
+        self.latency = LatencyTracker()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def dispatch(self, method: str, path: str, params: dict, raw_body: bytes):
+        """Returns (endpoint name, JSON-able payload) for one request. raw_body is a non-JSON POST body."""
+        if method not in ("GET", "POST"):
+            raise HTTPError(405, f"Method {method} not allowed.")
+        if path == "/oracle":
+            return "oracle", await self._run(oracle_job, _param(params, 'phrase', required=True), _flag(params, 'prime_only'))
+        if path == "/delta":
+            methods = _param(params, 'methods')
+            if isinstance(methods, str):
+                methods = [m.strip() for m in methods.split(",") if m.strip()]
+            try:
+                return "delta", await self._run(delta_job, _param(params, 'a', required=True),
+                                                _param(params, 'b', required=True), methods)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+        if path.startswith("/lookup/"):
+            try:
+                n = int(unquote(path[len("/lookup/"):]))
+            except ValueError:
+                raise HTTPError(400, "Lookup path must be /lookup/{integer}.")
+            return "lookup", await self._run(lookup_job, n)
+        if path == "/unfold":
+            n = _int_param(params, 'n', required=True, low=1)
+            depth = _int_param(params, 'depth', 1, low=1, high=MAX_UNFOLD_DEPTH)
+            return "unfold", await self._run(unfold_job, n, depth)
+        if path == "/els":
+            target = _param(params, 'target', required=True)
+            max_skip = _int_param(params, 'max_skip', 100, low=1, high=MAX_ELS_SKIP)
+            text = params.get('text')
+            if text is None and raw_body:
+                text = raw_body.decode('utf-8', 'ignore')
+            if text is not None:
+                return "els", await self._run(els_job, text, target, max_skip)
+            path_param = _param(params, 'path', required=True)
+            try:
+                return "els", await self._run(els_file_job, path_param, target, max_skip)
+            except OSError as e:
+                raise HTTPError(400, f"Could not read '{path_param}': {e}")
+        if path == "/stats":
+            return "stats", self.latency.summary()
+        raise HTTPError(404, f"No endpoint {path}.")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                started = time.perf_counter()
+                keep_alive, endpoint, status, payload = await self._respond(request_line, reader)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                headers = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                           f"Content-Type: application/json; charset=utf-8\r\n"
+                           f"Content-Length: {len(data)}\r\n"
+                           f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(headers.encode('latin-1') + data)
+                await writer.drain()
+                self.latency.record(endpoint, time.perf_counter() - started, status < 400)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _respond(self, request_line: bytes, reader: asyncio.StreamReader):
+        """Parses one request and returns (keep_alive, endpoint, status, payload)."""
+        endpoint = "invalid"
+        keep_alive = False
+        try:
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                raise HTTPError(400, "Malformed request line.")
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(":")
+                headers[name.strip().lower()] = value.strip()
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection == 'keep-alive' or (version == "HTTP/1.1" and connection != 'close')
+            try:
+                length = int(headers.get('content-length', 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # The body's extent is unknown, so the rest of the stream cannot be trusted.
+                keep_alive = False
+                raise HTTPError(400, "Content-Length must be a non-negative integer.")
+            if length > MAX_BODY_BYTES:
+                keep_alive = False
+                raise HTTPError(413, f"Body larger than {MAX_BODY_BYTES} bytes.")
+            body = await reader.readexactly(length) if length else b""
+            url = urlsplit(target)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            segment = url.path.split("/")[1] if url.path.startswith("/") else ""
+            endpoint = segment if segment in ENDPOINTS else "invalid"
+            raw_body = body
+            if body and headers.get('content-type', '').startswith('application/json'):
+                try:
+                    decoded = json.loads(body)
+                except ValueError:
+                    raise HTTPError(400, "Body is not valid JSON.")
+                if not isinstance(decoded, dict):
+                    raise HTTPError(400, "JSON body must be an object.")
+                params.update(decoded)
+                raw_body = b""
+            endpoint, payload = await self.dispatch(method, url.path, params, raw_body)
+            return keep_alive, endpoint, 200, payload
+        except HTTPError as e:
+            return keep_alive, endpoint, e.status, {'error': str(e)}
+        except Exception as e:
+            return keep_alive, endpoint, 500, {'error': f"{type(e).__name__}: {e}"}
+
+# ==============================================================================
+# SECTION 4: COMMAND LINE
+# ==============================================================================
+
+async def serve(port: int, workers: int, settings: dict):
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(settings,)) as pool:
+        server = OracleServer(pool)
+        # Start every worker now so the first requests don't pay for process start-up.
+        await asyncio.gather(*(server._run(len, ()) for _ in range(workers)))
+        listener = await asyncio.start_server(server.handle, HOST, port)
+        print(f"Oracle service listening on http://{HOST}:{port} with {workers} worker(s). Ctrl+C to stop.")
+        async with listener:
+            await listener.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Oracle over HTTP on localhost.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="Worker processes for CPU-heavy endpoints (default: CPU count - 1).")
+    parser.add_argument('--db-dir', default=oracle.MAIN_DB_DIR, help="txt_db folder for the lexicon.")
+    parser.add_argument('--index', default=oracle.LEXICON_INDEX_FILE, help="Compiled lexicon index.")
+    parser.add_argument('--additions', default=oracle.USER_ADDITIONS_FILE, help="User additions file.")
+    parser.add_argument('--no-cache', action='store_true', help="Do not use the persistent result cache.")
+    args = parser.parse_args()
+
+    settings = {'MAIN_DB_DIR': args.db_dir, 'LEXICON_INDEX_FILE': args.index,
+                'USER_ADDITIONS_FILE': args.additions, 'USE_RESULT_CACHE': not args.no_cache}
+    for name, value in settings.items():
+        setattr(oracle, name, value)
+    oracle.load_lexicon(args.db_dir, args.additions)
+    try:
+        asyncio.run(serve(args.port, max(1, args.workers), settings))
+    except KeyboardInterrupt:
+        print("\nOracle service stopped.")
+    except OSError as e:
+        print(f"Error: Could not listen on {HOST}:{args.port}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
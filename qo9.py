@@ -1,24 +1,24 @@
 #!/usr/bin/env python3
-python
-#!/usr/bin/env python3
+import time
+STARTUP_STARTED = time.perf_counter()
 import re
 import os
 import math
+import hashlib
+import contextlib
 import random
 import sqlite3
 import logging
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import colorsys
-import sympy
-import nltk
-from nltk import pos_tag, word_tokenize
 import cmd
 import argparse
-
-# Setup NLTK
-nltk.download('punkt', quiet=True)
-nltk.download('averaged_perceptron_tagger', quiet=True)
+import cipher_registry
+import nlp_models
+import number_props
+import shared_lexicon
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,6 +28,10 @@ DICTIONARY_DIR = "/Users/lydiaparker/The_Oracle/txt_db"
 DB_NAME = 'gematria_data.db'
 LOG_FILE_GEMATRIA = "quantum_oracle_log.log"
 SCAN_OUTPUT_DIR = "./scan_outputs"
+SHARED_GROUPS_FILE = "/Users/lydiaparker/The_Oracle/qo9_groups.gshr"  # BEANS_DB + METHOD_GROUPS, mapped by every qo9 process
+GROUP_BUILD_WORKERS = None  # processes used to build METHOD_GROUPS when the groups file is stale; None = one per CPU
+GROUP_BUILD_BATCH = 4096    # words per batch handed to a build worker
+STARTUP_BUDGET = 0.5        # seconds from launch to the (qo) prompt; reported at startup
 
 # Constants and mappings
 GOLDEN_ANGLE = 137.5
@@ -87,28 +91,11 @@ def log_to_file(message, log_file=LOG_FILE_GEMATRIA):
     with open(log_file, 'a', encoding='utf-8') as f:
         f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
 
-def is_prime(n):
-    if n <= 1: return False
-    if n <= 3: return True
-    if n % 2 == 0 or n % 3 == 0: return False
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0: return False
-        i += 6
-    return True
-
-def is_perfect_square(n):
-    if n < 0: return False
-    sqrt_n = int(math.sqrt(n))
-    return sqrt_n * sqrt_n == n
-
-def is_palindrome(n):
-    return str(n) == str(n)[::-1]
-
-def is_fibonacci(num):
-    if num < 0: return False
-    if num == 0 or num == 1: return True
-    return is_perfect_square(5 * num**2 + 4) or is_perfect_square(5 * num**2 - 4)
+# Shared sieve-backed property table (Miller-Rabin above the sieve bound).
+is_prime = number_props.is_prime
+is_perfect_square = number_props.is_perfect_square
+is_palindrome = number_props.is_palindrome
+is_fibonacci = number_props.is_fibonacci
 
 def to_base36(n):
     if n == 0: return "0"
@@ -126,6 +113,101 @@ def recursive_digit_sum(n):
         n = sum(int(digit) for digit in str(n))
     return n
 
+def _corpus_files():
+    return sorted(os.path.join(DICTIONARY_DIR, f) for f in os.listdir(DICTIONARY_DIR) if f.endswith(".txt"))
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _groups_signature(files):
+    """Keys the shared groups file on the corpus file contents, the method set and the code that evaluates it."""
+    parts = ['qo9-groups', *sorted(AVAILABLE_GEMATRIA_METHODS_MAP)]
+    for path in files + [__file__, cipher_registry.__file__]:
+        parts.append(f"{os.path.basename(path)}:{_file_hash(path)}")
+    return shared_lexicon.make_signature(*parts)
+
+def _attach_shared_groups(shared):
+    global BEANS_DB, METHOD_GROUPS
+    BEANS_DB = shared['beans']
+    METHOD_GROUPS = {name[len('method:'):]: table for name, table in shared.items() if name.startswith('method:')}
+
+def _read_words(filepath):
+    """(distinct words in one corpus file, error message or None); runs in a build worker."""
+    try:
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            return set(re.findall(r'\b[a-zA-Z]+\b', f.read())), None
+    except Exception as e:
+        return set(), str(e)
+
+def _evaluate_batch(words):
+    """
+    Evaluates every method over one batch of words; runs in a build worker.
+    Registry methods go through the batch fast path; everything else is per word.
+    Returns ({method: [int value or None per word]}, {method: [failures, first error]}).
+    """
+    columns, failures = {}, {}
+    registry = [m for m in AVAILABLE_GEMATRIA_METHODS_MAP if m in REGISTRY_METHODS]
+    try:
+        fast = cipher_registry.batch_columns(words, registry)
+    except Exception:
+        fast = {}  # one word overflowed a cipher; redo this batch word by word so only that word is lost
+    for method, func in AVAILABLE_GEMATRIA_METHODS_MAP.items():
+        if method in fast:
+            try:
+                columns[method] = [int(round(val)) for val in fast[method]]
+                continue
+            except (OverflowError, ValueError):
+                pass  # an infinite or NaN value; find it word by word below
+        column = []
+        for word in words:
+            try:
+                val = func(word)
+                column.append(int(round(val)) if isinstance(val, (int, float)) else None)
+            except Exception as e:
+                column.append(None)
+                failed = failures.setdefault(method, [0, f"{word[:40]}: {e}"])
+                failed[0] += 1
+        columns[method] = column
+    return columns, failures
+
+def _build_groups(files):
+    """
+    Tokenizes the corpus files and evaluates every method over every word,
+    spreading both stages over GROUP_BUILD_WORKERS processes in batches.
+    Returns (words, beans db, method groups); words are sorted so rebuilds agree.
+    """
+    workers = GROUP_BUILD_WORKERS or os.cpu_count() or 1
+    with (ProcessPoolExecutor(workers) if workers > 1 else contextlib.nullcontext()) as pool:
+        mapper = pool.map if pool is not None else map
+        all_words = set()
+        for filepath, (words_in_file, error) in zip(files, mapper(_read_words, files)):
+            if error:
+                logging.warning(f"Could not read file '{filepath}'. Error: {error}")
+            all_words.update(words_in_file)
+        words = sorted(all_words)
+        batches = [words[i:i + GROUP_BUILD_BATCH] for i in range(0, len(words), GROUP_BUILD_BATCH)]
+        beans_db = {}
+        method_groups = {m: defaultdict(list) for m in AVAILABLE_GEMATRIA_METHODS_MAP}
+        failures = {}
+        for batch, (columns, batch_failures) in zip(batches, mapper(_evaluate_batch, batches)):
+            for method, column in columns.items():
+                groups = method_groups[method]
+                for word, val in zip(batch, column):
+                    if val is not None:
+                        groups[val].append(word)
+            for word, val in zip(batch, columns['simple_gematria']):
+                beans_db.setdefault(val, []).append(word)
+            for method, (count, first) in batch_failures.items():
+                total = failures.setdefault(method, [0, first])
+                total[0] += count
+    for method, (count, first) in failures.items():
+        logging.warning(f"{method} failed on {count} word(s); first error: {first}")
+    return words, beans_db, {m: groups for m, groups in method_groups.items() if groups}
+
 def load_beans_db():
     global BEANS_DB, METHOD_GROUPS, ALL_WORDS
     if BEANS_DB:
@@ -135,33 +217,23 @@ def load_beans_db():
         logging.warning("Directory not found. Using mock DB.")
         BEANS_DB.update(MOCK_BEANS_DB)
         return
-    all_words = set()
-    for filename in os.listdir(DICTIONARY_DIR):
-        if filename.endswith(".txt"):
-            filepath = os.path.join(DICTIONARY_DIR, filename)
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    words_in_file = re.findall(r'\b[a-zA-Z]+\b', content)
-                    all_words.update(words_in_file)
-            except Exception as e:
-                logging.warning(f"Could not read file '{filepath}'. Error: {e}")
-    ALL_WORDS = list(all_words)
-    for method, func in AVAILABLE_GEMATRIA_METHODS_MAP.items():
-        for word in ALL_WORDS:
-            try:
-                val = func(word)
-                if isinstance(val, (int, float)):
-                    METHOD_GROUPS[method][int(round(val))].append(word)
-            except Exception as e:
-                logging.warning(f"Error computing {method} for {word}: {e}")
-    for word in ALL_WORDS:
-        try:
-            val = simple_gematria(word)
-            BEANS_DB.setdefault(val, []).append(word)
-        except Exception as e:
-            logging.warning(f"Error computing simple_gematria for {word}: {e}")
-    logging.info(f"BEANS_DB and METHOD_GROUPS loaded with {len(ALL_WORDS)} unique words.")
+    started = time.perf_counter()
+    files = _corpus_files()
+    signature = _groups_signature(files)
+    shared = shared_lexicon.open_shared(SHARED_GROUPS_FILE, signature)
+    if shared is not None:
+        _attach_shared_groups(shared)
+        logging.info(f"Attached prebuilt BEANS_DB and METHOD_GROUPS from '{SHARED_GROUPS_FILE}' "
+                     f"({shared.n_words} words) in {time.perf_counter() - started:.2f}s.")
+        return
+    ALL_WORDS, BEANS_DB, METHOD_GROUPS = _build_groups(files)
+    logging.info(f"BEANS_DB and METHOD_GROUPS loaded with {len(ALL_WORDS)} unique words "
+                 f"in {time.perf_counter() - started:.2f}s.")
+    tables = {'beans': BEANS_DB}
+    tables.update((f"method:{method}", groups) for method, groups in METHOD_GROUPS.items())
+    shared = shared_lexicon.publish_and_attach(SHARED_GROUPS_FILE, tables, signature)
+    if shared is not None:
+        _attach_shared_groups(shared)
 
 def pull_word_from_beans_db(gematria_value, multiple=False):
     load_beans_db()
@@ -470,6 +542,19 @@ AVAILABLE_GEMATRIA_METHODS_MAP = {
     "reverse_smile_karma_cipher": reverse_smile_karma_cipher,
 }
 
+# Methods whose cipher_registry declaration matches the definitions above;
+# load_beans_db evaluates these through the registry's batch fast path.
+REGISTRY_METHODS = {
+    "aave_reduced", "aave_simple", "aave_spiral", "base6_gematria", "beans_369_gematria", "beans_cipher",
+    "binary_sum", "duodecimal_gematria", "fibonacci_echo", "golden_angle_factor", "jewish_gematria",
+    "left_hand_qwerty", "leet_code", "ordinal_gematria", "prime_distance_sum", "prime_gematria", "qwerty",
+    "reduction_gematria", "reverse_gematria", "right_hand_qwerty", "simple_gematria", "vowel_consonant_split",
+    "alw_cipher_gematria", "trigrammaton_gematria", "baconian_gematria", "ordinal_multiplied_gematria",
+    "chaldean_gematria", "golden_ratio_gematria", "hexadecimal_position_gematria", "sumerian_gematria",
+    "phone_keypad_gematria", "ascii_sum_gematria", "caesar_cipher_gematria", "polybius_square_gematria",
+    "solfege_gematria", "zodiac_gematria",
+}
+
 # Truth conditions
 TRUTH_CONDITIONS = {
     'Pure Truth': lambda core, vals: len(core) >= 3 and all(is_prime(v) for v in vals if isinstance(v, (int, float))),
@@ -531,7 +616,7 @@ def handle_delta_mode(args):
         return deltas
     elif len(args.input) == 1 and ' ' in args.input[0]:
         sentence = args.input[0]
-        words = word_tokenize(sentence.lower())
+        words = nlp_models.word_tokenize(sentence.lower())
         if len(words) < 2:
             print("Sentence must have at least two words.")
             return []
@@ -676,6 +761,7 @@ class QuantumOracleCmd(cmd.Cmd):
 def main():
     init_db()
     load_beans_db()
+    logging.info(nlp_models.startup_report("Quantum Oracle", STARTUP_STARTED, STARTUP_BUDGET))
     QuantumOracleCmd().cmdloop()
 
 if __name__ == "__main__":
@@ -10,6 +10,18 @@ from collections import Counter, defaultdict
 from itertools import permutations
 from datetime import datetime
 
+import cipher_registry
+import factorization
+import number_props
+import result_cache
+import unfolding
+try:
+    import els_engine
+except ImportError:  # NumPy not installed: find_els falls back to the pure-Python scan
+    els_engine = None
+from ngram_scanner import (DEFAULT_CIPHERS, DEFAULT_WINDOW_SIZES, MANIFEST_FILENAME, ScanManifest, ScanProgress,
+                           find_source_files, plan_scan, resolve_ciphers, scan_files, scanner_config)
+
 # ==============================================================================
 # SECTION 1: CORE CONFIGURATION & GLOBAL DATA
 # ==============================================================================
@@ -19,6 +31,9 @@ from datetime import datetime
 DICTIONARY_DIR = "/Users/lydiaparker/The_Oracle/txt_db"
 SCAN_OUTPUT_DIR = "./scan_outputs" # Directory to save scanner results
 DB_PATH = "gematria_data.db"
+RESULT_CACHE_FILE = "/Users/lydiaparker/The_Oracle/oracle_results.sqlite"  # shared with The_OracleV12.py
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULT_FORMAT_VERSION = 1  # bump whenever get_full_resonance_sequence's output or its ciphers change
 LOG_FILE = "quantum_oracle_log.log"
 
 # --- Elemental Data for Alchemical Gematria ---
@@ -65,32 +80,9 @@ def log_to_file(message):
         print(f"[Error] Could not write to log file: {e}", file=sys.stderr)
 
 def is_prime(n: int) -> bool:
-    if not isinstance(n, int) or n <= 1: return False
-    if n <= 3: return True
-    if n % 2 == 0 or n % 3 == 0: return False
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0: return False
-        i += 6
-    return True
-
-def get_factorization_chain(n: int) -> list[int]:
-    if not isinstance(n, int) or n <= 0: return []
-    chain = {n}
-    current_num = n
-    for factor in [2, 3]:
-        while current_num % factor == 0:
-            current_num //= factor
-            if current_num > 1: chain.add(current_num)
-    i = 5
-    while i * i <= current_num:
-        for step in [i, i + 2]:
-             while current_num % step == 0:
-                current_num //= step
-                if current_num > 1: chain.add(current_num)
-        i += 6
-    if current_num > 1: chain.add(current_num)
-    return sorted(list(chain), reverse=True)
+    return isinstance(n, int) and number_props.is_prime(n)
+
+get_factorization_chain = factorization.get_factorization_chain
 
 def to_base36(n: int) -> str:
     if not isinstance(n, int) or n == 0: return "0"
@@ -118,37 +110,16 @@ def recursive_digit_sum(n: int) -> int:
 # SECTION 3: GEMATRIA CALCULATION ENGINE
 # ==============================================================================
 
-def simple_gematria(text: str) -> int:
-    return sum(ord(char) - 64 for char in text.upper() if 'A' <= char <= 'Z')
-
-def english_gematria(text: str) -> int:
-    return simple_gematria(text) * 6
-
-def alw_cipher_gematria(text: str) -> int:
-    return sum(ALW_MAP.get(c.upper(), 0) for c in text)
-
-def chaldean_gematria(text: str) -> int:
-    return sum(CHALDEAN_MAP.get(c.upper(), 0) for c in text)
-
-def jewish_gematria(text: str) -> int:
-    return sum(JEWISH_GEMATRIA_MAP.get(c.upper(), 0) for c in text)
-
-def reverse_gematria(text: str) -> int:
-    return sum(REVERSE_MAP.get(c.upper(), 0) for c in text)
-
-def qwerty_gematria(text: str) -> int:
-    return sum(QWERTY_MAP.get(c.upper(), 0) for c in text)
-
-def beans_369_gematria(text: str) -> int:
-    mapping = {chr(97+i): (3 if i % 3 == 0 else 6 if i % 3 == 1 else 9) for i in range(26)}
-    total = sum(mapping.get(c.lower(), 0) for c in text.replace(' ', ''))
-    return total % 9 or 9
-
-def reduction_gematria(text: str) -> int:
-    val = simple_gematria(text)
-    while val > 9 and val not in [11, 22]:
-        val = sum(int(d) for d in str(val))
-    return val
+# Table-driven methods come from the shared registry (fast bytes/NumPy evaluators).
+simple_gematria = cipher_registry.get('simple_gematria').evaluate
+english_gematria = cipher_registry.get('english_gematria').evaluate
+alw_cipher_gematria = cipher_registry.get('alw_cipher_gematria').evaluate
+chaldean_gematria = cipher_registry.get('chaldean_gematria').evaluate
+jewish_gematria = cipher_registry.get('jewish_gematria').evaluate
+reverse_gematria = cipher_registry.get('reverse_gematria').evaluate
+qwerty_gematria = cipher_registry.get('qwerty').evaluate
+beans_369_gematria = cipher_registry.get('beans_369_gematria').evaluate
+reduction_gematria = cipher_registry.get('aave_reduced').evaluate
 
 def spiral_gematria(text: str) -> float:
     total = 0
@@ -236,13 +207,24 @@ def get_full_resonance_sequence(phrase, selected_methods):
     except (ValueError, OverflowError): initial_number = s + e + j
     factor_chain = get_factorization_chain(initial_number)
     base36_codes = [to_base36(n) for n in factor_chain]
-    unfolded_numbers = {num for code in base36_codes for num in decode_base36_pairs(code)}
+    unfolded_numbers = unfolding.unfolded_numbers(initial_number)
     return {'gematria_values': gematria_values, 'initial_number': initial_number,
             'factor_chain': factor_chain, 'base36_codes': base36_codes,
             'final_sequence': sorted(list(unfolded_numbers))}
 
+def _result_cache_config(selected_methods):
+    """
+    Every setting get_full_resonance_sequence's output depends on, for the
+    result cache key. Oracle mode reads no lexicon and unfolds the initial
+    number without base conversion, so neither enters the key.
+    """
+    return {'format': RESULT_FORMAT_VERSION, 'methods': [name for name, _ in selected_methods],
+            'time_budget': factorization.DEFAULT_TIME_BUDGET}
+
 # --- 4.5: ELS (Bible Code) Engine ---
 def find_els(text, target_name, max_skip=100):
+    if els_engine is not None:
+        return els_engine.find_els(text, target_name, max_skip)
     normalized_text = "".join(filter(str.isalpha, text)).upper()
     target_upper = target_name.upper()
     text_len, target_len = len(normalized_text), len(target_upper)
@@ -288,8 +270,13 @@ def handle_unfold_mode(args):
     log_to_file(f"UNFOLD: {text}")
 
 def handle_oracle_mode(args, methods):
-    text = " ".join(args.input)
-    data = get_full_resonance_sequence(text, methods)
+    text = result_cache.normalize_phrase(" ".join(args.input))
+    cache = None if args.no_cache else result_cache.open_cache(RESULT_CACHE_FILE, RESULT_CACHE_MAX_BYTES)
+    if cache is None:
+        data = get_full_resonance_sequence(text, methods)
+    else:
+        data = cache.get_or_compute('quantumoraclev3', text, _result_cache_config(methods),
+                                   lambda: get_full_resonance_sequence(text, methods))
     print(f"--- Full Resonance for: '{text}' ---\n\n[ Gematria Values ]")
     for name, val in data['gematria_values'].items(): print(f"  {name.ljust(20)}: {val}")
     print(f"\n[ Cosmic Unfolding ]\n  Initial Number: {data['initial_number']}\n  Factor Chain  : {data['factor_chain']}\n  Base36 Codes  : {data['base36_codes']}")
@@ -303,19 +290,85 @@ def handle_oracle_mode(args, methods):
         print(line)
     else: print("  No final resonance numbers generated.")
     log_to_file(f"ORACLE: {text} | Initial={data['initial_number']} | FinalSeq={data['final_sequence']}")
+    if cache is not None:
+        if args.cache_stats:
+            print("\n" + result_cache.format_stats(cache.stats()))
+        cache.close()
+
+def load_els_index(filepath):
+    """The file's memory-mapped letter stream (written beside it on first use), or an in-memory index if it can't be written."""
+    index = els_engine.stream_for(filepath)
+    if index is None:
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f: index = els_engine.LetterIndex.from_text(f.read())
+    return index
+
+def report_els_significance(args, index, targets):
+    if not args.significance:
+        return
+    if index is None:
+        print("ELS significance needs NumPy (pip install numpy).", file=sys.stderr)
+        return
+    result = els_engine.significance(index, targets, args.significance, args.max_skip, workers=args.workers, seed=args.seed)
+    print("\n" + "\n".join(els_engine.format_significance(result)))
+    total = result['total']
+    log_to_file(f"ELS: Significance over {result['controls']} controls (seed {result['seed']}): observed {total['observed']}, "
+                f"expected {total['expected']:.1f}, p = {total['p_value']:.3g}.")
+
+def handle_els_targets(args):
+    if els_engine is None:
+        print("ELS word-list mode needs NumPy (pip install numpy).", file=sys.stderr)
+        return
+    if len(args.input) != 1:
+        print("ELS word-list mode takes one file path; the targets come from --targets.", file=sys.stderr)
+        return
+    filepath = args.input[0]
+    try:
+        targets = els_engine.read_targets(args.targets)
+        index = load_els_index(filepath)
+        grouped = els_engine.search_stream(index, targets, args.max_skip, workers=args.workers)
+        print(f"--- ELS Search for {len(targets)} targets from '{args.targets}' in '{filepath}' ---")
+        found = {t: hits for t, hits in grouped.items() if len(hits[0])}
+        if not found: print("  No matches found.")
+        for target, (starts, steps) in sorted(found.items(), key=lambda item: -len(item[1][0])):
+            positions = ", ".join(f"{s}/{st}" for s, st in zip(starts[:10].tolist(), steps[:10].tolist()))
+            more = f", ... {len(starts) - 10} more" if len(starts) > 10 else ""
+            print(f"  {target}: {len(starts)} match(es) at index/skip {positions}{more}")
+        log_to_file(f"ELS: Searched for {len(targets)} targets from '{args.targets}' in '{filepath}'. "
+                    f"{len(found)} found, {sum(len(h[0]) for h in found.values())} matches.")
+        if args.clusters is not None:
+            hits = els_engine.hits_from(found)
+            if len(hits) > els_engine.CLUSTER_HIT_LIMIT:
+                print(f"\nNot clustering {len(hits):,} matches (limit {els_engine.CLUSTER_HIT_LIMIT:,}); narrow the skips or targets.")
+            else:
+                print("\n" + "\n".join(els_engine.format_clusters(index, els_engine.find_clusters(hits, args.clusters))))
+        report_els_significance(args, index, targets)
+    except FileNotFoundError as e:
+        print(f"Error: File not found at '{e.filename}'", file=sys.stderr)
+    except Exception as e:
+        print(f"An error occurred during ELS scan: {e}", file=sys.stderr)
 
 def handle_els_mode(args):
+    if args.targets:
+        handle_els_targets(args)
+        return
     if len(args.input) < 2:
         print("ELS mode requires a file path and a target word.", file=sys.stderr)
         return
     filepath, target = args.input[0], " ".join(args.input[1:])
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f: text = f.read()
-        results = find_els(text, target)
+        if els_engine is not None:
+            index = load_els_index(filepath)
+            starts, steps = els_engine.search_stream(index, [target], args.max_skip, workers=args.workers)[target.upper()]
+            results = els_engine.els_matches(index, target, starts, steps)
+        else:
+            index = None
+            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f: text = f.read()
+            results = find_els(text, target, args.max_skip)
         print(f"--- ELS Search for '{target}' in '{filepath}' ---")
         if not results: print("  No matches found.")
         for res in results: print(f"  Found '{res['els']}' at index {res['start']} with skip {res['skip']}. Context: ...{res['context']}...")
         log_to_file(f"ELS: Searched for '{target}' in '{filepath}'. Found {len(results)} matches.")
+        report_els_significance(args, index, [target])
     except FileNotFoundError:
         print(f"Error: File not found at '{filepath}'", file=sys.stderr)
     except Exception as e:
@@ -333,35 +386,36 @@ def handle_scan_mode(args):
         print(f"Error: Scan directory '{scan_dir}' not found.", file=sys.stderr)
         return
         
+    window_sizes = args.window_sizes or list(DEFAULT_WINDOW_SIZES)
+    try:
+        ciphers = resolve_ciphers(args.ciphers or DEFAULT_CIPHERS)
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return
+
     os.makedirs(SCAN_OUTPUT_DIR, exist_ok=True)
-    print(f"--- Scanning directory '{scan_dir}' ---")
-    for root, _, files in os.walk(scan_dir):
-        for file in files:
-            if file.lower().endswith(('.txt', '.pdf')):
-                filepath = os.path.join(root, file)
-                print(f"  Processing: {filepath}")
-                text = ""
-                try:
-                    if file.lower().endswith('.txt'):
-                        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f: text = f.read()
-                    else:
-                        with pdfplumber.open(filepath) as pdf:
-                            text = "".join(page.extract_text() for page in pdf.pages if page.extract_text())
-                except Exception as e:
-                    print(f"    Could not read file: {e}")
-                    continue
-                
-                words = re.sub(r'[^a-zA-Z\s]', ' ', text).split()
-                if len(words) < 5: continue
-                
-                output_path = os.path.join(SCAN_OUTPUT_DIR, f"{os.path.basename(filepath)}.gematria.txt")
-                with open(output_path, 'w', encoding='utf-8') as out_f:
-                    for i in range(len(words) - 4):
-                        chunk = ' '.join(words[i:i+5])
-                        val = jewish_gematria(chunk) # Using Jewish gematria as per original scanner
-                        out_f.write(f"{filepath}|{chunk}|{val}\n")
+    config = scanner_config(window_sizes, ciphers, page_separator="")
+    manifest = ScanManifest.load(os.path.join(SCAN_OUTPUT_DIR, MANIFEST_FILENAME))
+    paths, unchanged = plan_scan(find_source_files(scan_dir), manifest, config, force=args.force)
+    workers = max(1, args.workers)
+    print(f"--- Scanning {len(paths)} files in '{scan_dir}' (windows: {window_sizes}, ciphers: {', '.join(ciphers)}, workers: {workers}) ---")
+    if unchanged:
+        print(f"  Skipping {len(unchanged)} unchanged files (use --force to rescan).")
+    progress = ScanProgress(len(paths))
+    try:
+        # Pages are joined without a separator, as this mode always has.
+        for scan in scan_files(paths, window_sizes, ciphers, SCAN_OUTPUT_DIR, workers, page_separator=""):
+            progress.update(scan)
+            manifest.record(scan, config)
+            print(f"  {progress.line()} {scan.path}")
+            if scan.status == 'error':
+                print(f"    {scan.error}")
+            for output_path in scan.outputs:
                 print(f"    -> Saved results to {output_path}")
-    log_to_file(f"SCAN: Completed scan of directory '{scan_dir}'.")
+    finally:
+        manifest.save()
+    print(f"--- Scan complete: {progress.summary()}, {len(unchanged)} unchanged ---")
+    log_to_file(f"SCAN: Completed scan of directory '{scan_dir}' ({progress.summary()}, {len(unchanged)} unchanged).")
 
 def handle_lookup_mode(args):
     try:
@@ -399,6 +453,17 @@ def main():
     parser.add_argument('mode', choices=['oracle', 'delta', 'alcgem', 'unfold', 'els', 'scan', 'lookup', 'build-db'], help="The operational mode.")
     parser.add_argument('input', nargs='*', help="Input: phrase(s), file paths, or numbers depending on the mode.")
     parser.add_argument('-m', '--methods', nargs='+', default=['simple', 'jewish', 'alw'], help="Gematria methods to use.")
+    parser.add_argument('--window-sizes', nargs='+', type=int, help="Scan mode: word-window sizes to emit (default: 5).")
+    parser.add_argument('--ciphers', nargs='+', help="Scan mode: additive ciphers to emit, first one writes <file>.gematria.txt (default: jewish_gematria).")
+    parser.add_argument('--workers', type=int, default=1, help="Scan and ELS modes: number of worker processes scanning files, or splitting ELS skips, in parallel (default: 1).")
+    parser.add_argument('--force', action='store_true', help="Scan mode: rescan every file, ignoring the scan manifest.")
+    parser.add_argument('--max-skip', type=int, default=100, help="ELS mode: largest skip to search, in both directions (default: 100).")
+    parser.add_argument('--targets', help="ELS mode: a word list (one target per line) searched in a single pass instead of one target word.")
+    parser.add_argument('--significance', type=int, metavar='N', help="ELS mode: also run the search on N letter-shuffled controls and report expected hits and p-values.")
+    parser.add_argument('--clusters', type=int, nargs='?', const=2, metavar='RADIUS', help="ELS word-list mode: also show where matches of different words cluster on the cylinder (text wrapped at a skip), within RADIUS rows/columns (default: 2).")
+    parser.add_argument('--seed', type=int, help="ELS mode: seed for the shuffled controls (default: random, and reported).")
+    parser.add_argument('--no-cache', action='store_true', help="Oracle mode: always recompute instead of using the result cache.")
+    parser.add_argument('--cache-stats', action='store_true', help="Oracle mode: print result cache hit/miss counters.")
     args = parser.parse_args()
 
     available_methods = {'simple': simple_gematria, 'english': english_gematria, 'alw': alw_cipher_gematria, 'chaldean': chaldean_gematria, 'jewish': jewish_gematria, 'reverse': reverse_gematria, 'qwerty': qwerty_gematria, 'beans369': beans_369_gematria, 'reduction': reduction_gematria, 'spiral': spiral_gematria, 'grok': grok_resonance_score}
@@ -2,6 +2,8 @@ import math
 import os
 from collections import defaultdict
 
+import factorization
+
 # ==============================================================================
 # GLOBAL LEXICON
 # ==============================================================================
@@ -60,27 +62,7 @@ def boundary_resonance_gematria(text: str) -> int:
 
 def get_factorization_chain(n: int) -> list[int]:
     """Generates the prime factorization chain for a given integer."""
-    chain = {n}
-    current_num = n
-    
-    factors = [2, 3]
-    for factor in factors:
-        while current_num % factor == 0:
-            current_num //= factor
-            chain.add(current_num)
-
-    i = 5
-    while i * i <= current_num:
-        for step in [i, i + 2]:
-             while current_num % step == 0:
-                current_num //= step
-                chain.add(current_num)
-        i += 6
-        
-    if current_num > 1:
-        chain.add(current_num)
-        
-    return sorted(list(chain), reverse=True)
+    return factorization.get_factorization_chain(n)
 
 
 def to_base36(n: int) -> str:
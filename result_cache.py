@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# result_cache.py
+# Persistent, size-capped LRU cache of computed Oracle results.
+#
+# Results are stored as JSON in one SQLite table keyed by a sha256 over a namespace
+# (which script computed it), the whitespace-normalised phrase and a config
+# dict (method set, unfolding settings, lexicon version, ...). Any config
+# change therefore misses instead of serving a stale result. Every hit stamps
+# the entry's last-use time (wall clock, so recency is comparable across
+# processes); when the stored bytes pass max_bytes the least recently used
+# entries are dropped. Hit/miss counters are kept per session
+# and accumulated in the file.
+#
+# Values must be plain JSON data (dicts with string keys, lists, numbers,
+# strings). JSON rather than pickle keeps entries readable by every script:
+# a class pickled by a script run as __main__ would not load in a process
+# that imports it as a module.
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICT_TO_FRACTION = 0.9  # evicting trims down to this share of max_bytes so puts don't evict one row at a time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    phrase TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+def normalize_phrase(phrase: str) -> str:
+    """Strips and collapses whitespace. Case is kept: several ciphers (ASCII sum, for one) depend on it."""
+    return " ".join(phrase.split())
+
+def make_key(namespace: str, phrase: str, config: dict) -> str:
+    """sha256 over namespace, normalised phrase and config (any JSON-serialisable values)."""
+    payload = json.dumps([namespace, normalize_phrase(phrase), config], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResultCache:
+    """One SQLite file of JSON results. Safe to open from several processes at once (WAL mode)."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._flushed = (0, 0)  # session hits/misses already added to the file's totals
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def get(self, key: str):
+        """The cached result for key, or None (counted as a miss)."""
+        row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            value = json.loads(row[0])
+        except ValueError:
+            # Not JSON (an entry from the old pickle format); recompute instead.
+            self.misses += 1
+            return None
+        with self._conn:
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time_ns(), key))
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value, namespace: str = "", phrase: str = "") -> None:
+        """Stores value, which must be JSON-serialisable; tuples come back as lists and dict keys as strings."""
+        blob = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if len(blob) > self.max_bytes:
+            return
+        with self._conn:
+            old = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO results (key, namespace, phrase, value, size, last_used) "
+                               "VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, namespace, normalize_phrase(phrase), blob, len(blob), time.time_ns()))
+            self._bytes += len(blob) - (old[0] if old else 0)
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def get_or_compute(self, namespace: str, phrase: str, config: dict, compute, keep=None):
+        """
+        Returns the cached result for (namespace, phrase, config), computing it
+        on a miss and storing it unless keep(result) is false.
+        """
+        key = make_key(namespace, phrase, config)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if keep is None or keep(value):
+                self.put(key, value, namespace, phrase)
+        return value
+
+    def evict(self) -> int:
+        """Drops least recently used entries until the cache is under EVICT_TO_FRACTION of max_bytes."""
+        # Other processes may have written since this one last looked.
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        target = int(self.max_bytes * EVICT_TO_FRACTION)
+        removed = 0
+        with self._conn:
+            rows = self._conn.execute("SELECT key, size FROM results ORDER BY last_used").fetchall()
+            for key, size in rows:
+                if self._bytes <= target:
+                    break
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._bytes -= size
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM results")
+        self._bytes = 0
+
+    def flush(self) -> None:
+        """Adds this session's hit/miss counts to the all-time totals in the file."""
+        deltas = (('hits', self.hits - self._flushed[0]), ('misses', self.misses - self._flushed[1]))
+        with self._conn:
+            for name, value in deltas:
+                self._conn.execute("INSERT INTO counters (name, value) VALUES (?, ?) "
+                                   "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, value))
+        self._flushed = (self.hits, self.misses)
+
+    def stats(self) -> dict:
+        """Session and all-time hit/miss counts plus entry count and stored bytes."""
+        totals = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            'hits': self.hits, 'misses': self.misses,
+            'total_hits': totals.get('hits', 0) + self.hits - self._flushed[0],
+            'total_misses': totals.get('misses', 0) + self.misses - self._flushed[1],
+            'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes,
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+def format_stats(stats: dict) -> str:
+    looked_up = stats['hits'] + stats['misses']
+    rate = f"{stats['hits'] / looked_up:.0%}" if looked_up else "n/a"
+    return (f"Result cache: {stats['hits']} hits, {stats['misses']} misses this run ({rate} hit rate); "
+            f"{stats['entries']} entries, {stats['bytes']:,} of {stats['max_bytes']:,} bytes; "
+            f"all-time {stats['total_hits']} hits / {stats['total_misses']} misses.")
+
+def open_cache(path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+    """Opens the cache at path, or returns None and says why if it cannot be opened."""
+    try:
+        return ResultCache(path, max_bytes)
+    except (sqlite3.Error, OSError) as e:
+        print(f"    --- Could not open result cache {path}: {e}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear an Oracle result cache.")
+    parser.add_argument('cache_path')
+    parser.add_argument('--clear', action='store_true', help="Delete every cached result.")
+    args = parser.parse_args()
+    if not os.path.exists(args.cache_path):
+        print(f"Error: Result cache '{args.cache_path}' does not exist.", file=sys.stderr)
+        sys.exit(1)
+    cache = ResultCache(args.cache_path)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared '{args.cache_path}'.")
+    print(format_stats(cache.stats()))
+    cache.close()
+
+if __name__ == "__main__":
+    main()
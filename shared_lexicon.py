@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# shared_lexicon.py
+# Read-only, memory-mapped lookup tables shared by every process on a box.
+#
+# The scripts' big number -> words dicts (qo9's BEANS_DB and METHOD_GROUPS,
+# llm2.5's KNOWLEDGE_BASE) are published once into a single file:
+#
+#   header | table directory (JSON) | per table: values (sorted int64)
+#          | big values (uint32 ids of decimal strings) | offsets (int64, n + 1)
+#          | postings (uint32 word ids) | string offsets (int64) | utf-8 strings
+#
+# Values beyond int64 (ordinal-multiplied sums of long words) are kept as
+# decimal strings in the pool, sorted after the int64 values by number.
+#
+# Words are interned into one string pool across all tables, so a word that
+# sits in fifty method groups is stored once. Workers attach with an mmap and
+# read straight from the page cache: the file's pages are shared by every
+# process that maps it, so adding Dash or batch workers adds no copies.
+# Publishing writes a temp file and renames it over the old one; processes
+# still mapping the old file keep a consistent view until they re-attach.
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from collections.abc import Mapping, Sequence
+
+import lexicon_index
+
+SHARED_MAGIC = b'GSHRLEX\x00'
+SHARED_VERSION = 1
+# magic, version, n_tables, n_strings, directory bytes, signature
+_HEADER = struct.Struct('<8sIIQQ32s')
+INT64_MIN, INT64_MAX = lexicon_index.INT64_MIN, lexicon_index.INT64_MAX
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+def make_signature(*parts) -> bytes:
+    """sha256 over the given parts (bytes, or anything with a stable str()), for keying a published file."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8', 'surrogateescape'))
+        digest.update(b'\0')
+    return digest.digest()
+
+# ==============================================================================
+# SECTION 1: PUBLISHING
+# ==============================================================================
+
+def publish(path: str, tables: dict, signature: bytes = b'') -> dict:
+    """
+    Writes tables ({name: {int value: [words]}}) to path and returns build stats.
+    Repeated words under one value are dropped; non-integer values are skipped.
+    """
+    started = time.perf_counter()
+    word_ids = {}
+
+    def intern(word):
+        wid = word_ids.get(word)
+        if wid is None:
+            wid = word_ids[word] = len(word_ids)
+        return wid
+
+    directory = []
+    sections = []
+    skipped = 0
+    for name, table in tables.items():
+        keys = [v for v in table if isinstance(v, int) and not isinstance(v, bool)]
+        skipped += len(table) - len(keys)
+        values = sorted(v for v in keys if INT64_MIN <= v <= INT64_MAX)
+        big = sorted(v for v in keys if not INT64_MIN <= v <= INT64_MAX)
+        offsets = [0]
+        postings = []
+        for value in values + big:
+            postings.extend(intern(word) for word in dict.fromkeys(table[value]))
+            offsets.append(len(postings))
+        big_ids = [intern(str(v)) for v in big]
+        directory.append({'name': name, 'n_values': len(values), 'n_big': len(big), 'n_postings': len(postings)})
+        sections.append(struct.pack(f'<{len(values)}q', *values))
+        sections.append(struct.pack(f'<{len(big_ids)}I', *big_ids))
+        sections.append(struct.pack(f'<{len(offsets)}q', *offsets))
+        sections.append(struct.pack(f'<{len(postings)}I', *postings))
+    encoded = [w.encode('utf-8', 'surrogateescape') for w in word_ids]
+    string_offsets = [0]
+    for raw in encoded:
+        string_offsets.append(string_offsets[-1] + len(raw))
+    sections.append(struct.pack(f'<{len(string_offsets)}q', *string_offsets))
+    sections.append(b''.join(encoded))
+
+    raw_directory = json.dumps({'tables': directory}).encode('utf-8')
+    header = _HEADER.pack(SHARED_MAGIC, SHARED_VERSION, len(directory), len(encoded), len(raw_directory),
+                          signature.ljust(32, b'\0')[:32])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for section in [header, raw_directory] + sections:
+            f.write(section)
+            f.write(b'\0' * _pad8(len(section)))
+    os.replace(tmp_path, path)
+    return {'tables': len(directory), 'words': len(encoded), 'skipped': skipped,
+            'postings': sum(t['n_postings'] for t in directory),
+            'bytes': os.path.getsize(path), 'seconds': time.perf_counter() - started}
+
+# ==============================================================================
+# SECTION 2: ATTACHING
+# ==============================================================================
+
+class _BigValues(Sequence):
+    """The out-of-int64 values of a table, decoded on access so bisect can search them."""
+
+    def __init__(self, owner, ids):
+        self._owner = owner
+        self._ids = ids
+
+    def __getitem__(self, i):
+        return int(self._owner.word(self._ids[i]))
+
+    def __len__(self):
+        return len(self._ids)
+
+class SharedTable(Mapping):
+    """One published {value: [words]} table; reads like a dict, decodes only the value looked up."""
+
+    def __init__(self, owner, name, values, big_ids, offsets, postings):
+        self._owner = owner
+        self.name = name
+        self._values = values
+        self._big = _BigValues(owner, big_ids)
+        self._offsets = offsets
+        self._postings = postings
+
+    def _slot(self, value):
+        if not isinstance(value, int):
+            return -1
+        if INT64_MIN <= value <= INT64_MAX:
+            keys, base = self._values, 0
+        else:
+            keys, base = self._big, len(self._values)
+        i = bisect.bisect_left(keys, value)
+        return base + i if i < len(keys) and keys[i] == value else -1
+
+    def __contains__(self, value):
+        return self._slot(value) >= 0
+
+    def __getitem__(self, value):
+        i = self._slot(value)
+        if i < 0:
+            raise KeyError(value)
+        word = self._owner.word
+        return [word(wid) for wid in self._postings[self._offsets[i]:self._offsets[i + 1]]]
+
+    def get(self, value, default=None):
+        return self[value] if value in self else default
+
+    def count(self, value) -> int:
+        """Number of words under value, without decoding them."""
+        i = self._slot(value)
+        return self._offsets[i + 1] - self._offsets[i] if i >= 0 else 0
+
+    def __iter__(self):
+        yield from self._values
+        yield from self._big
+
+    def __len__(self):
+        return len(self._values) + len(self._big)
+
+class SharedLexicon(Mapping):
+    """A published file, mapped read-only: {table name: SharedTable}."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, n_tables, n_strings, n_directory, signature = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            raise ValueError(f"{path} is not a shared lexicon file.")
+        if magic != SHARED_MAGIC or version != SHARED_VERSION:
+            raise ValueError(f"{path} is not a version {SHARED_VERSION} shared lexicon file; publish it again.")
+        self.signature = signature
+        self.n_words = n_strings
+        view = memoryview(self._mm)
+        pos = _HEADER.size + _pad8(_HEADER.size)
+        directory = json.loads(bytes(view[pos:pos + n_directory]))['tables']
+        pos += n_directory + _pad8(n_directory)
+
+        def section(count, fmt, itemsize):
+            nonlocal pos
+            size = count * itemsize
+            part = view[pos:pos + size].cast(fmt)
+            pos += size + _pad8(size)
+            return part
+
+        self._tables = {}
+        for entry in directory:
+            values = section(entry['n_values'], 'q', 8)
+            big_ids = section(entry['n_big'], 'I', 4)
+            offsets = section(entry['n_values'] + entry['n_big'] + 1, 'q', 8)
+            postings = section(entry['n_postings'], 'I', 4)
+            self._tables[entry['name']] = SharedTable(self, entry['name'], values, big_ids, offsets, postings)
+        self._string_offsets = section(n_strings + 1, 'q', 8)
+        self._strings_start = pos
+
+    def word(self, word_id: int) -> str:
+        start = self._strings_start + self._string_offsets[word_id]
+        end = self._strings_start + self._string_offsets[word_id + 1]
+        return self._mm[start:end].decode('utf-8', 'surrogateescape')
+
+    def __getitem__(self, name):
+        return self._tables[name]
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def __len__(self):
+        return len(self._tables)
+
+    def file_size(self) -> int:
+        return len(self._mm)
+
+def open_shared(path: str, signature: bytes = None):
+    """Attaches path if it exists and (when given) matches signature, else returns None and says why."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        shared = SharedLexicon(path)
+    except (OSError, ValueError) as e:
+        print(f"    --- Could not attach shared lexicon {path}: {e}")
+        return None
+    if signature is not None and shared.signature != signature.ljust(32, b'\0')[:32]:
+        print(f"Shared lexicon '{path}' is out of date; it will be rebuilt.")
+        return None
+    return shared
+
+def publish_and_attach(path: str, tables: dict, signature: bytes = b''):
+    """Publishes tables and attaches the result; returns None (and says why) if path cannot be written."""
+    try:
+        stats = publish(path, tables, signature)
+    except OSError as e:
+        print(f"    --- Could not publish shared lexicon {path}: {e}")
+        return None
+    print(f"Published shared lexicon '{path}': {stats['tables']} table(s), {stats['words']} words, "
+          f"{stats['bytes']:,} bytes in {stats['seconds']:.2f}s.")
+    return open_shared(path)
+
+# ==============================================================================
+# SECTION 3: PER-PROCESS ADDITIONS
+# ==============================================================================
+
+class OverlayTable(Mapping):
+    """
+    A read-only base table (shared or a plain dict) plus this process's own
+    additions, e.g. words learned during a chat session. The base is never copied.
+    """
+
+    def __init__(self, base=None):
+        self.base = base if base is not None else {}
+        self.extra = {}  # value -> list of words not already in base[value]
+
+    def add(self, value, word) -> bool:
+        """Associates word with value; returns False if it already was."""
+        if word in self.extra.get(value, ()) or word in self.base.get(value, ()):
+            return False
+        self.extra.setdefault(value, []).append(word)
+        return True
+
+    def __contains__(self, value):
+        return value in self.extra or value in self.base
+
+    def __getitem__(self, value):
+        words = list(self.base.get(value, ()))
+        words.extend(self.extra.get(value, ()))
+        if not words and value not in self:
+            raise KeyError(value)
+        return words
+
+    def __iter__(self):
+        yield from self.base
+        yield from (v for v in self.extra if v not in self.base)
+
+    def __len__(self):
+        return len(self.base) + sum(1 for v in self.extra if v not in self.base)
+
+# ==============================================================================
+# SECTION 4: COMMAND LINE
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect shared, memory-mapped lexicon tables.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_info = sub.add_parser('info', help="List the tables in a published file.")
+    p_info.add_argument('path')
+    p_lookup = sub.add_parser('lookup', help="Print the words one table stores for a value.")
+    p_lookup.add_argument('path')
+    p_lookup.add_argument('table')
+    p_lookup.add_argument('value', type=int)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"Error: Shared lexicon '{args.path}' does not exist.", file=sys.stderr)
+        sys.exit(1)
+    started = time.perf_counter()
+    shared = SharedLexicon(args.path)
+    if args.command == 'info':
+        print(f"{args.path}: {len(shared)} table(s), {shared.n_words} words, {shared.file_size():,} bytes "
+              f"(attached in {(time.perf_counter() - started) * 1000:.2f} ms)")
+        for name, table in shared.items():
+            print(f"  {name}: {len(table)} values, {len(table._postings)} postings")
+    elif args.command == 'lookup':
+        if args.table not in shared:
+            print(f"Error: No table '{args.table}' in '{args.path}'.", file=sys.stderr)
+            sys.exit(1)
+        for word in shared[args.table].get(args.value, []):
+            print(word)
+
+if __name__ == "__main__":
+    main()
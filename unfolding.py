@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# unfolding.py
+# Shared "Cosmic Unfolding" plus a precomputed whole-lexicon unfolding index.
+#
+# Unfolding a value means: factorization chain -> Base36 code per chain step ->
+# every overlapping two-character pair decoded back to a number. Decoded pairs
+# are always below 36 * 36, so the set of unfolded numbers is small and bounded.
+#
+# `compile-unfolding` unfolds every value of a compiled lexicon once and writes:
+#
+#   header | values (sorted int64) | forward offsets (int64, n_values + 1)
+#          | forward unfolded numbers (uint16) | reverse offsets (int64, PAIR_LIMIT + 1)
+#          | reverse value slots (uint32)
+#
+# so both "what does 1081 unfold into" and "which values unfold into 137" are
+# an mmap plus a slice, with no factoring at query time.
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import sys
+import time
+from functools import lru_cache
+
+import factorization
+import lexicon_index
+import number_props
+
+UNFOLD_MAGIC = b'GUNFIDX\x00'
+UNFOLD_VERSION = 1
+# magic, version, reserved, n_values, n_unfolded, lexicon source signature
+_HEADER = struct.Struct('<8sIIQQ32s')
+PAIR_LIMIT = 36 * 36  # every decoded pair is in range(PAIR_LIMIT)
+UNFOLD_CACHE_SIZE = 65536
+
+_BASE36_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_index = None  # UnfoldingIndex consulted by unfolded_numbers(), see attach()
+
+# ==============================================================================
+# SECTION 1: UNFOLDING
+# ==============================================================================
+
+def to_base36(n: int) -> str:
+    if n == 0: return "0"
+    if n < 0: return "-" + to_base36(abs(n))
+    base36 = ""
+    while n > 0: n, i = divmod(n, 36); base36 = _BASE36_CHARS[i] + base36
+    return base36
+
+def decode_base36_pairs(b36_string: str) -> list[int]:
+    if len(b36_string) < 2: return []
+    decoded_numbers = []
+    for i in range(len(b36_string) - 1):
+        try: decoded_numbers.append(int(b36_string[i:i+2], 36))
+        except ValueError: continue
+    return decoded_numbers
+
+def unfold_chain(chain) -> set:
+    """Every number decoded from the Base36 pairs of a factorization chain."""
+    return {num for n in chain for num in decode_base36_pairs(to_base36(n))}
+
+def _unfold(n: int) -> frozenset:
+    return frozenset(unfold_chain(factorization.get_factorization_chain(n)))
+
+@lru_cache(maxsize=UNFOLD_CACHE_SIZE)
+def _unfold_cached(n: int) -> frozenset:
+    return _unfold(n)
+
+def unfolded_numbers(n) -> frozenset:
+    """
+    The unfolded number set of n (empty for non-ints and n <= 0). Served from
+    the attached unfolding index when it has n, computed and memoised otherwise.
+    """
+    if isinstance(n, bool) or not isinstance(n, int) or n <= 0:
+        return frozenset()
+    if _index is not None:
+        found = _index.get(n)
+        if found is not None:
+            return frozenset(found)
+    return _unfold_cached(n)
+
+def attach(index) -> None:
+    """Routes unfolded_numbers() lookups through index (None detaches)."""
+    global _index
+    _index = index
+
+# ==============================================================================
+# SECTION 2: RECURSIVE UNFOLDING
+# ==============================================================================
+
+DEFAULT_LEVEL_CAP = 256  # new nodes kept per level; every node is below PAIR_LIMIT after level 0 anyway
+
+class UnfoldingDAG:
+    """
+    A multi-level unfolding: every node is unfolded once, and an edge to a node
+    that is already placed is recorded but not expanded again. Those edges are
+    where cycles close (1081 -> 1081, for one), so the walk never loops.
+    """
+
+    def __init__(self, roots, max_depth):
+        self.roots = list(roots)
+        self.max_depth = max_depth
+        self.levels = [list(self.roots)]  # levels[d]: nodes first reached at depth d
+        self.level_of = {n: 0 for n in self.roots}
+        self.edges = {}                   # node -> children kept after pruning, ascending
+        self.back_edges = []              # (node, child) where child sits at the same or an earlier level
+        self.pruned = 0                   # children dropped by the property-mask filter
+        self.capped = 0                   # new nodes dropped by the per-level cap
+
+    @property
+    def depth(self) -> int:
+        """Deepest level that holds any node."""
+        return len(self.levels) - 1
+
+    def __len__(self):
+        return len(self.level_of)
+
+    def __contains__(self, n):
+        return n in self.level_of
+
+    def nodes(self) -> set:
+        return set(self.level_of)
+
+    def children(self, n) -> tuple:
+        return self.edges.get(n, ())
+
+    def to_dict(self) -> dict:
+        return {
+            'roots': self.roots, 'max_depth': self.max_depth, 'levels': self.levels,
+            'edges': {str(n): list(children) for n, children in self.edges.items()},
+            'back_edges': self.back_edges, 'pruned': self.pruned, 'capped': self.capped,
+        }
+
+def unfold_dag(roots, max_depth: int = 3, level_cap: int = DEFAULT_LEVEL_CAP,
+               require_mask: int = 0, exclude_mask: int = 0) -> UnfoldingDAG:
+    """
+    Unfolds roots, then their unfolded numbers, and so on to max_depth levels.
+    A child is kept only if it has every bit of require_mask and none of
+    exclude_mask (number_props PRIME / SQUARE / PALINDROME / FIBONACCI). At most
+    level_cap new nodes are admitted per level, smallest first. Each node is
+    expanded once, so the work is bounded by max_depth * level_cap unfoldings.
+    """
+    roots = sorted({n for n in roots if isinstance(n, int) and not isinstance(n, bool) and n > 0})
+    dag = UnfoldingDAG(roots, max_depth)
+    frontier = roots
+    for depth in range(1, max_depth + 1):
+        fresh = set()
+        for node in frontier:
+            children = sorted(unfolded_numbers(node))
+            if require_mask or exclude_mask:
+                masks = number_props.property_masks(children)
+                kept = [c for c, m in zip(children, masks) if m & require_mask == require_mask and not m & exclude_mask]
+                dag.pruned += len(children) - len(kept)
+                children = kept
+            dag.edges[node] = tuple(children)
+            for child in children:
+                if child in dag.level_of:
+                    if dag.level_of[child] < depth:
+                        dag.back_edges.append((node, child))
+                else:
+                    fresh.add(child)
+        if not fresh:
+            break
+        admitted = sorted(fresh)
+        if len(admitted) > level_cap:
+            dag.capped += len(admitted) - level_cap
+            admitted = admitted[:level_cap]
+            # Edges into capped nodes would point outside the DAG.
+            keep = set(admitted)
+            for node in frontier:
+                dag.edges[node] = tuple(c for c in dag.edges[node] if c in dag.level_of or c in keep)
+        for child in admitted:
+            dag.level_of[child] = depth
+        dag.levels.append(admitted)
+        frontier = admitted
+    return dag
+
+def format_dag(dag: UnfoldingDAG, per_line: int = 12) -> list[str]:
+    """One block per level: the level's nodes, wrapped per_line to a line, then the walk's totals."""
+    lines = []
+    for depth, nodes in enumerate(dag.levels):
+        lines.append(f"  Level {depth} ({len(nodes)} new):")
+        for i in range(0, len(nodes), per_line):
+            lines.append("    " + " ".join(str(n) for n in nodes[i:i + per_line]))
+    lines.append(f"  {len(dag)} nodes over {dag.depth} level(s); {len(dag.back_edges)} edges back to earlier nodes, "
+                 f"{dag.pruned} pruned by property, {dag.capped} over the level cap.")
+    return lines
+
+# ==============================================================================
+# SECTION 3: COMPILING
+# ==============================================================================
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+def compile_unfolding(values, index_path: str, signature: bytes = bytes(32)) -> dict:
+    """
+    Unfolds every positive value once and writes the forward and reverse index
+    to index_path. signature ties the file to the lexicon it was built from.
+    Returns build stats.
+    """
+    started = time.perf_counter()
+    values = sorted({v for v in values if isinstance(v, int) and 0 < v <= lexicon_index.INT64_MAX})
+    offsets = [0]
+    forward = []
+    reverse = [[] for _ in range(PAIR_LIMIT)]
+    for slot, value in enumerate(values):
+        unfolded = sorted(_unfold(value))
+        forward.extend(unfolded)
+        offsets.append(len(forward))
+        for num in unfolded:
+            reverse[num].append(slot)
+    reverse_offsets = [0]
+    for slots in reverse:
+        reverse_offsets.append(reverse_offsets[-1] + len(slots))
+
+    sections = [
+        struct.pack(f'<{len(values)}q', *values),
+        struct.pack(f'<{len(offsets)}q', *offsets),
+        struct.pack(f'<{len(forward)}H', *forward),
+        struct.pack(f'<{len(reverse_offsets)}q', *reverse_offsets),
+        struct.pack(f'<{len(forward)}I', *(slot for slots in reverse for slot in slots)),
+    ]
+    header = _HEADER.pack(UNFOLD_MAGIC, UNFOLD_VERSION, 0, len(values), len(forward), signature)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(b'\0' * _pad8(len(header)))
+        for section in sections:
+            f.write(section)
+            f.write(b'\0' * _pad8(len(section)))
+    os.replace(tmp_path, index_path)
+    return {'values': len(values), 'unfolded': len(forward), 'bytes': os.path.getsize(index_path),
+            'seconds': time.perf_counter() - started}
+
+def compile_from_lexicon(lexicon_path: str, index_path: str) -> dict:
+    """Unfolds every value of a compiled lexicon index (see lexicon_index.py)."""
+    lexicon = lexicon_index.LexiconIndex(lexicon_path)
+    return compile_unfolding(lexicon.values(), index_path, lexicon.signature)
+
+# ==============================================================================
+# SECTION 4: READING
+# ==============================================================================
+
+class UnfoldingIndex:
+    """Read-only view of a compiled unfolding index."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, n_values, n_unfolded, signature = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            raise ValueError(f"{path} is not a compiled unfolding index.")
+        if magic != UNFOLD_MAGIC or version != UNFOLD_VERSION:
+            raise ValueError(f"{path} is not a version {UNFOLD_VERSION} unfolding index; recompile it.")
+        self.signature = signature
+        view = memoryview(self._mm)
+        pos = _HEADER.size + _pad8(_HEADER.size)
+
+        def section(count, fmt, itemsize):
+            nonlocal pos
+            size = count * itemsize
+            part = view[pos:pos + size].cast(fmt)
+            pos += size + _pad8(size)
+            return part
+
+        self._values = section(n_values, 'q', 8)
+        self._offsets = section(n_values + 1, 'q', 8)
+        self._forward = section(n_unfolded, 'H', 2)
+        self._reverse_offsets = section(PAIR_LIMIT + 1, 'q', 8)
+        self._reverse = section(n_unfolded, 'I', 4)
+
+    def __len__(self):
+        return len(self._values)
+
+    def _slot(self, value):
+        if not isinstance(value, int) or not lexicon_index.INT64_MIN <= value <= lexicon_index.INT64_MAX:
+            return -1
+        i = bisect.bisect_left(self._values, value)
+        return i if i < len(self._values) and self._values[i] == value else -1
+
+    def __contains__(self, value):
+        return self._slot(value) >= 0
+
+    def get(self, value, default=None):
+        """Sorted unfolded numbers of value, or default if value was not compiled."""
+        i = self._slot(value)
+        if i < 0:
+            return default
+        return self._forward[self._offsets[i]:self._offsets[i + 1]].tolist()
+
+    def sources(self, unfolded: int) -> list[int]:
+        """Every compiled value whose unfolding contains `unfolded`, ascending."""
+        if not isinstance(unfolded, int) or not 0 <= unfolded < PAIR_LIMIT:
+            return []
+        slots = self._reverse[self._reverse_offsets[unfolded]:self._reverse_offsets[unfolded + 1]]
+        values = self._values
+        return [values[slot] for slot in slots]
+
+    def values(self):
+        return iter(self._values)
+
+    def file_size(self) -> int:
+        return len(self._mm)
+
+    def is_current(self, main_db_dir: str) -> bool:
+        return self.signature == lexicon_index.source_signature(main_db_dir)
+
+def open_index(index_path: str, main_db_dir: str):
+    """Opens index_path if it exists and matches main_db_dir, else returns None and says why."""
+    if not os.path.exists(index_path):
+        return None
+    try:
+        index = UnfoldingIndex(index_path)
+    except (OSError, ValueError) as e:
+        print(f"    --- Could not open unfolding index {index_path}: {e}")
+        return None
+    if not index.is_current(main_db_dir):
+        print(f"Unfolding index '{index_path}' is out of date with '{main_db_dir}'.")
+        return None
+    return index
+
+# ==============================================================================
+# SECTION 5: COMMAND LINE
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute and query Cosmic Unfolding for a whole lexicon.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_compile = sub.add_parser('compile-unfolding', help="Unfold every value of a compiled lexicon index.")
+    p_compile.add_argument('lexicon_path', help="Lexicon index built by `lexicon_index.py compile-lexicon`.")
+    p_compile.add_argument('index_path', help="Output unfolding index, e.g. unfolding.gufx.")
+    p_info = sub.add_parser('info', help="Show unfolding index counts.")
+    p_info.add_argument('index_path')
+    p_unfold = sub.add_parser('unfold', help="Print what a value unfolds into.")
+    p_unfold.add_argument('index_path')
+    p_unfold.add_argument('value', type=int)
+    p_unfold.add_argument('--depth', type=int, default=1, help="Unfold the unfolded numbers again, this many levels deep.")
+    p_sources = sub.add_parser('sources', help="Print the values (and phrases) that unfold into a number.")
+    p_sources.add_argument('index_path')
+    p_sources.add_argument('number', type=int)
+    p_sources.add_argument('--lexicon', help="Lexicon index to list each value's phrases from.")
+    args = parser.parse_args()
+
+    if args.command == 'compile-unfolding':
+        if not os.path.exists(args.lexicon_path):
+            print(f"Error: Lexicon index '{args.lexicon_path}' does not exist.", file=sys.stderr)
+            sys.exit(1)
+        stats = compile_from_lexicon(args.lexicon_path, args.index_path)
+        print(f"Unfolded {stats['values']} values into '{args.index_path}': {stats['unfolded']} value/number links, "
+              f"{stats['bytes']:,} bytes in {stats['seconds']:.2f}s.")
+    elif args.command == 'info':
+        started = time.perf_counter()
+        index = UnfoldingIndex(args.index_path)
+        print(f"{args.index_path}: {len(index)} values, {len(index._forward)} value/number links, "
+              f"{index.file_size():,} bytes (opened in {(time.perf_counter() - started) * 1000:.2f} ms)")
+    elif args.command == 'unfold':
+        index = UnfoldingIndex(args.index_path)
+        found = index.get(args.value)
+        if args.depth > 1:
+            attach(index)
+            started = time.perf_counter()
+            dag = unfold_dag([args.value], args.depth)
+            for line in format_dag(dag):
+                print(line)
+            print(f"{len(dag)} nodes in {(time.perf_counter() - started) * 1000:.1f} ms.")
+        elif found is None:
+            print(f"{args.value} is not in the index; computed: {sorted(unfolded_numbers(args.value))}")
+        else:
+            print(" ".join(str(n) for n in found))
+    elif args.command == 'sources':
+        index = UnfoldingIndex(args.index_path)
+        lexicon = lexicon_index.LexiconIndex(args.lexicon) if args.lexicon else None
+        sources = index.sources(args.number)
+        for value in sources:
+            if lexicon is not None:
+                print(f"{value}: {', '.join(lexicon.get(value, []))}")
+            else:
+                print(value)
+        print(f"{len(sources)} value(s) unfold into {args.number}.")
+
+if __name__ == "__main__":
+    main()